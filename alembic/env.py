@@ -3,9 +3,10 @@ from alembic import context
 
 from src.bot.config import settings
 from src.database.models import Base
+from src.database.urls import sync_database_url
 
-# Alembic runs synchronously — strip the async driver from the URL
-_SYNC_URL = settings.database_url.replace("+aiomysql", "+pymysql")
+# Alembic runs synchronously — use the sync partner of the async driver
+_SYNC_URL = sync_database_url(settings.database_url, settings.database_driver, settings.database_sync_driver)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,27 @@
+"""add data_versions table
+
+Revision ID: rev0004
+Revises: rev0003
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "rev0004"
+down_revision = "rev0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    data_versions = op.create_table(
+        "data_versions",
+        sa.Column("name", sa.String(32), primary_key=True),
+        sa.Column("version", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+    )
+    op.bulk_insert(data_versions, [{"name": "users", "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
@@ -0,0 +1,28 @@
+"""add leases table
+
+Revision ID: rev0006
+Revises: rev0005
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "rev0006"
+down_revision = "rev0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    leases = op.create_table(
+        "leases",
+        sa.Column("name", sa.String(32), primary_key=True),
+        sa.Column("holder", sa.String(64), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+    )
+    op.bulk_insert(leases, [{"name": "bot-leader"}])
+
+
+def downgrade() -> None:
+    op.drop_table("leases")
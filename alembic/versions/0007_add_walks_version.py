@@ -0,0 +1,24 @@
+"""add walks data version
+
+Revision ID: rev0007
+Revises: rev0006
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "rev0007"
+down_revision = "rev0006"
+branch_labels = None
+depends_on = None
+
+data_versions = sa.table("data_versions", sa.column("name", sa.String), sa.column("version", sa.BigInteger))
+
+
+def upgrade() -> None:
+    op.bulk_insert(data_versions, [{"name": "walks", "version": 0}])
+
+
+def downgrade() -> None:
+    op.execute(data_versions.delete().where(data_versions.c.name == "walks"))
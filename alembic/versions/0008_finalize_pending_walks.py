@@ -0,0 +1,34 @@
+"""finalize walks left pending by the old flow
+
+Walks in progress used to be rows with is_finalized = false, finalized by a
+timer after WALK_TIMEOUT_MINUTES. They are FSM drafts now, so nothing
+finalizes rows left over from before; finalize them as their timers would
+have, and bump the walks data version so caches pick them up.
+
+Revision ID: rev0008
+Revises: rev0007
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "rev0008"
+down_revision = "rev0007"
+branch_labels = None
+depends_on = None
+
+walks = sa.table("walks", sa.column("is_finalized", sa.Boolean))
+data_versions = sa.table("data_versions", sa.column("name", sa.String), sa.column("version", sa.BigInteger))
+
+
+def upgrade() -> None:
+    op.execute(walks.update().where(walks.c.is_finalized == sa.false()).values(is_finalized=True))
+    op.execute(
+        data_versions.update().where(data_versions.c.name == "walks").values(version=data_versions.c.version + 1)
+    )
+
+
+def downgrade() -> None:
+    # Which walks were pending is not recorded; there is nothing to undo
+    pass
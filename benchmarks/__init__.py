@@ -0,0 +1,6 @@
+"""Benchmarks for the bot and web hot paths.
+
+Run a benchmark as a module from the project root, e.g.
+``python -m benchmarks.crud_round_trips``. They use a local SQLite database
+(``aiosqlite``, see ``requirements-test.txt``) so no MySQL server is needed.
+"""
@@ -0,0 +1,92 @@
+"""Web warm start: rebuilding the dashboard aggregates vs loading the snapshot.
+
+Fills a temporary SQLite database with a year of walks, then times:
+  - rebuild: counting every walk from the database (a cold start without
+    a snapshot);
+  - load: mapping the saved snapshot and catching up on the walks added
+    since (a restart with a snapshot);
+  - dashboard: building one /api/dashboard payload from the aggregates.
+
+Usage:
+  python -m benchmarks.aggregate_snapshot [--walks 50000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database.models import Base, Walk
+from src.web.aggregates import AggregateStore
+
+USERS = 6
+NAMES = {user_id: f"user {user_id}" for user_id in range(1, USERS + 1)}
+
+
+def _walks(count: int, since: datetime) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {
+            "user_id": rng.randint(1, USERS),
+            "walked_at": since + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+            "didnt_poop": rng.random() < 0.1,
+            "long_walk": rng.random() < 0.2,
+            "is_finalized": True,
+        }
+        for _ in range(count)
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--walks", type=int, default=50_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    since = datetime(2025, 10, 1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Walk), _walks(args.walks, since))
+
+    path = os.path.join(directory, "aggregates.bin")
+    store = AggregateStore(path)
+    started = time.perf_counter()
+    async with sessions() as session:
+        await store.rebuild(session)
+    rebuild = time.perf_counter() - started
+    await store.save()
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(Walk), _walks(100, since))
+
+    started = time.perf_counter()
+    restored = AggregateStore(path)
+    restored.load()
+    async with sessions() as session:
+        caught_up = await restored.refresh(session)
+    load = time.perf_counter() - started
+
+    end = since + timedelta(days=364)
+    started = time.perf_counter()
+    for _ in range(20):
+        restored.dashboard(since, end, None, NAMES)
+    dashboard = (time.perf_counter() - started) / 20
+
+    print(f"walks:                  {args.walks}")
+    print(f"snapshot size:          {os.path.getsize(path) / 1024:.0f} KiB")
+    print(f"rebuild from database:  {rebuild * 1000:.0f} ms")
+    print(f"load snapshot + {caught_up} new: {load * 1000:.1f} ms")
+    print(f"dashboard, whole year:  {dashboard * 1000:.1f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Routing cost per text message: ButtonIndex vs a chain of F.text.in_ filters.
+
+The worst case for the old chain is a message that is not a button (free
+text typed in an FSM state), which has to fail every filter before reaching
+the state handlers. The index answers it with one dict lookup regardless of
+how many buttons are registered.
+
+Usage:
+  python -m benchmarks.button_routing
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+
+from aiogram import F  # noqa: E402
+from aiogram.types import Chat, Message  # noqa: E402
+
+from src.bot.buttons import ButtonIndex  # noqa: E402
+
+LANGUAGES = ("ru", "en")
+ITERATIONS = 20_000
+
+
+def _message(text: str) -> Message:
+    return Message(message_id=1, date=datetime.now(), chat=Chat(id=1, type="private"), text=text)
+
+
+def _labels(buttons: int) -> list[tuple[str, ...]]:
+    return [tuple(f"{lang} button {i}" for lang in LANGUAGES) for i in range(buttons)]
+
+
+async def _handler() -> None:
+    pass
+
+
+def _chain_us(buttons: int, message: Message) -> float:
+    filters = [F.text.in_(set(labels)) for labels in _labels(buttons)]
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for magic in filters:
+            if magic.resolve(message):
+                break
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def _index_us(buttons: int, message: Message) -> float:
+    index = ButtonIndex()
+    for labels in _labels(buttons):
+        index.on_label(*labels)(_handler)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await index(message)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    free_text = _message("14:30")
+    print(f"{'buttons':>8}{'filter chain µs':>18}{'index µs':>12}")
+    for buttons in (5, 10, 20, 40, 80):
+        chain = _chain_us(buttons, free_text)
+        index = await _index_us(buttons, free_text)
+        print(f"{buttons:>8}{chain:>18.2f}{index:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""Count DB round trips for one walk lifecycle through ``src.database.crud``.
+
+A round trip is every statement sent to the server plus every COMMIT. The
+legacy implementation (a pending walk row, SELECT-then-mutate, committing
+inside each helper) is kept here as the baseline so it can be compared
+with the bot's current flow, where the walk is an FSM draft until sent.
+
+The current helpers also bump a ``data_versions`` row after writes that
+other processes cache (finalized walks, users), one UPDATE each; those are
+included in the counts.
+
+Usage:
+  python -m benchmarks.crud_round_trips
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import crud
+from src.database.models import Base, User, Walk
+
+
+@dataclass
+class RoundTrips:
+    statements: int = 0
+    commits: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.statements + self.commits
+
+
+def _count(engine: AsyncEngine) -> RoundTrips:
+    counter = RoundTrips()
+
+    def on_execute(*_args) -> None:
+        counter.statements += 1
+
+    def on_commit(*_args) -> None:
+        counter.commits += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    return counter
+
+
+# --- legacy implementation (SELECT, mutate, commit, refresh) ---
+
+
+async def _legacy_get(session: AsyncSession, model, pk: int):
+    result = await session.execute(select(model).where(model.id == pk))
+    return result.scalar_one_or_none()
+
+
+async def _legacy_lifecycle(session: AsyncSession, telegram_id: int) -> None:
+    user = await crud.get_user_by_telegram_id(session, telegram_id)
+
+    walk = Walk(user_id=user.id)
+    session.add(walk)
+    await session.commit()
+    await session.refresh(walk)
+
+    for flag in ("didnt_poop", "long_walk"):
+        obj = await _legacy_get(session, Walk, walk.id)
+        setattr(obj, flag, True)
+        await session.commit()
+
+    obj = await _legacy_get(session, Walk, walk.id)
+    obj.is_finalized = True
+    await session.commit()
+    await session.refresh(obj)
+
+    user = await _legacy_get(session, User, user.id)
+    user.display_name = "Walker"
+    await session.commit()
+
+
+async def _legacy_cancel(session: AsyncSession, telegram_id: int) -> None:
+    user = await crud.get_user_by_telegram_id(session, telegram_id)
+
+    walk = Walk(user_id=user.id)
+    session.add(walk)
+    await session.commit()
+    await session.refresh(walk)
+
+    obj = await _legacy_get(session, Walk, walk.id)
+    await session.delete(obj)
+    await session.commit()
+
+
+# --- current flow: FSM draft, one insert when sent ---
+
+
+async def _draft_lifecycle(session: AsyncSession, telegram_id: int) -> None:
+    # Parameters live in an FSM draft and the walk is inserted once,
+    # already finalized
+    user = await crud.get_user_by_telegram_id(session, telegram_id)
+    await crud.create_walk(session, user.id, didnt_poop=True, long_walk=True, is_finalized=True)
+    await crud.set_display_name(session, user.id, "Walker")
+    await session.commit()
+
+
+async def _draft_cancel(session: AsyncSession, telegram_id: int) -> None:
+    # Cancelling a draft touches no walk rows
+    await crud.get_user_by_telegram_id(session, telegram_id)
+    await session.commit()
+
+
+async def _measure(scenario) -> RoundTrips:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(User.__table__.insert().values(telegram_id=1, language="en"))
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    counter = _count(engine)
+    async with session_factory() as session:
+        await scenario(session, 1)
+    await engine.dispose()
+    return counter
+
+
+async def main() -> None:
+    print(f"{'scenario':<22}{'statements':>12}{'commits':>10}{'total':>8}")
+    for name, scenario in (
+        ("lifecycle (legacy)", _legacy_lifecycle),
+        ("lifecycle (draft)", _draft_lifecycle),
+        ("cancel (legacy)", _legacy_cancel),
+        ("cancel (draft)", _draft_cancel),
+    ):
+        trips = await _measure(scenario)
+        print(f"{name:<22}{trips.statements:>12}{trips.commits:>10}{trips.total:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""HTTP load test for the dashboard: ``/api/dashboard`` per range width and user filter, and ``/``.
+
+Drives a running web app (--url) with --clients concurrent clients for
+--seconds per scenario. Each scenario fixes a date-range width (--widths,
+in days) and a filter (all users, or --user-id); every request picks a
+random start within the last --history-days days, so requests spread over
+many cache keys. Requests carry initData signed with BOT_TOKEN (it must
+match the server's).
+
+--widget NAME loads ``/api/widgets/NAME`` instead, i.e. one chart of the
+lazily loading dashboard.
+
+Reported per scenario: requests/s, p50/p95/p99 latency, errors, and the
+share of responses computed rather than served from cache (read from the
+Server-Timing header).
+
+--queries skips HTTP and times each ``src.web.queries`` function directly
+against DATABASE_URL for the same widths and filters: the SQL path the
+dashboard falls back to while aggregates are being built. The queries are
+MySQL SQL.
+
+Seed a database with ``python -m benchmarks.seed_walks`` first, then e.g.:
+  DATABASE_URL=sqlite+aiosqlite:///data/bench.db BOT_TOKEN=0:bench uvicorn src.web.main:app
+  BOT_TOKEN=0:bench python -m benchmarks.dashboard_load [--widths 1,7,30,90,365]
+         [--seconds 10] [--clients 16] [--user-id 1] [--url http://127.0.0.1:8000]
+  DATABASE_URL=mysql+aiomysql://... python -m benchmarks.dashboard_load --queries
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+import aiohttp
+
+from benchmarks.init_data import sign_init_data
+
+# Server-Timing entries that mean the dashboard was computed, not cached
+COMPUTE_SPANS = {
+    "aggregates", "user_names", "leaderboard", "walks_per_day", "weekly_trends",
+    "poop_stats", "long_walk_stats", "hourly_distribution",
+}
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _range_params(rng: random.Random, width: int, history_days: int, user_id: int | None) -> dict:
+    end = date.today() - timedelta(days=rng.randrange(max(1, history_days - width + 1)))
+    params = {"start": str(end - timedelta(days=width - 1)), "end": str(end)}
+    if user_id is not None:
+        params["user_id"] = str(user_id)
+    return params
+
+
+def _computed(server_timing: str) -> bool:
+    return any(entry.split(";", 1)[0].strip() in COMPUTE_SPANS for entry in server_timing.split(","))
+
+
+async def _scenario(
+    url: str, path: str, make_params, headers: dict, clients: int, seconds: float
+) -> tuple[list[float], int, int]:
+    """Return (latencies, errors, computed responses)."""
+    latencies: list[float] = []
+    errors = computed = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: aiohttp.ClientSession, rng: random.Random) -> None:
+        nonlocal errors, computed
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with client.get(url + path, params=make_params(rng), headers=headers) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        errors += 1
+                        continue
+                    computed += _computed(resp.headers.get("Server-Timing", ""))
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as client:
+        await asyncio.gather(*(client_loop(client, random.Random(i)) for i in range(clients)))
+    return latencies, errors, computed
+
+
+async def run_http(args: argparse.Namespace) -> None:
+    headers = {"X-Telegram-Init-Data": sign_init_data(args.bot_token, args.telegram_id)}
+    scenarios = []
+    for width in args.widths:
+        for user_id in (None, args.user_id):
+            label = f"{width}d {'user ' + str(user_id) if user_id else 'all'}"
+            make_params = lambda rng, w=width, u=user_id: _range_params(rng, w, args.history_days, u)
+            path = f"/api/widgets/{args.widget}" if args.widget else "/api/dashboard"
+            scenarios.append((label, path, make_params))
+    if not args.no_page:
+        scenarios.append(("page /", "/", lambda rng: {}))
+
+    print(f"{args.url} ({args.widget or 'dashboard'}): {args.clients} clients, {args.seconds:.0f}s per scenario")
+    print(f"{'scenario':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'computed':>10}")
+    for label, path, make_params in scenarios:
+        latencies, errors, computed = await _scenario(
+            args.url, path, make_params, headers, args.clients, args.seconds
+        )
+        if not latencies:
+            print(f"{label:<18}{'-':>9}{'-':>9}{'-':>9}{'-':>9}{errors:>8}")
+            continue
+        p50, p95, p99 = (_percentile(latencies, q) * 1000 for q in (0.5, 0.95, 0.99))
+        share = f"{computed / len(latencies):.0%}" if path != "/" else "-"
+        print(
+            f"{label:<18}{len(latencies) / args.seconds:>9.0f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+            f"{errors:>8}{share:>10}"
+        )
+
+
+async def run_queries(args: argparse.Namespace) -> None:
+    from src.web import queries
+    from src.web.database import async_session, dispose_engine, init_engine
+
+    functions = [
+        queries.get_leaderboard,
+        queries.get_walks_per_day,
+        queries.get_weekly_trends,
+        queries.get_poop_stats,
+        queries.get_long_walk_stats,
+        queries.get_hourly_distribution,
+    ]
+    init_engine()
+    rng = random.Random(1)
+    print(f"median ms over {args.repeat} runs")
+    print(f"{'scenario':<18}" + "".join(f"{f.__name__.removeprefix('get_')[:14]:>16}" for f in functions))
+    try:
+        async with async_session() as session:
+            for width in args.widths:
+                for user_id in (None, args.user_id):
+                    label = f"{width}d {'user ' + str(user_id) if user_id else 'all'}"
+                    row = []
+                    for function in functions:
+                        timings = []
+                        for _ in range(args.repeat):
+                            params = _range_params(rng, width, args.history_days, user_id)
+                            start_dt = datetime.fromisoformat(params["start"])
+                            end_dt = datetime.fromisoformat(params["end"]).replace(hour=23, minute=59, second=59)
+                            started = time.perf_counter()
+                            await function(session, start_dt, end_dt, user_id)
+                            timings.append(time.perf_counter() - started)
+                        row.append(statistics.median(timings) * 1000)
+                    print(f"{label:<18}" + "".join(f"{ms:>16.1f}" for ms in row))
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--bot-token", default=os.environ.get("BOT_TOKEN", ""))
+    parser.add_argument("--telegram-id", type=int, default=1000, help="user in the signed initData")
+    parser.add_argument("--widths", default="1,7,30,90,365", help="range widths in days")
+    parser.add_argument("--history-days", type=int, default=365, help="how far back ranges may start")
+    parser.add_argument("--user-id", type=int, default=1, help="users.id for the filtered scenarios")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--widget", default="", help="load /api/widgets/WIDGET instead of /api/dashboard")
+    parser.add_argument("--no-page", action="store_true", help="skip the / scenario")
+    parser.add_argument("--queries", action="store_true", help="time src.web.queries directly instead")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query with --queries")
+    args = parser.parse_args()
+    args.widths = [int(w) for w in args.widths.split(",")]
+    if not args.queries and not args.bot_token:
+        parser.error("set BOT_TOKEN or --bot-token (the server's token)")
+    asyncio.run(run_queries(args) if args.queries else run_http(args))
+
+
+if __name__ == "__main__":
+    main()
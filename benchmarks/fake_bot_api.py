@@ -0,0 +1,96 @@
+"""A local stand-in for the Telegram Bot API, for offline load tests.
+
+Serves ``getUpdates`` from an in-memory queue and answers every outgoing
+call (sendMessage, editMessageReplyMarkup, answerCallbackQuery, ...) with a
+plausible result, optionally after an artificial network delay. Outgoing
+calls are counted per method so a test can wait for a broadcast to land.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+from aiohttp import web
+
+BOT_USER = {"id": 0, "is_bot": True, "first_name": "Load test bot", "username": "loadtest_bot"}
+
+
+class FakeBotAPI:
+    """Minimal Bot API server: ``push`` updates in, inspect ``calls`` out."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        # chat_id -> message_id of the last message sent with an inline keyboard
+        self.inline_messages: dict[int, int] = {}
+        self._updates: list[dict] = []
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._has_updates = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    def push(self, updates: list[dict]) -> None:
+        """Queue updates for the next getUpdates call, assigning update_ids."""
+        for update in updates:
+            update["update_id"] = next(self._update_ids)
+            self._updates.append(update)
+        self._has_updates.set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await request.post()
+
+        if method == "getUpdates":
+            result = await self._get_updates(params)
+        else:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            self.calls[method] += 1
+            result = self._result(method, params)
+
+        return web.json_response({"ok": True, "result": result})
+
+    async def _get_updates(self, params) -> list[dict]:
+        offset = int(params.get("offset", 0))
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._has_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_updates.wait(), timeout=int(params.get("timeout", 0)) or 0.1)
+            except asyncio.TimeoutError:
+                return []
+        return self._updates[:100]
+
+    def _result(self, method: str, params) -> dict | bool:
+        if method == "getMe":
+            return BOT_USER
+        if method == "sendMessage":
+            chat_id = int(params["chat_id"])
+            message_id = next(self._message_ids)
+            if "inline_keyboard" in params.get("reply_markup", ""):
+                self.inline_messages[chat_id] = message_id
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        return True
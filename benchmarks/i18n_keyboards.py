@@ -0,0 +1,112 @@
+"""Per-update CPU cost of text lookup, keyboards and broadcast formatting.
+
+Each case is timed against an inline copy of the previous implementation
+(nested dict lookups + ``str.format``, a new pydantic markup per message,
+one broadcast render per recipient).
+
+Usage:
+  python -m benchmarks.i18n_keyboards
+"""
+
+import os
+import timeit
+from types import SimpleNamespace
+
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+
+from aiogram.types import KeyboardButton, ReplyKeyboardMarkup  # noqa: E402
+
+from src.bot.i18n import TEXTS, get_text, render  # noqa: E402
+from src.bot.keyboards import main_keyboard, parameter_keyboard  # noqa: E402
+from src.bot.notifications import format_walk_message  # noqa: E402
+
+RECIPIENTS = [SimpleNamespace(language="ru" if i % 3 else "en") for i in range(30)]
+WALK = SimpleNamespace(didnt_poop=True, long_walk=False)
+
+
+# --- previous implementation ---
+
+
+def _legacy_get_text(key: str, lang: str = "ru") -> str:
+    return TEXTS.get(lang, TEXTS["ru"]).get(key, key)
+
+
+def _legacy_parameter_keyboard(lang: str) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [
+                KeyboardButton(text=_legacy_get_text("didnt_poop", lang)),
+                KeyboardButton(text=_legacy_get_text("long_walk", lang)),
+            ],
+            [
+                KeyboardButton(text=_legacy_get_text("send", lang)),
+                KeyboardButton(text=_legacy_get_text("cancel", lang)),
+            ],
+        ],
+        resize_keyboard=True,
+    )
+
+
+def _legacy_main_keyboard(lang: str) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text=_legacy_get_text(key, lang))]
+            for key in ("walk_button", "walk_at_time_button", "ask_walk_button", "change_name_button")
+        ],
+        resize_keyboard=True,
+    )
+
+
+def _legacy_broadcast() -> None:
+    for user in RECIPIENTS:
+        message = _legacy_get_text("walk_logged", user.language).format(
+            username="Alice", time="10:00", time_walked="09:55"
+        )
+        params = []
+        if WALK.didnt_poop:
+            params.append(_legacy_get_text("param_didnt_poop", user.language))
+        if WALK.long_walk:
+            params.append(_legacy_get_text("param_long_walk", user.language))
+        if params:
+            message += "\n" + _legacy_get_text("additional", user.language).format(
+                params=", ".join(params)
+            )
+
+
+# --- current implementation ---
+
+
+def _broadcast() -> None:
+    messages = {}
+    for user in RECIPIENTS:
+        if user.language not in messages:
+            messages[user.language] = format_walk_message(WALK, "Alice", user.language, "10:00", "09:55")
+
+
+CASES = [
+    ("get_text", lambda: _legacy_get_text("send", "en"), lambda: get_text("send", "en")),
+    (
+        "render time_set",
+        lambda: _legacy_get_text("time_set", "en").format(time="10:00"),
+        lambda: render("time_set", "en", time="10:00"),
+    ),
+    ("parameter_keyboard", lambda: _legacy_parameter_keyboard("en"), lambda: parameter_keyboard("en")),
+    ("main_keyboard", lambda: _legacy_main_keyboard("en"), lambda: main_keyboard("en")),
+    (f"broadcast x{len(RECIPIENTS)}", _legacy_broadcast, _broadcast),
+]
+
+
+def _per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    print(f"{'case':<22}{'legacy µs':>12}{'current µs':>12}{'speedup':>10}")
+    for name, legacy, current in CASES:
+        before = _per_call_us(legacy, 2000)
+        after = _per_call_us(current, 2000)
+        print(f"{name:<22}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
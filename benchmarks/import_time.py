@@ -0,0 +1,81 @@
+"""Cold-start import time of the bot and web entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+(best of --runs) and prints the total, then the slowest libraries our own
+``src`` modules import directly: the cost each ``import`` line in this
+repo adds to cold start. tests/test_import_time.py holds both entry points
+to a budget with the same measurement.
+
+Usage:
+  python -m benchmarks.import_time [--runs 3] [--top 15] [module ...]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ENTRY_POINTS = ("src.bot.main", "src.web.main")
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTime:
+    own_us: int
+    cumulative_us: int
+    parent: str | None
+
+
+def import_times(module: str) -> dict[str, ImportTime]:
+    """Import ``module`` in a fresh interpreter and parse ``-X importtime``."""
+    env = {**os.environ, "BOT_TOKEN": os.environ.get("BOT_TOKEN") or "0:importtime"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(own), int(cumulative), depth))
+
+    # Lines come in post-order: a module's imports are printed right before it
+    parents: dict[str, str] = {}
+    pending: list[tuple[str, int]] = []
+    for name, _, _, depth in rows:
+        while pending and pending[-1][1] > depth:
+            parents[pending.pop()[0]] = name
+        pending.append((name, depth))
+    return {name: ImportTime(own, cumulative, parents.get(name)) for name, own, cumulative, _ in rows}
+
+
+def best_of(module: str, runs: int) -> dict[str, ImportTime]:
+    """The run with the lowest total for ``module``, to smooth out noise."""
+    return min((import_times(module) for _ in range(runs)), key=lambda times: times[module].cumulative_us)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        times = best_of(module, args.runs)
+        print(f"{module}: {times[module].cumulative_us / 1000:.0f} ms (best of {args.runs})")
+        direct = [
+            (name, t) for name, t in times.items()
+            if t.parent and t.parent.startswith("src") and not name.startswith("src")
+        ]
+        for name, t in sorted(direct, key=lambda item: -item[1].cumulative_us)[:args.top]:
+            print(f"  {t.cumulative_us / 1000:>8.1f} ms  {name:<40} (from {t.parent})")
+        print()
+
+
+if __name__ == "__main__":
+    main()
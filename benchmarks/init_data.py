@@ -0,0 +1,20 @@
+"""Telegram WebApp initData signing for benchmarks that call the web app."""
+
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import quote, urlencode
+
+
+def sign_init_data(bot_token: str, user_id: int, auth_date: int | None = None) -> str:
+    """initData as Telegram would sign it for ``bot_token``."""
+    fields = {
+        "auth_date": str(int(time.time()) if auth_date is None else auth_date),
+        "query_id": "AAbench",
+        "user": json.dumps({"id": user_id, "first_name": "Bench"}),
+    }
+    check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields, quote_via=quote)
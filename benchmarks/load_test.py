@@ -0,0 +1,274 @@
+"""Offline end-to-end load test: the real dispatcher against a fake Bot API.
+
+Starts ``create_dispatcher()`` from ``src.bot.main`` (same middlewares and
+router as production) with a real scheduler, polling a local FakeBotAPI
+server, and a throwaway database. Each simulated user replays a random
+stream of scenarios built from button presses:
+
+  walk    walk -> 0..2 toggles -> send (send broadcasts to every user)
+  cancel  walk -> cancel
+  ask     ask walk -> ask_walk:<target> callback (one or all recipients)
+
+Toggle, send and cancel are pressed in the inline walk editor, or on the old
+reply keyboard with --reply-buttons.
+
+Updates are released in rounds, one per user, so a user's steps stay in
+order while different users run concurrently. Reported: updates/sec,
+p50/p99 latency per step kind (measured around the whole update pipeline),
+and broadcast completion time, i.e. the latency of ``send`` updates, which
+includes the fan-out.
+
+The database defaults to a temporary SQLite file. LOADTEST_DATABASE_URL
+points it elsewhere (e.g. a scratch MySQL); its tables are DROPPED and
+recreated.
+
+Usage:
+  python -m benchmarks.load_test [--users 20] [--scenarios 10] [--api-latency-ms 0]
+                                 [--fsm-storage memory|db] [--reply-buttons]
+                                 [--trace-file traces.jsonl]
+
+--trace-file wires tracing as the bot does with TRACE_FILE; view the
+slowest update with scripts/trace_waterfall.py.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+_DB_FILE = Path(tempfile.gettempdir()) / "dogwalker_loadtest.db"
+os.environ["DATABASE_URL"] = os.environ.get("LOADTEST_DATABASE_URL", f"sqlite+aiosqlite:///{_DB_FILE}")
+os.environ["BOT_TOKEN"] = "0:loadtest"
+os.environ["ALLOWED_USERS"] = "[]"
+os.environ["WEBAPP_URL"] = ""
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from loguru import logger  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.fake_bot_api import BOT_USER, FakeBotAPI  # noqa: E402
+from src.bot.config import settings  # noqa: E402
+from src.bot.i18n import get_text  # noqa: E402
+from src import tracing  # noqa: E402
+from src.bot.main import create_dispatcher, enable_tracing, trace_db_statement  # noqa: E402
+from src.bot.notifications import coalescer  # noqa: E402
+from src.bot.scheduler import init_scheduler, stop_scheduler  # noqa: E402
+from src.database.models import Base, DataVersion, User  # noqa: E402
+from src.database.session import enable_statement_timing, engine  # noqa: E402
+from src.database.versions import USERS_VERSION, WALKS_VERSION  # noqa: E402
+
+FIRST_TELEGRAM_ID = 10_000
+LANGUAGES = ("ru", "en")
+
+# (scenario, weight)
+SCENARIOS = (("walk", 5), ("cancel", 2), ("ask", 2))
+# Steps pressed in the inline walk editor (or, with --reply-buttons, on the
+# old reply keyboard)
+EDITOR_STEPS = {"toggle", "send", "cancel"}
+
+
+class Simulation:
+    """Builds the per-user update streams and collects latencies."""
+
+    def __init__(
+        self, users: int, scenarios: int, seed: int, reply_buttons: bool, inline_messages: dict[int, int]
+    ) -> None:
+        self.users = users
+        self.reply_buttons = reply_buttons
+        self.inline_messages = inline_messages
+        self.rng = random.Random(seed)
+        self.streams = {
+            FIRST_TELEGRAM_ID + i: self._stream(FIRST_TELEGRAM_ID + i, scenarios) for i in range(users)
+        }
+        self.kinds: dict[int, str] = {}
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.pending = 0
+        self.round_done = asyncio.Event()
+        self._message_ids = iter(range(1, sys.maxsize))
+
+    def language(self, telegram_id: int) -> str:
+        return LANGUAGES[(telegram_id - FIRST_TELEGRAM_ID) % len(LANGUAGES)]
+
+    def _stream(self, telegram_id: int, scenarios: int) -> list[tuple[str, str]]:
+        """Return the user's steps as (kind, payload) pairs."""
+        names, weights = zip(*SCENARIOS)
+        steps: list[tuple[str, str]] = []
+        for scenario in self.rng.choices(names, weights, k=scenarios):
+            if scenario == "walk":
+                steps.append(("walk", "walk_button"))
+                for _ in range(self.rng.randint(0, 2)):
+                    steps.append(("toggle", self.rng.choice(("didnt_poop", "long_walk"))))
+                steps.append(("send", "send"))
+            elif scenario == "cancel":
+                steps += [("walk", "walk_button"), ("cancel", "cancel")]
+            else:
+                target = self.rng.choice(("all", str(FIRST_TELEGRAM_ID + self.rng.randrange(self.users))))
+                steps += [("ask_walk", "ask_walk_button"), ("ask_walk_callback", f"ask_walk:{target}")]
+        return steps
+
+    def update(self, telegram_id: int, kind: str, payload: str) -> dict:
+        if kind == "ask_walk_callback":
+            return self._callback(telegram_id, payload, next(self._message_ids))
+        if kind in EDITOR_STEPS and not self.reply_buttons:
+            # Pressed in the inline walk editor: the last inline message the bot sent
+            return self._callback(telegram_id, f"walk:{payload}", self.inline_messages[telegram_id])
+        return {
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": telegram_id, "type": "private"},
+                "from": self._sender(telegram_id),
+                "text": get_text(payload, self.language(telegram_id)),
+            }
+        }
+
+    def _sender(self, telegram_id: int) -> dict:
+        return {"id": telegram_id, "is_bot": False, "first_name": f"User {telegram_id}"}
+
+    def _callback(self, telegram_id: int, data: str, message_id: int) -> dict:
+        return {
+            "callback_query": {
+                "id": str(next(self._message_ids)),
+                "from": self._sender(telegram_id),
+                "chat_instance": str(telegram_id),
+                "data": data,
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": telegram_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": "walk",
+                },
+            }
+        }
+
+    def rounds(self):
+        """Yield lists of (telegram_id, kind, payload): step k of every user."""
+        longest = max(len(steps) for steps in self.streams.values())
+        for k in range(longest):
+            yield [
+                (telegram_id, *steps[k]) for telegram_id, steps in self.streams.items() if k < len(steps)
+            ]
+
+    async def timing_middleware(self, handler, event, data):
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.latencies[self.kinds.pop(event.update_id)].append(time.perf_counter() - start)
+            self.pending -= 1
+            if self.pending == 0:
+                self.round_done.set()
+
+
+async def _prepare_database(users: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(DataVersion), [{"name": USERS_VERSION, "version": 0}, {"name": WALKS_VERSION, "version": 0}]
+        )
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "telegram_id": FIRST_TELEGRAM_ID + i,
+                    "username": f"user{i}",
+                    "language": LANGUAGES[i % len(LANGUAGES)],
+                    "is_active": True,
+                }
+                for i in range(users)
+            ],
+        )
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(users: int, scenarios: int, api_latency: float, seed: int, reply_buttons: bool) -> None:
+    await _prepare_database(users)
+
+    api = FakeBotAPI(latency=api_latency)
+    base_url = await api.start()
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=AiohttpSession(api=TelegramAPIServer.from_base(base_url)))
+
+    sim = Simulation(users, scenarios, seed, reply_buttons, api.inline_messages)
+    if settings.trace_file:
+        tracing.configure(tracing.JsonlExporter(settings.trace_file))
+        enable_tracing(bot)
+        enable_statement_timing(trace_db_statement)
+    dp = create_dispatcher()
+    dp.update.outer_middleware(sim.timing_middleware)
+    await init_scheduler(bot, dp.storage)
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=1))
+
+    total = 0
+    start = time.perf_counter()
+    for batch in sim.rounds():
+        sim.round_done.clear()
+        sim.pending = len(batch)
+        updates = [sim.update(*step) for step in batch]
+        api.push(updates)
+        for update, (_, kind, _) in zip(updates, batch):
+            sim.kinds[update["update_id"]] = kind
+        await sim.round_done.wait()
+        total += len(batch)
+    elapsed = time.perf_counter() - start
+
+    await coalescer.flush_all()
+    await dp.stop_polling()
+    await polling
+    await stop_scheduler()
+    await api.stop()
+    await engine.dispose()
+    tracing.shutdown()
+
+    print(f"{users} users, {total} updates in {elapsed:.2f}s: {total / elapsed:.0f} updates/s")
+    print(f"FSM storage {settings.fsm_storage}; fake API latency {api_latency * 1000:.0f} ms; calls: {dict(sorted(api.calls.items()))}")
+    print()
+    print(f"{'step':<20}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind in ("walk", "toggle", "send", "cancel", "ask_walk", "ask_walk_callback"):
+        values = sim.latencies.get(kind)
+        if values:
+            p50, p99 = _percentile(values, 0.5) * 1000, _percentile(values, 0.99) * 1000
+            print(f"{kind:<20}{len(values):>8}{p50:>10.2f}{p99:>10.2f}")
+    sends = sim.latencies.get("send")
+    if sends:
+        print()
+        print(
+            f"broadcast to {users} users completes in p50 {_percentile(sends, 0.5) * 1000:.2f} ms, "
+            f"p99 {_percentile(sends, 0.99) * 1000:.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="simulated users (default 20)")
+    parser.add_argument("--scenarios", type=int, default=10, help="scenarios per user (default 10)")
+    parser.add_argument("--api-latency-ms", type=float, default=0, help="fake Bot API delay per call")
+    parser.add_argument("--fsm-storage", choices=("memory", "db"), default=settings.fsm_storage)
+    parser.add_argument(
+        "--reply-buttons", action="store_true", help="toggle/send/cancel via the old reply keyboard"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--trace-file", default="", help="append spans to this JSONL file")
+    args = parser.parse_args()
+    settings.fsm_storage = args.fsm_storage
+    settings.trace_file = args.trace_file
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    asyncio.run(run(args.users, args.scenarios, args.api_latency_ms / 1000, args.seed, args.reply_buttons))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Microbenchmarks for pure hot functions, checked against a JSON baseline.
+
+Covers time parsing, text lookup, keyboard builders, initData
+verification, broadcast formatting and the dashboard result shaping (the
+``queries`` functions fed canned rows by a fake session, and the aggregate
+store). Each case is timed as the best of several repeats.
+
+Absolute times depend on the machine, so every case is also stored
+relative to a fixed pure-Python calibration loop run alongside it; the
+check compares those ratios. A case fails when its ratio grows by more
+than the tolerance (default 0.5, i.e. 50% slower; MICROBENCH_TOLERANCE or
+--tolerance). This command is the regression gate; tests/test_microbench.py
+runs the same check only when MICROBENCH=1 is set.
+
+Usage:
+  python -m benchmarks.micro                 # compare with micro_baseline.json
+  python -m benchmarks.micro --save          # record a new baseline
+  python -m benchmarks.micro -k keyboard --tolerance 0.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+
+from benchmarks.init_data import sign_init_data  # noqa: E402
+from src.bot.i18n import get_text, render  # noqa: E402
+from src.bot.keyboards import ask_walk_keyboard, main_keyboard, parameter_keyboard, walk_editor_keyboard  # noqa: E402
+from src.bot.notifications import format_walk_message  # noqa: E402
+from src.bot.utils import parse_time  # noqa: E402
+from src.web import queries  # noqa: E402
+from src.web.aggregates import AggregateStore  # noqa: E402
+from src.web.routes import verify_telegram_init_data  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("micro_baseline.json")
+DEFAULT_TOLERANCE = float(os.environ.get("MICROBENCH_TOLERANCE", "0.5"))
+
+BOT_TOKEN = "0:benchmark"
+START, END = datetime(2025, 10, 1), datetime(2025, 10, 31, 23, 59, 59)
+USERS = [
+    SimpleNamespace(telegram_id=1000 + i, display_name=f"User {i}" if i % 2 else None, username=f"user{i}")
+    for i in range(8)
+]
+WALK = SimpleNamespace(didnt_poop=True, long_walk=False)
+
+
+INIT_DATA = sign_init_data(BOT_TOKEN, 1000, auth_date=1760000000)
+
+
+# --- dashboard shaping ---
+
+
+class _FakeSession:
+    """Returns canned rows, so a query function runs without a database."""
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    async def execute(self, *args, **kwargs) -> list:
+        return self.rows
+
+
+def _rows(*fields: str):
+    row = namedtuple("Row", fields)
+    return lambda values: [row(*v) for v in values]
+
+
+def _run(coro):
+    # The fake session never suspends, so the coroutine finishes in one step
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+LEADERBOARD_ROWS = _rows("name", "walk_count")([(f"User {i}", 90 - i) for i in range(8)])
+PER_DAY_ROWS = _rows("day", "count")([(date(2025, 10, 1) + timedelta(days=d), 4) for d in range(31)])
+POOP_ROWS = _rows("name", "total", "didnt_poop_count")([(f"User {i}", 90 - i, i) for i in range(8)])
+HOURLY_ROWS = _rows("hour", "count")([(h, 5) for h in range(24)])
+NAME_ROWS = _rows("id", "name")([(i, f"Name {i}" if i % 2 else f"user{i}") for i in range(8)])
+
+
+def _aggregate_store() -> tuple[AggregateStore, dict[int, str]]:
+    store = AggregateStore()
+    for day in range(31):
+        for user in range(8):
+            for hour in (7, 13, 19, 22):
+                store._delta[(date(2025, 10, 1).toordinal() + day, user, hour)] = [1, day % 2, hour == 7]
+    store.ready = True
+    return store, {user: f"User {user}" for user in range(8)}
+
+
+STORE, NAMES = _aggregate_store()
+
+# name -> zero-argument callable
+CASES = {
+    "parse_time 24h": lambda: parse_time("14:30"),
+    "parse_time am/pm": lambda: parse_time("2:05 PM"),
+    "parse_time invalid": lambda: parse_time("walk later"),
+    "get_text": lambda: get_text("send", "en"),
+    "render time_set": lambda: render("time_set", "en", time="10:00"),
+    "main_keyboard": lambda: main_keyboard("en"),
+    "parameter_keyboard": lambda: parameter_keyboard("en"),
+    "walk_editor_keyboard": lambda: walk_editor_keyboard("en", didnt_poop=True),
+    f"ask_walk_keyboard x{len(USERS)}": lambda: ask_walk_keyboard(USERS, "en"),
+    "verify_telegram_init_data": lambda: verify_telegram_init_data(INIT_DATA, BOT_TOKEN),
+    "format_walk_message": lambda: format_walk_message(WALK, "Alice", "en", "10:00", "09:55"),
+    "queries.get_leaderboard": lambda: _run(queries.get_leaderboard(_FakeSession(LEADERBOARD_ROWS), START, END)),
+    "queries.get_walks_per_day": lambda: _run(queries.get_walks_per_day(_FakeSession(PER_DAY_ROWS), START, END)),
+    "queries.get_poop_stats": lambda: _run(queries.get_poop_stats(_FakeSession(POOP_ROWS), START, END)),
+    "queries.get_hourly_distribution": lambda: _run(
+        queries.get_hourly_distribution(_FakeSession(HOURLY_ROWS), START, END)
+    ),
+    "queries.get_user_names": lambda: _run(queries.get_user_names(_FakeSession(NAME_ROWS))),
+    "aggregates.dashboard 31d": lambda: STORE.dashboard(START, END, None, NAMES),
+}
+
+
+def _calibration() -> None:
+    # Fixed mix of the operations the cases lean on: calls, dicts, strings
+    table = {}
+    for i in range(200):
+        table[f"k{i}"] = str(i) + ":" + str(i * 7)
+    sum(len(v) for v in table.values())
+
+
+def _best_ns(func, target: float, repeat: int) -> float:
+    """Best per-call time in ns over ``repeat`` runs of about ``target`` seconds."""
+    number = max(1, int(target / max(timeit.timeit(func, number=3) / 3, 1e-9)))
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def measure(names=None, target: float = 0.02, repeat: int = 5) -> dict:
+    """Time the selected cases (default: all); return a baseline-shaped dict."""
+    names = list(CASES) if names is None else names
+    calibration = _best_ns(_calibration, target, repeat)
+    cases = {}
+    for name in names:
+        ns = _best_ns(CASES[name], target, repeat)
+        cases[name] = {"ns": round(ns, 1), "relative": round(ns / calibration, 5)}
+    return {
+        "python": platform.python_version(),
+        "calibration_ns": round(calibration, 1),
+        "cases": cases,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> dict[str, float]:
+    """Cases whose relative time grew by more than ``tolerance``, with the growth."""
+    regressions = {}
+    for name, result in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        change = result["relative"] / before["relative"] - 1
+        if change > tolerance:
+            regressions[name] = change
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    return json.loads(path.read_text())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("-k", dest="keyword", default="", help="only cases containing this text")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.keyword in name]
+    current = measure(names)
+    baseline = load_baseline() if BASELINE_PATH.exists() else {"cases": {}}
+
+    print(f"calibration {current['calibration_ns']:.0f} ns (baseline {baseline.get('calibration_ns', 0):.0f} ns)")
+    print(f"{'case':<34}{'ns':>12}{'baseline':>12}{'change':>9}")
+    for name, result in current["cases"].items():
+        before = baseline["cases"].get(name)
+        change = f"{result['relative'] / before['relative'] - 1:+.0%}" if before else "new"
+        before_ns = f"{before['ns']:.0f}" if before else "-"
+        print(f"{name:<34}{result['ns']:>12.0f}{before_ns:>12}{change:>9}")
+
+    if args.save:
+        if args.keyword:
+            current["cases"] = {**baseline["cases"], **current["cases"]}
+        BASELINE_PATH.write_text(json.dumps(current, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nSaved {BASELINE_PATH.name}")
+        return
+
+    regressions = compare(baseline, current, args.tolerance)
+    if regressions:
+        print(f"\nRegressed past {args.tolerance:.0%}:")
+        for name, change in regressions.items():
+            print(f"  {name}: {change:+.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
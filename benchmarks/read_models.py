@@ -0,0 +1,122 @@
+"""CPU time and memory per operation: ORM instances vs Core read models.
+
+Each case runs the bot's per-update DB work both ways against in-memory
+SQLite: the ORM way (select(User) / session.add(Walk) + flush, which build
+instrumented instances and register them in the identity map) and the
+read-model way used by ``crud`` and the user directory (Core columns into
+frozen slotted dataclasses). Reported per operation: CPU time, and the
+peak memory traced while it runs.
+
+Usage:
+  python -m benchmarks.read_models
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database import crud
+from src.database.models import Base, DataVersion, User, Walk
+from src.database.readmodels import USER_COLUMNS, UserInfo
+from src.database.versions import WALKS_VERSION, bump_version
+
+USERS = 30
+ITERATIONS = 500
+
+
+# --- ORM implementation ---
+
+
+async def _orm_user(session: AsyncSession) -> None:
+    result = await session.execute(select(User).where(User.telegram_id == 7))
+    user = result.scalar_one()
+    user.language
+
+
+async def _orm_walk(session: AsyncSession) -> None:
+    walk = Walk(user_id=1, didnt_poop=True, is_finalized=True)
+    session.add(walk)
+    await session.flush()
+    # Same work as crud.create_walk, which records the finalized walk
+    await bump_version(session, WALKS_VERSION)
+    walk.id
+
+
+async def _orm_roster(session: AsyncSession) -> None:
+    result = await session.execute(select(User).where(User.is_active == True))
+    [user.language for user in result.scalars()]
+
+
+# --- read models ---
+
+
+async def _core_user(session: AsyncSession) -> None:
+    user = await crud.get_user_by_telegram_id(session, 7)
+    user.language
+
+
+async def _core_walk(session: AsyncSession) -> None:
+    walk = await crud.create_walk(session, 1, didnt_poop=True, is_finalized=True)
+    walk.id
+
+
+async def _core_roster(session: AsyncSession) -> None:
+    result = await session.execute(select(*USER_COLUMNS).where(User.is_active == True))
+    [UserInfo(*row).language for row in result]
+
+
+CASES = [
+    ("load user", _orm_user, _core_user),
+    ("insert walk", _orm_walk, _core_walk),
+    (f"load {USERS} users", _orm_roster, _core_roster),
+]
+
+
+async def _measure(func, engine) -> tuple[float, float]:
+    """Return (CPU µs per op, peak KiB traced per op)."""
+    async with AsyncSession(engine) as session:
+        for _ in range(20):
+            await func(session)
+        await session.rollback()
+
+        start = time.process_time()
+        for _ in range(ITERATIONS):
+            await func(session)
+        cpu = (time.process_time() - start) / ITERATIONS * 1e6
+        await session.rollback()
+
+        tracemalloc.start()
+        peak = 0
+        for _ in range(50):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            await func(session)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        await session.rollback()
+    return cpu, peak / 1024
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [{"telegram_id": i, "language": "en", "is_active": True} for i in range(1, USERS + 1)],
+        )
+        await conn.execute(insert(DataVersion).values(name=WALKS_VERSION, version=0))
+
+    print(f"{'case':<16}{'ORM µs':>10}{'read µs':>10}{'ORM KiB':>10}{'read KiB':>10}")
+    for name, orm, core in CASES:
+        orm_cpu, orm_mem = await _measure(orm, engine)
+        core_cpu, core_mem = await _measure(core, engine)
+        print(f"{name:<16}{orm_cpu:>10.1f}{core_cpu:>10.1f}{orm_mem:>10.1f}{core_mem:>10.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
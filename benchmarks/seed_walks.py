@@ -0,0 +1,186 @@
+"""Seed a database with synthetic walk histories for dashboard load tests.
+
+Adds --users users and about --walks finalized walks spread over the last
+--days days, in time order (so walk ids grow with time, as in production).
+The shape is meant to look like a real household:
+
+  - users join over the first half of the history and differ in activity
+    (log-normal weights: a couple of regulars, a tail of occasional walkers)
+  - hour of day follows HOUR_WEIGHTS: morning and evening peaks, a lunch
+    bump, almost nothing at night
+  - weekends get ~10% more walks
+  - "didn't poop" is likelier at night, "long walk" at weekends and midday
+
+Walks go in with multi-row INSERTs, --batch rows per transaction, so runs
+of tens of millions stream at constant memory. Both data versions are
+bumped afterwards, so a running bot and web app pick the new data up.
+
+The target is DATABASE_URL, or --database-url. --create first creates
+the tables (and data_versions rows) where missing, for a fresh local
+database; a MySQL database should normally be migrated by the bot instead.
+
+Usage:
+  python -m benchmarks.seed_walks --database-url sqlite+aiosqlite:///data/bench.db --create
+  python -m benchmarks.seed_walks --users 200 --walks 20000000 --days 3650
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database.models import Base, DataVersion, User, Walk
+from src.database.versions import USERS_VERSION, WALKS_VERSION, bump_version
+
+# Relative walk frequency per hour of day (index = hour)
+HOUR_WEIGHTS = (
+    1, 0.5, 0.2, 0.1, 0.1, 0.5, 4, 10, 12, 7, 3, 2,
+    4, 3, 2, 2, 3, 5, 9, 11, 8, 6, 4, 2,
+)
+WEEKEND_FACTOR = 1.1
+DIDNT_POOP_RATE = 0.12
+DIDNT_POOP_NIGHT_RATE = 0.3
+LONG_WALK_RATE = 0.12
+LONG_WALK_WEEKEND_RATE = 0.35
+LONG_WALK_MIDDAY_RATE = 0.25
+FIRST_TELEGRAM_ID = 900_000_000
+
+
+def _is_night(hour: int) -> bool:
+    return hour >= 22 or hour < 6
+
+
+def _user_rows(count: int, first_telegram_id: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "telegram_id": first_telegram_id + i,
+            "username": f"walker{first_telegram_id + i}",
+            "display_name": f"Walker {i + 1}" if rng.random() < 0.6 else None,
+            "language": "ru" if rng.random() < 0.7 else "en",
+            "is_active": rng.random() < 0.95,
+        }
+        for i in range(count)
+    ]
+
+
+def generate_walks(user_ids: list[int], walks: int, days: int, end: datetime, rng: random.Random):
+    """Yield walk rows in time order, about ``walks`` of them over ``days`` days before ``end``."""
+    first_day = (end - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Regulars join at the start, the rest over the first half of the history
+    joined = {user_id: 0 if rng.random() < 0.3 else rng.randrange(max(1, days // 2)) for user_id in user_ids}
+    weight = {user_id: rng.lognormvariate(0, 0.8) for user_id in user_ids}
+
+    day_weights = []
+    for day in range(days):
+        active = sum(weight[u] for u in user_ids if joined[u] <= day)
+        weekend = (first_day + timedelta(days=day)).weekday() >= 5
+        day_weights.append(active * (WEEKEND_FACTOR if weekend else 1))
+    scale = walks / sum(day_weights)
+    hours = range(24)
+
+    carry = 0.0
+    for day in range(days):
+        carry += day_weights[day] * scale
+        count = int(carry)
+        carry -= count
+        if not count:
+            continue
+        active = [u for u in user_ids if joined[u] <= day]
+        date = first_day + timedelta(days=day)
+        weekend = date.weekday() >= 5
+        walkers = rng.choices(active, weights=[weight[u] for u in active], k=count)
+        times = sorted(
+            (hour * 3600 + rng.randrange(3600), walker)
+            for hour, walker in zip(rng.choices(hours, weights=HOUR_WEIGHTS, k=count), walkers)
+        )
+        for seconds, walker in times:
+            hour = seconds // 3600
+            walked_at = date + timedelta(seconds=seconds)
+            if walked_at >= end:
+                return
+            long_rate = LONG_WALK_WEEKEND_RATE if weekend else (
+                LONG_WALK_MIDDAY_RATE if 10 <= hour < 16 else LONG_WALK_RATE
+            )
+            yield {
+                "user_id": walker,
+                "walked_at": walked_at,
+                "created_at": walked_at + timedelta(seconds=rng.randrange(30, 900)),
+                "didnt_poop": rng.random() < (DIDNT_POOP_NIGHT_RATE if _is_night(hour) else DIDNT_POOP_RATE),
+                "long_walk": rng.random() < long_rate,
+                "is_finalized": True,
+            }
+
+
+async def seed(url: str, users: int, walks: int, days: int, batch: int, seed: int, create: bool) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(url)
+    if create:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            existing = set((await conn.execute(select(DataVersion.name))).scalars())
+            missing = [{"name": name, "version": 0} for name in (USERS_VERSION, WALKS_VERSION) if name not in existing]
+            if missing:
+                await conn.execute(insert(DataVersion), missing)
+
+    async with engine.begin() as conn:
+        highest = (await conn.execute(select(func.max(User.telegram_id)))).scalar() or 0
+        first_telegram_id = max(FIRST_TELEGRAM_ID, highest + 1)
+        await conn.execute(insert(User), _user_rows(users, first_telegram_id, rng))
+        user_ids = list(
+            (await conn.execute(select(User.id).where(User.telegram_id >= first_telegram_id))).scalars()
+        )
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    started = time.perf_counter()
+    written = 0
+    rows = []
+    for row in generate_walks(user_ids, walks, days, end, rng):
+        rows.append(row)
+        if len(rows) == batch:
+            async with engine.begin() as conn:
+                await conn.execute(insert(Walk), rows)
+            written += len(rows)
+            rows = []
+            rate = written / (time.perf_counter() - started)
+            print(f"\r{written:,} / ~{walks:,} walks ({rate:,.0f}/s)", end="", file=sys.stderr)
+    if rows:
+        async with engine.begin() as conn:
+            await conn.execute(insert(Walk), rows)
+        written += len(rows)
+
+    async with AsyncSession(engine) as session:
+        await bump_version(session, USERS_VERSION)
+        await bump_version(session, WALKS_VERSION)
+        await session.commit()
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(f"\r{users} users and {written:,} walks over {days} days in {elapsed:.1f}s "
+          f"({written / elapsed:,.0f} walks/s)", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--walks", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--batch", type=int, default=5000, help="rows per INSERT transaction")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--create", action="store_true", help="create missing tables first")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("set DATABASE_URL or --database-url")
+    if args.users < 1 or args.days < 1:
+        parser.error("--users and --days must be positive")
+    asyncio.run(seed(args.database_url, args.users, args.walks, args.days, args.batch, args.seed, args.create))
+
+
+if __name__ == "__main__":
+    main()
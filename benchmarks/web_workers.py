@@ -0,0 +1,184 @@
+"""Dashboard API throughput as the number of uvicorn workers grows.
+
+Builds a throwaway SQLite database (a year of walks for a few users),
+then for each worker count starts ``uvicorn src.web.main:app --workers N``
+and drives ``/api/dashboard`` with concurrent clients for a fixed time.
+Each request sends a signed Telegram initData header (so it pays the
+access check) and asks for one of --ranges random date ranges (so workers
+keep computing new dashboards rather than only serving cached ones).
+
+With --shared-cache, workers share computed dashboards and verified
+initData through SHARED_CACHE_PATH; without it each worker caches alone.
+Throughput can only scale up to the number of CPU cores.
+
+Usage:
+  python -m benchmarks.web_workers [--workers 1,2,4] [--seconds 10]
+                                   [--clients 32] [--ranges 200] [--shared-cache]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import aiohttp
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.init_data import sign_init_data
+from src.database.models import Base, DataVersion, User, Walk
+from src.database.versions import USERS_VERSION, WALKS_VERSION
+from src.web.aggregates import AggregateStore
+
+BOT_TOKEN = "0:webbench"
+USERS = 6
+WALKS = 20_000
+FIRST_DAY = date(2025, 10, 1)
+
+
+async def _prepare_database(url: str, snapshot_path: str) -> None:
+    rng = random.Random(7)
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(DataVersion), [{"name": USERS_VERSION, "version": 0}, {"name": WALKS_VERSION, "version": 0}]
+        )
+        await conn.execute(
+            insert(User),
+            [{"telegram_id": 1000 + i, "username": f"walker{i}", "language": "en", "is_active": True}
+             for i in range(USERS)],
+        )
+        start = datetime.combine(FIRST_DAY, datetime.min.time())
+        await conn.execute(
+            insert(Walk),
+            [
+                {
+                    "user_id": rng.randint(1, USERS),
+                    "walked_at": start + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                    "didnt_poop": rng.random() < 0.1,
+                    "long_walk": rng.random() < 0.2,
+                    "is_finalized": True,
+                }
+                for _ in range(WALKS)
+            ],
+        )
+
+    # Workers start from the snapshot, never from the MySQL-only SQL queries
+    store = AggregateStore(snapshot_path)
+    async with AsyncSession(engine) as session:
+        await store.rebuild(session)
+    await store.save()
+    await engine.dispose()
+
+
+def _ranges(count: int) -> list[dict]:
+    rng = random.Random(11)
+    ranges = []
+    for _ in range(count):
+        start = FIRST_DAY + timedelta(days=rng.randrange(300))
+        params = {"start": str(start), "end": str(start + timedelta(days=rng.randrange(7, 60)))}
+        if rng.random() < 0.3:
+            params["user_id"] = rng.randint(1, USERS)
+        ranges.append(params)
+    return ranges
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, headers: dict) -> None:
+    async with aiohttp.ClientSession() as client:
+        for _ in range(200):
+            try:
+                async with client.get(f"{base_url}/api/dashboard", headers=headers) as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("web app did not start")
+
+
+async def _drive(base_url: str, headers: dict, ranges: list[dict], clients: int, seconds: float) -> list[float]:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: aiohttp.ClientSession, rng: random.Random) -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with client.get(f"{base_url}/api/dashboard", params=rng.choice(ranges), headers=headers) as resp:
+                await resp.read()
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status}")
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as client:
+        await asyncio.gather(*(client_loop(client, random.Random(i)) for i in range(clients)))
+    return latencies
+
+
+async def _run(workers: int, env: dict, args: argparse.Namespace, ranges: list[dict]) -> list[float]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.web.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    headers = {"X-Telegram-Init-Data": sign_init_data(BOT_TOKEN, 1000)}
+    try:
+        await _wait_ready(base_url, headers)
+        # Let every worker finish starting
+        await asyncio.sleep(1)
+        return await _drive(base_url, headers, ranges, args.clients, args.seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--ranges", type=int, default=200)
+    parser.add_argument("--shared-cache", action="store_true")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    url = f"sqlite+aiosqlite:///{directory}/web.db"
+    snapshot_path = f"{directory}/aggregates.bin"
+    await _prepare_database(url, snapshot_path)
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "BOT_TOKEN": BOT_TOKEN,
+        "ALLOWED_USERS": "[]",
+        "AGGREGATE_SNAPSHOT_PATH": snapshot_path,
+        "SHARED_CACHE_PATH": f"{directory}/cache.sqlite" if args.shared_cache else "",
+    }
+    ranges = _ranges(args.ranges)
+
+    print(f"CPU cores: {os.cpu_count()}, shared cache: {'on' if args.shared_cache else 'off'}")
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for workers in [int(n) for n in args.workers.split(",")]:
+        latencies = await _run(workers, env, args, ranges)
+        p50 = statistics.median(latencies) * 1000
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+        print(f"{workers:>8}{len(latencies) / args.seconds:>10.0f}{p50:>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
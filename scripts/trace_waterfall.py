@@ -0,0 +1,90 @@
+"""Print a trace from a TRACE_FILE as a waterfall.
+
+Shows the slowest trace (or the one given) as an indented span tree, each
+span with its offset from the trace start, duration and a bar.
+
+Usage:
+  python scripts/trace_waterfall.py data/traces.jsonl
+  python scripts/trace_waterfall.py data/traces.jsonl --trace <trace_id>
+  python scripts/trace_waterfall.py data/traces.jsonl --slowest 5 --name update
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+WIDTH = 40
+
+
+def load(path: str) -> dict[str, list[dict]]:
+    traces: dict[str, list[dict]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def roots(spans: list[dict]) -> list[dict]:
+    ids = {span["span_id"] for span in spans}
+    return [span for span in spans if span["parent_id"] not in ids]
+
+
+def render(spans: list[dict]) -> list[str]:
+    children: dict[str | None, list[dict]] = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+    top = sorted(roots(spans), key=lambda s: s["start"])
+    start = min(s["start"] for s in spans)
+    total = max(s["start"] * 1000 + s["duration_ms"] for s in spans) - start * 1000 or 1.0
+
+    lines = []
+
+    def walk(span: dict, depth: int) -> None:
+        offset = (span["start"] - start) * 1000
+        left = round(offset / total * WIDTH)
+        bar = " " * left + "█" * max(1, round(span["duration_ms"] / total * WIDTH))
+        attrs = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+        label = "  " * depth + span["name"] + (f" [{attrs}]" if attrs else "")
+        error = f"  ! {span['error']}" if span["error"] else ""
+        lines.append(f"{offset:>8.1f} {span['duration_ms']:>8.1f}  {bar[:WIDTH]:<{WIDTH}}  {label}{error}")
+        for child in sorted(children[span["span_id"]], key=lambda s: s["start"]):
+            walk(child, depth + 1)
+
+    for span in top:
+        walk(span, 0)
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL file written via TRACE_FILE")
+    parser.add_argument("--trace", help="trace id to show (default: the slowest)")
+    parser.add_argument("--slowest", type=int, default=1, help="show the N slowest traces")
+    parser.add_argument("--name", help="only traces whose root span starts with this name")
+    args = parser.parse_args()
+
+    traces = load(args.path)
+    if args.trace:
+        selected = [args.trace] if args.trace in traces else []
+    else:
+        candidates = [
+            trace_id for trace_id, spans in traces.items()
+            if not args.name or any(s["name"].startswith(args.name) for s in roots(spans))
+        ]
+        duration = lambda trace_id: max(s["duration_ms"] for s in roots(traces[trace_id]))
+        selected = sorted(candidates, key=duration, reverse=True)[:args.slowest]
+    if not selected:
+        raise SystemExit("No matching trace")
+
+    for trace_id in selected:
+        print(f"trace {trace_id}")
+        print(f"{'start ms':>8} {'dur ms':>8}  {'':<{WIDTH}}  span")
+        for line in render(traces[trace_id]):
+            print(line)
+        print()
+
+
+if __name__ == "__main__":
+    main()
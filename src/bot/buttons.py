@@ -0,0 +1,50 @@
+from typing import Any, Callable
+
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.filters import Filter
+from aiogram.types import Message
+
+from src.bot.i18n import TEXTS
+
+
+class ButtonIndex(Filter):
+    """Reverse index from every localized reply-button label to its handler.
+
+    Button handlers register with ``on`` (by i18n key, for every language
+    in TEXTS) or ``on_label`` (by literal label). Used as a message filter,
+    the index resolves the handler with one dict lookup and passes it on as
+    ``button_handler``; texts that are not button labels fail the filter and
+    fall through to the FSM state handlers. The cost per message stays the
+    same however many buttons or languages are added.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, CallableObject] = {}
+
+    def on(self, *keys: str) -> Callable:
+        """Register a handler for the buttons with these i18n keys."""
+        return self.on_label(*(texts[key] for key in keys for texts in TEXTS.values()))
+
+    def on_label(self, *labels: str) -> Callable:
+        """Register a handler for buttons with these literal labels."""
+
+        def decorator(callback: Callable) -> Callable:
+            handler = CallableObject(callback)
+            for label in labels:
+                if self._handlers.get(label, handler) is not handler:
+                    raise ValueError(f"Button label {label!r} is already registered")
+                self._handlers[label] = handler
+            return callback
+
+        return decorator
+
+    async def __call__(self, message: Message) -> bool | dict[str, Any]:
+        handler = self._handlers.get(message.text)
+        if handler is None:
+            return False
+        return {"button_handler": handler}
+
+
+async def dispatch_button(message: Message, button_handler: CallableObject, **data: Any) -> Any:
+    """Call the handler resolved by ButtonIndex with the data it asks for."""
+    return await button_handler.call(message, **data)
@@ -0,0 +1,89 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from aiogram.fsm.context import FSMContext
+
+from src.database.models import _utcnow
+
+WALK_TIMEOUT_MINUTES = 5
+
+_DRAFT_KEY = "draft"
+
+
+@dataclass
+class WalkDraft:
+    """A walk that has been started but not sent yet.
+
+    Drafts live in FSM storage rather than in the ``walks`` table: toggling
+    parameters or cancelling costs no DB writes, and the walk is inserted
+    once, already finalized, on Send or when ``expires_at`` is reached.
+    All datetimes are naive UTC, like the DB columns. ``message_id`` is the
+    bot message carrying the inline walk editor, once it has been sent.
+    """
+
+    walked_at: datetime
+    expires_at: datetime
+    didnt_poop: bool = False
+    long_walk: bool = False
+    message_id: int | None = None
+
+    @classmethod
+    def start(cls, walked_at: datetime | None = None) -> "WalkDraft":
+        """Create a draft that expires after WALK_TIMEOUT_MINUTES."""
+        now = _utcnow()
+        return cls(
+            walked_at=walked_at or now,
+            expires_at=now + timedelta(minutes=WALK_TIMEOUT_MINUTES),
+        )
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["walked_at"] = self.walked_at.isoformat()
+        data["expires_at"] = self.expires_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WalkDraft":
+        return cls(
+            walked_at=datetime.fromisoformat(data["walked_at"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            didnt_poop=data.get("didnt_poop", False),
+            long_walk=data.get("long_walk", False),
+            message_id=data.get("message_id"),
+        )
+
+
+def draft_from_data(data: dict) -> WalkDraft | None:
+    """Return the walk draft held in raw FSM data, if any."""
+    raw = data.get(_DRAFT_KEY)
+    return WalkDraft.from_dict(raw) if raw else None
+
+
+async def get_draft(state: FSMContext) -> WalkDraft | None:
+    """Return the user's pending walk draft, if any."""
+    return draft_from_data(await state.get_data())
+
+
+async def save_draft(state: FSMContext, draft: WalkDraft) -> None:
+    """Store (or overwrite) the user's walk draft."""
+    await state.update_data({_DRAFT_KEY: draft.to_dict()})
+
+
+async def pop_draft(state: FSMContext) -> WalkDraft | None:
+    """Remove and return the user's walk draft.
+
+    Of concurrent calls for one user (two Send taps, a tap and the expiry
+    timer, in one process or several) exactly one gets the draft, so a walk
+    is inserted once.
+    """
+    pop_value = getattr(state.storage, "pop_value", None)
+    if pop_value is not None:
+        raw = await pop_value(state.key, _DRAFT_KEY)
+    else:
+        # MemoryStorage (one process) never suspends between the read and
+        # the write, so nothing can interleave
+        data = await state.get_data()
+        raw = data.pop(_DRAFT_KEY, None)
+        if raw is not None:
+            await state.set_data(data)
+    return WalkDraft.from_dict(raw) if raw else None
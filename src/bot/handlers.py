@@ -3,15 +3,25 @@ from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from aiogram import Bot, F, Router
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.bot.buttons import ButtonIndex, dispatch_button
 from src.bot.config import settings
-from src.bot.i18n import TEXTS, get_text
-from src.bot.keyboards import ask_walk_keyboard, language_keyboard, main_keyboard, parameter_keyboard
+from src.bot.drafts import WalkDraft, get_draft, pop_draft, save_draft
+from src.bot.i18n import get_text, render
+from src.bot.keyboards import (
+    ask_walk_keyboard,
+    language_keyboard,
+    main_keyboard,
+    parameter_keyboard,
+    walk_editor_keyboard,
+)
 from src.bot.notifications import broadcast_walk
 from src.bot.scheduler import (
     cancel_walk_timer,
@@ -19,9 +29,11 @@ from src.bot.scheduler import (
 )
 from src.bot.utils import parse_time as _parse_time
 from src.database import crud
-from src.database.session import async_session
+from src.database.directory import directory
+from src.database.readmodels import UserInfo
 
 router = Router()
+buttons = ButtonIndex()
 
 
 class WalkStates(StatesGroup):
@@ -33,37 +45,47 @@ class WalkStates(StatesGroup):
 @router.message(Command("start"))
 async def cmd_start(message: Message, state: FSMContext) -> None:
     """Handle /start command - show language selection."""
-    await state.clear()
-    logger.info(f"User {message.from_user.id} ({message.from_user.username}) started bot")
+    await state.set_state(None)
+    logger.info("User {} ({}) started bot", message.from_user.id, message.from_user.username)
     await message.answer(
         text=get_text("welcome", "ru") + "\n" + get_text("welcome", "en"),
         reply_markup=language_keyboard(),
     )
 
 
-@router.message(F.text == "🇷🇺 Русский")
-async def set_russian(message: Message, state: FSMContext) -> None:
+@buttons.on_label("🇷🇺 Русский")
+async def set_russian(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Set Russian language."""
-    await _set_language(message, state, "ru")
+    await _set_language(message, state, session, user, "ru")
 
 
-@router.message(F.text == "🇬🇧 English")
-async def set_english(message: Message, state: FSMContext) -> None:
+@buttons.on_label("🇬🇧 English")
+async def set_english(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Set English language."""
-    await _set_language(message, state, "en")
+    await _set_language(message, state, session, user, "en")
 
 
-async def _set_language(message: Message, state: FSMContext, lang: str) -> None:
+async def _set_language(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None, lang: str
+) -> None:
     """Set user language and show main keyboard."""
-    await state.clear()
-    async with async_session() as session:
+    await state.set_state(None)
+    if user is None:
         user = await crud.get_or_create_user(
             session,
             telegram_id=message.from_user.id,
             username=message.from_user.username,
         )
+    if user.language != lang:
         await crud.set_user_language(session, user.id, lang)
-        logger.info(f"User {message.from_user.id} set language to {lang}")
+        logger.info("User {} set language to {}", message.from_user.id, lang)
+    # Commit before replying: users writes bump the shared users version
+    # row, which must not stay locked across a Telegram call
+    await session.commit()
 
     await message.answer(
         text=get_text("language_set", lang),
@@ -71,223 +93,239 @@ async def _set_language(message: Message, state: FSMContext, lang: str) -> None:
     )
 
 
-@router.message(F.text.in_({TEXTS["ru"]["walk_button"], TEXTS["en"]["walk_button"]}))
-async def start_walk(message: Message, state: FSMContext) -> None:
-    """Handle walk button press - create walk and show parameter keyboard."""
-    await state.clear()
+@buttons.on("walk_button")
+async def start_walk(message: Message, state: FSMContext, user: UserInfo | None) -> None:
+    """Handle walk button press - start a walk draft and show the walk editor."""
+    await state.set_state(None)
 
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            logger.warning(f"Unregistered user {message.from_user.id} tried to start walk")
-            await message.answer("Please /start first")
-            return
+    if user is None:
+        logger.warning("Unregistered user {} tried to start walk", message.from_user.id)
+        await message.answer("Please /start first")
+        return
 
-        lang = user.language
+    lang = user.language
 
-        # Check for existing pending walk
-        existing_walk = await crud.get_pending_walk(session, user.id)
-        if existing_walk:
-            logger.debug(f"User {user.telegram_id} has existing pending walk {existing_walk.id}")
-            await message.answer(
-                text=get_text("walk_started", lang),
-                reply_markup=parameter_keyboard(lang),
-            )
-            return
+    # Check for existing pending walk
+    draft = await get_draft(state)
+    if draft:
+        logger.debug("User {} already has a walk draft", user.telegram_id)
+        await _send_walk_editor(message, state, draft, get_text("walk_started", lang), lang)
+        return
 
-        # Create new walk
-        walk = await crud.create_walk(session, user.id)
-        logger.info(f"User {user.telegram_id} ({user.username}) started walk {walk.id}")
+    # Start a new draft; nothing is written to the DB until it is sent
+    draft = WalkDraft.start()
+    logger.info("User {} ({}) started a walk", user.telegram_id, user.username)
+    await _send_walk_editor(message, state, draft, get_text("walk_started", lang), lang)
 
-        # Schedule auto-finalization
-        await schedule_walk_finalization(user.id, walk.id)
+    # Schedule auto-finalization
+    await schedule_walk_finalization(user.telegram_id, draft.expires_at)
 
-        await message.answer(
-            text=get_text("walk_started", lang),
-            reply_markup=parameter_keyboard(lang),
-        )
+
+async def _send_walk_editor(
+    message: Message, state: FSMContext, draft: WalkDraft, text: str, lang: str
+) -> None:
+    """Send the walk message with its inline editor and save the draft pointing at it.
+
+    The walk's parameters, Send and Cancel are all handled by editing this
+    one message (see ``walk_editor_callback``).
+    """
+    sent = await message.answer(
+        text=text,
+        reply_markup=walk_editor_keyboard(lang, draft.didnt_poop, draft.long_walk),
+    )
+    draft.message_id = sent.message_id
+    await save_draft(state, draft)
 
 
-@router.message(F.text.in_({TEXTS["ru"]["walk_at_time_button"], TEXTS["en"]["walk_at_time_button"]}))
-async def walk_at_time(message: Message, state: FSMContext) -> None:
+@buttons.on("walk_at_time_button")
+async def walk_at_time(message: Message, state: FSMContext, user: UserInfo | None) -> None:
     """Handle 'log walk at time' button - enter time-input mode."""
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            logger.warning(f"Unregistered user {message.from_user.id} tried to log walk at time")
-            await message.answer("Please /start first")
-            return
-
-        lang = user.language
-
-        # If there's already a pending walk, just show parameter keyboard
-        existing_walk = await crud.get_pending_walk(session, user.id)
-        if existing_walk:
-            logger.debug(f"User {user.telegram_id} has existing pending walk {existing_walk.id}")
-            await message.answer(
-                text=get_text("walk_started", lang),
-                reply_markup=parameter_keyboard(lang),
-            )
-            return
+    if user is None:
+        logger.warning("Unregistered user {} tried to log walk at time", message.from_user.id)
+        await message.answer("Please /start first")
+        return
+
+    lang = user.language
+
+    # If there's already a pending walk, just show its editor again
+    draft = await get_draft(state)
+    if draft:
+        logger.debug("User {} already has a walk draft", user.telegram_id)
+        await _send_walk_editor(message, state, draft, get_text("walk_started", lang), lang)
+        return
 
     await state.set_state(WalkStates.awaiting_time)
-    logger.info(f"User {message.from_user.id} entered time-input mode")
+    logger.info("User {} entered time-input mode", message.from_user.id)
     await message.answer(text=get_text("enter_time_prompt", lang))
 
 
-@router.message(F.text.in_({TEXTS["ru"]["didnt_poop"], TEXTS["en"]["didnt_poop"]}))
-async def toggle_didnt_poop(message: Message, state: FSMContext) -> None:
+# The reply-button toggle/Send/Cancel handlers below serve parameter
+# keyboards sent before the inline walk editor existed.
+
+
+@buttons.on("didnt_poop")
+async def toggle_didnt_poop(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Toggle 'didn't poop' parameter."""
-    await _toggle_param(message, state, "didnt_poop")
+    await _toggle_param(message, state, session, user, "didnt_poop")
 
 
-@router.message(F.text.in_({TEXTS["ru"]["long_walk"], TEXTS["en"]["long_walk"]}))
-async def toggle_long_walk(message: Message, state: FSMContext) -> None:
+@buttons.on("long_walk")
+async def toggle_long_walk(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Toggle 'long walk' parameter."""
-    await _toggle_param(message, state, "long_walk")
+    await _toggle_param(message, state, session, user, "long_walk")
 
 
-async def _toggle_param(message: Message, state: FSMContext, param: str) -> None:
-    """Toggle a walk parameter."""
-    await state.clear()
+async def _toggle_param(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None, param: str
+) -> None:
+    """Toggle a parameter on the walk draft."""
+    await state.set_state(None)
 
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            await message.answer("Please /start first")
-            return
+    if user is None:
+        await message.answer("Please /start first")
+        return
 
-        lang = user.language
-        walk = await crud.get_pending_walk(session, user.id)
+    lang = user.language
+    draft = await get_draft(state)
 
-        if walk is None:
-            logger.debug(f"User {message.from_user.id} tried to toggle param without active walk")
-            await message.answer(
-                text=get_text("no_active_walk", lang),
-                reply_markup=main_keyboard(lang),
-            )
-            return
+    if draft is None:
+        logger.debug("User {} tried to toggle param without active walk", message.from_user.id)
+        await message.answer(
+            text=get_text("no_active_walk", lang),
+            reply_markup=main_keyboard(lang),
+        )
+        return
 
-        # Toggle the parameter
-        if param == "didnt_poop":
-            new_value = not walk.didnt_poop
-            await crud.update_walk_params(session, walk.id, didnt_poop=new_value)
-        elif param == "long_walk":
-            new_value = not walk.long_walk
-            await crud.update_walk_params(session, walk.id, long_walk=new_value)
+    # Toggle the parameter
+    if param == "didnt_poop":
+        draft.didnt_poop = new_value = not draft.didnt_poop
+    elif param == "long_walk":
+        draft.long_walk = new_value = not draft.long_walk
+    await save_draft(state, draft)
 
-        logger.debug(f"User {user.telegram_id} toggled {param}={new_value} for walk {walk.id}")
+    logger.debug("User {} toggled {}={}", user.telegram_id, param, new_value)
+    await session.commit()
 
-        await message.answer(
-            text=get_text("param_toggled", lang),
-            reply_markup=parameter_keyboard(lang),
-        )
+    await message.answer(
+        text=get_text("param_toggled", lang),
+        reply_markup=parameter_keyboard(lang),
+    )
 
 
-@router.message(F.text.in_({TEXTS["ru"]["send"], TEXTS["en"]["send"]}))
-async def send_walk(message: Message, state: FSMContext, bot: Bot) -> None:
+@buttons.on("send")
+async def send_walk(
+    message: Message, state: FSMContext, bot: Bot, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Finalize and send walk notification."""
-    await state.clear()
-
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            await message.answer("Please /start first")
-            return
-
-        lang = user.language
-        walk = await crud.get_pending_walk(session, user.id)
-
-        if walk is None:
-            logger.debug(f"User {message.from_user.id} tried to send without active walk")
-            await message.answer(
-                text=get_text("no_active_walk", lang),
-                reply_markup=main_keyboard(lang),
-            )
-            return
+    await state.set_state(None)
 
-        # Cancel the timer
-        await cancel_walk_timer(user.id)
+    if user is None:
+        await message.answer("Please /start first")
+        return
 
-        # Finalize the walk
-        walk = await crud.finalize_walk(session, walk.id)
-        logger.info(
-            f"User {user.telegram_id} ({user.username}) finalized walk {walk.id} "
-            f"[didnt_poop={walk.didnt_poop}, long_walk={walk.long_walk}]"
-        )
+    lang = user.language
+    draft = await pop_draft(state)
 
-        # Send confirmation
+    if draft is None:
+        logger.debug("User {} tried to send without active walk", message.from_user.id)
         await message.answer(
-            text=get_text("walk_sent", lang),
+            text=get_text("no_active_walk", lang),
             reply_markup=main_keyboard(lang),
         )
+        return
+
+    # Cancel the timer
+    await cancel_walk_timer(user.telegram_id)
+
+    # Insert the walk, already finalized
+    walk = await crud.create_walk(
+        session,
+        user.id,
+        walked_at=draft.walked_at,
+        didnt_poop=draft.didnt_poop,
+        long_walk=draft.long_walk,
+        is_finalized=True,
+    )
+    logger.info(
+        "User {} ({}) finalized walk {} [didnt_poop={}, long_walk={}]",
+        user.telegram_id, user.username, walk.id, walk.didnt_poop, walk.long_walk,
+    )
+    # Commit before anyone hears of the walk, and release the connection
+    # before the Telegram round trips
+    await session.commit()
 
-        # Broadcast to all users
-        await broadcast_walk(session, walk, user, bot)
-
+    # Send confirmation
+    await message.answer(
+        text=get_text("walk_sent", lang),
+        reply_markup=main_keyboard(lang),
+    )
 
-@router.message(F.text.in_({TEXTS["ru"]["cancel"], TEXTS["en"]["cancel"]}))
-async def cancel_walk(message: Message, state: FSMContext) -> None:
-    """Cancel the current pending walk."""
-    await state.clear()
+    # Broadcast to all users
+    await broadcast_walk(session, walk, user, bot)
 
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            await message.answer("Please /start first")
-            return
 
-        lang = user.language
-        walk = await crud.get_pending_walk(session, user.id)
+@buttons.on("cancel")
+async def cancel_walk(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
+    """Cancel the current walk draft."""
+    await state.set_state(None)
 
-        if walk is None:
-            await message.answer(
-                text=get_text("no_active_walk", lang),
-                reply_markup=main_keyboard(lang),
-            )
-            return
+    if user is None:
+        await message.answer("Please /start first")
+        return
 
-        await cancel_walk_timer(user.id)
-        await crud.delete_walk(session, walk.id)
-        logger.info(f"User {user.telegram_id} cancelled walk {walk.id}")
+    lang = user.language
+    draft = await pop_draft(state)
 
+    if draft is None:
         await message.answer(
-            text=get_text("walk_cancelled", lang),
+            text=get_text("no_active_walk", lang),
             reply_markup=main_keyboard(lang),
         )
+        return
+
+    await cancel_walk_timer(user.telegram_id)
+    logger.info("User {} cancelled walk", user.telegram_id)
+    await session.commit()
+
+    await message.answer(
+        text=get_text("walk_cancelled", lang),
+        reply_markup=main_keyboard(lang),
+    )
 
 
-@router.message(F.text.in_({TEXTS["ru"]["change_name_button"], TEXTS["en"]["change_name_button"]}))
-async def change_name(message: Message, state: FSMContext) -> None:
+@buttons.on("change_name_button")
+async def change_name(message: Message, state: FSMContext, user: UserInfo | None) -> None:
     """Handle 'change name' button - enter name-input mode."""
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            logger.warning(f"Unregistered user {message.from_user.id} tried to change name")
-            await message.answer("Please /start first")
-            return
+    if user is None:
+        logger.warning("Unregistered user {} tried to change name", message.from_user.id)
+        await message.answer("Please /start first")
+        return
 
-        lang = user.language
-        current = user.display_name or user.username or f"User {user.telegram_id}"
+    lang = user.language
+    current = user.display_name or user.username or f"User {user.telegram_id}"
 
     await state.set_state(WalkStates.awaiting_name)
-    logger.info(f"User {message.from_user.id} entered name-input mode")
-    await message.answer(text=get_text("change_name_prompt", lang).format(current=current))
+    logger.info("User {} entered name-input mode", message.from_user.id)
+    await message.answer(text=render("change_name_prompt", lang, current=current))
 
 
-@router.message(F.text.in_({TEXTS["ru"]["ask_walk_button"], TEXTS["en"]["ask_walk_button"]}))
-async def ask_walk(message: Message, state: FSMContext) -> None:
+@buttons.on("ask_walk_button")
+async def ask_walk(message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None) -> None:
     """Show inline keyboard for selecting walk request recipient."""
-    await state.clear()
+    await state.set_state(None)
 
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            await message.answer("Please /start first")
-            return
+    if user is None:
+        await message.answer("Please /start first")
+        return
 
-        lang = user.language
-        users = await crud.get_all_active_users(session)
+    lang = user.language
+    users = await directory.active_users(session)
 
     await message.answer(
         text=get_text("ask_walk_choose", lang),
@@ -295,111 +333,188 @@ async def ask_walk(message: Message, state: FSMContext) -> None:
     )
 
 
+@router.callback_query(F.data.startswith("walk:"))
+async def walk_editor_callback(
+    callback: CallbackQuery, state: FSMContext, bot: Bot, session: AsyncSession, user: UserInfo | None
+) -> None:
+    """Handle a press in the inline walk editor: toggle a flag, send or cancel."""
+    action = callback.data.split(":", 1)[1]
+
+    if user is None:
+        await callback.answer("Please /start first")
+        return
+
+    lang = user.language
+    draft = await get_draft(state)
+
+    if draft is None or draft.message_id != callback.message.message_id:
+        # Editor of a walk that was already sent, cancelled or superseded
+        await session.commit()
+        await callback.answer(get_text("no_active_walk", lang))
+        await callback.message.edit_reply_markup(reply_markup=None)
+        return
+
+    if action in ("didnt_poop", "long_walk"):
+        setattr(draft, action, not getattr(draft, action))
+        await save_draft(state, draft)
+        logger.debug("User {} toggled {}={}", user.telegram_id, action, getattr(draft, action))
+        # Release the draft's row and connection before the Telegram round trip
+        await session.commit()
+        await callback.message.edit_reply_markup(
+            reply_markup=walk_editor_keyboard(lang, draft.didnt_poop, draft.long_walk)
+        )
+        await callback.answer()
+        return
+
+    draft = await pop_draft(state)
+    if draft is None:
+        # Sent or finalized concurrently (another tap, the expiry timer)
+        await callback.answer(get_text("no_active_walk", lang))
+        return
+    await cancel_walk_timer(user.telegram_id)
+
+    if action == "cancel":
+        logger.info("User {} cancelled walk", user.telegram_id)
+        await session.commit()
+        await callback.message.edit_text(text=get_text("walk_cancelled", lang))
+        await callback.answer()
+        return
+
+    walk = await crud.create_walk(
+        session,
+        user.id,
+        walked_at=draft.walked_at,
+        didnt_poop=draft.didnt_poop,
+        long_walk=draft.long_walk,
+        is_finalized=True,
+    )
+    logger.info(
+        "User {} ({}) finalized walk {} [didnt_poop={}, long_walk={}]",
+        user.telegram_id, user.username, walk.id, walk.didnt_poop, walk.long_walk,
+    )
+    await session.commit()
+    # The walk is saved; a failed edit (e.g. the editor was deleted) must
+    # not keep it from being broadcast
+    try:
+        await callback.message.edit_text(text=get_text("walk_sent", lang))
+        await callback.answer()
+    except TelegramAPIError as e:
+        logger.warning("Could not confirm walk {} to user {}: {}", walk.id, user.telegram_id, e)
+
+    await broadcast_walk(session, walk, user, bot)
+
+
 @router.callback_query(F.data.startswith("ask_walk:"))
-async def ask_walk_callback(callback: CallbackQuery, bot: Bot) -> None:
+async def ask_walk_callback(
+    callback: CallbackQuery, bot: Bot, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Send walk request to selected user(s)."""
     target = callback.data.split(":", 1)[1]
 
-    async with async_session() as session:
-        requester = await crud.get_user_by_telegram_id(session, callback.from_user.id)
-        if requester is None:
-            await callback.answer("Please /start first")
-            return
+    requester = user
+    if requester is None:
+        await callback.answer("Please /start first")
+        return
 
-        lang = requester.language
-        requester_name = (
-            requester.display_name or requester.username or f"User {requester.telegram_id}"
-        )
+    lang = requester.language
+    requester_name = (
+        requester.display_name or requester.username or f"User {requester.telegram_id}"
+    )
 
-        if target == "all":
-            recipients = await crud.get_all_active_users(session)
-        else:
-            target_user = await crud.get_user_by_telegram_id(session, int(target))
-            recipients = [target_user] if target_user else []
+    if target == "all":
+        recipients = await directory.active_users(session)
+    else:
+        target_user = await directory.get(session, int(target))
+        recipients = [target_user] if target_user else []
 
     sent = 0
+    messages: dict[str, str] = {}
     for recipient in recipients:
-        msg = get_text("ask_walk_request", recipient.language).format(requester=requester_name)
+        msg = messages.get(recipient.language)
+        if msg is None:
+            msg = messages[recipient.language] = render(
+                "ask_walk_request", recipient.language, requester=requester_name
+            )
         try:
             await bot.send_message(chat_id=recipient.telegram_id, text=msg)
             sent += 1
         except Exception as e:
-            logger.warning(f"Failed to send walk request to {recipient.telegram_id}: {e}")
+            logger.warning("Failed to send walk request to {}: {}", recipient.telegram_id, e)
 
-    logger.info(f"User {callback.from_user.id} sent walk request to {target!r} ({sent} delivered)")
+    logger.info("User {} sent walk request to {!r} ({} delivered)", callback.from_user.id, target, sent)
     await callback.answer(get_text("ask_walk_sent", lang))
     # Remove inline keyboard after selection
     await callback.message.edit_reply_markup(reply_markup=None)
 
 
+# --- reply-button dispatch: a single handler routes every button label ---
+
+router.message.register(dispatch_button, buttons)
+
+
 # --- FSM state handlers: registered after button handlers, before the catch-all ---
 
 
 @router.message(WalkStates.awaiting_time)
-async def handle_time_input(message: Message, state: FSMContext) -> None:
+async def handle_time_input(message: Message, state: FSMContext, user: UserInfo | None) -> None:
     """Process time input from a user in time-entry mode."""
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            return
+    if user is None:
+        return
 
-        lang = user.language
-        parsed = _parse_time(message.text or "")
+    lang = user.language
+    parsed = _parse_time(message.text or "")
 
-        if parsed is None:
-            logger.debug(f"User {message.from_user.id} sent unparseable time: {message.text!r}")
-            await message.answer(text=get_text("invalid_time", lang))
-            return
+    if parsed is None:
+        logger.debug("User {} sent unparseable time: {!r}", message.from_user.id, message.text)
+        await message.answer(text=get_text("invalid_time", lang))
+        return
 
-        # Create walk with the custom time
-        walk = await crud.create_walk(session, user.id)
-        await crud.update_walk_time(session, walk.id, parsed)
+    await state.set_state(None)
+    logger.info("User {} set walk time to {}", user.telegram_id, parsed)
 
-        await state.clear()
-        logger.info(f"User {user.telegram_id} set walk {walk.id} time to {parsed}")
+    # Build confirmation — append "(yesterday)" when date differs
+    # parsed is naive UTC; convert to local time for display
+    tz = ZoneInfo(settings.display_timezone)
+    local_time = parsed.replace(tzinfo=timezone.utc).astimezone(tz)
+    time_str = local_time.strftime("%H:%M")
+    if local_time.date() < datetime.now(tz).date():
+        time_str += f" ({get_text('yesterday', lang)})"
 
-        # Schedule auto-finalization
-        await schedule_walk_finalization(user.id, walk.id)
+    # Start a draft with the custom time
+    draft = WalkDraft.start(walked_at=parsed)
+    await _send_walk_editor(message, state, draft, render("time_set", lang, time=time_str), lang)
 
-        # Build confirmation — append "(yesterday)" when date differs
-        # parsed is naive UTC; convert to local time for display
-        tz = ZoneInfo(settings.display_timezone)
-        local_time = parsed.replace(tzinfo=timezone.utc).astimezone(tz)
-        time_str = local_time.strftime("%H:%M")
-        if local_time.date() < datetime.now(tz).date():
-            time_str += f" ({get_text('yesterday', lang)})"
-
-        await message.answer(
-            text=get_text("time_set", lang).format(time=time_str),
-            reply_markup=parameter_keyboard(lang),
-        )
+    # Schedule auto-finalization
+    await schedule_walk_finalization(user.telegram_id, draft.expires_at)
 
 
 @router.message(WalkStates.awaiting_name)
-async def handle_name_input(message: Message, state: FSMContext) -> None:
+async def handle_name_input(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserInfo | None
+) -> None:
     """Process name input from a user in name-entry mode."""
-    async with async_session() as session:
-        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
-        if user is None:
-            return
+    if user is None:
+        return
 
-        lang = user.language
-        name = (message.text or "").strip()
+    lang = user.language
+    name = (message.text or "").strip()
 
-        if not name:
-            await message.answer(text=get_text("invalid_name", lang))
-            return
+    if not name:
+        await message.answer(text=get_text("invalid_name", lang))
+        return
 
-        if len(name) > 30 or not re.fullmatch(r"[\w\s]+", name, re.UNICODE):
-            await message.answer(text=get_text("invalid_name_format", lang))
-            return
+    if len(name) > 30 or not re.fullmatch(r"[\w\s]+", name, re.UNICODE):
+        await message.answer(text=get_text("invalid_name_format", lang))
+        return
 
+    if name != user.display_name:
         await crud.set_display_name(session, user.id, name)
 
-    await state.clear()
-    logger.info(f"User {message.from_user.id} set display name to {name!r}")
+    await state.set_state(None)
+    await session.commit()
+    logger.info("User {} set display name to {!r}", message.from_user.id, name)
     await message.answer(
-        text=get_text("name_set", lang).format(name=name),
+        text=render("name_set", lang, name=name),
         reply_markup=main_keyboard(lang),
     )
 
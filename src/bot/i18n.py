@@ -1,3 +1,5 @@
+from string import Formatter
+
 TEXTS: dict[str, dict[str, str]] = {
     "ru": {
         "welcome": "Привет! Выберите язык:",
@@ -92,6 +94,42 @@ TEXTS: dict[str, dict[str, str]] = {
 }
 
 
+class Template:
+    """A catalog entry compiled once at import.
+
+    ``render`` is bound straight to ``str.format`` for texts with
+    placeholders; texts without any return the stored string as is.
+    """
+
+    __slots__ = ("text", "fields", "render")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.fields = frozenset(
+            field for _, field, _, _ in Formatter().parse(text) if field is not None
+        )
+        self.render = text.format if self.fields else self._static
+
+    def _static(self, **kwargs) -> str:
+        return self.text
+
+
+# Per-language catalogs, with missing keys already filled in from "ru", so a
+# lookup is a single dict access.
+CATALOGS: dict[str, dict[str, Template]] = {
+    lang: {key: Template(text) for key, text in (TEXTS["ru"] | texts).items()}
+    for lang, texts in TEXTS.items()
+}
+_DEFAULT_CATALOG = CATALOGS["ru"]
+
+
 def get_text(key: str, lang: str = "ru") -> str:
     """Get localized text by key."""
-    return TEXTS.get(lang, TEXTS["ru"]).get(key, key)
+    template = CATALOGS.get(lang, _DEFAULT_CATALOG).get(key)
+    return template.text if template is not None else key
+
+
+def render(key: str, lang: str = "ru", **kwargs) -> str:
+    """Get localized text by key with its placeholders filled in."""
+    template = CATALOGS.get(lang, _DEFAULT_CATALOG).get(key)
+    return template.render(**kwargs) if template is not None else key
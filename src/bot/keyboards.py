@@ -1,9 +1,17 @@
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, WebAppInfo
 
 from src.bot.config import settings
 from src.bot.i18n import get_text
 
+# Reply keyboards only depend on the language (and the Mini App URL), so each
+# variant is built once and the same markup object is reused for every
+# message. Keying on webapp_url means a new tunnel URL simply produces a new
+# cache entry.
+
 
+@lru_cache(maxsize=1)
 def language_keyboard() -> ReplyKeyboardMarkup:
     """Keyboard for language selection."""
     return ReplyKeyboardMarkup(
@@ -20,17 +28,22 @@ def language_keyboard() -> ReplyKeyboardMarkup:
 
 def main_keyboard(lang: str = "ru") -> ReplyKeyboardMarkup:
     """Main keyboard with walk buttons."""
+    return _main_keyboard(lang, settings.webapp_url)
+
+
+@lru_cache(maxsize=16)
+def _main_keyboard(lang: str, webapp_url: str) -> ReplyKeyboardMarkup:
     rows = [
         [KeyboardButton(text=get_text("walk_button", lang))],
         [KeyboardButton(text=get_text("walk_at_time_button", lang))],
         [KeyboardButton(text=get_text("ask_walk_button", lang))],
         [KeyboardButton(text=get_text("change_name_button", lang))],
     ]
-    if settings.webapp_url:
+    if webapp_url:
         rows.append([
             KeyboardButton(
                 text=get_text("stats_button", lang),
-                web_app=WebAppInfo(url=settings.webapp_url),
+                web_app=WebAppInfo(url=webapp_url),
             )
         ])
     return ReplyKeyboardMarkup(keyboard=rows, resize_keyboard=True)
@@ -49,6 +62,7 @@ def ask_walk_keyboard(users: list, lang: str = "ru") -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=16)
 def parameter_keyboard(lang: str = "ru") -> ReplyKeyboardMarkup:
     """Keyboard for selecting walk parameters."""
     return ReplyKeyboardMarkup(
@@ -64,3 +78,22 @@ def parameter_keyboard(lang: str = "ru") -> ReplyKeyboardMarkup:
         ],
         resize_keyboard=True,
     )
+
+
+@lru_cache(maxsize=32)
+def walk_editor_keyboard(lang: str = "ru", didnt_poop: bool = False, long_walk: bool = False) -> InlineKeyboardMarkup:
+    """Inline keyboard under the walk message; flags that are set are checked."""
+
+    def flag(key: str, value: bool) -> InlineKeyboardButton:
+        mark = "☑" if value else "☐"
+        return InlineKeyboardButton(text=f"{mark} {get_text(key, lang)}", callback_data=f"walk:{key}")
+
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [flag("didnt_poop", didnt_poop), flag("long_walk", long_walk)],
+            [
+                InlineKeyboardButton(text=get_text("send", lang), callback_data="walk:send"),
+                InlineKeyboardButton(text=get_text("cancel", lang), callback_data="walk:cancel"),
+            ],
+        ]
+    )
@@ -0,0 +1,150 @@
+import glob
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any
+
+from loguru import logger
+
+# Records at or above this level take the place of the oldest queued line
+# when the queue is full, instead of being dropped.
+_KEEP_LEVEL_NO = logging.WARNING
+_BATCH_SIZE = 256
+
+_STOP = object()
+
+
+class QueueWriter:
+    """Loguru sink that hands formatted lines to a background writer thread.
+
+    ``write`` runs on the event loop and only enqueues, never waiting; the
+    disk or terminal I/O happens on the thread. The queue is bounded: when
+    it is full, DEBUG and INFO lines are dropped, while WARNING and above
+    evict the oldest queued line instead. Dropped lines are counted and
+    reported in the output once there is room again.
+    """
+
+    def __init__(self, target: Any, maxsize: int = 10_000, name: str = "log-writer") -> None:
+        self.dropped = 0
+        self._target = target
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._reported = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+            return
+        except queue.Full:
+            pass
+
+        self.dropped += 1
+        record = getattr(message, "record", None)
+        if record is not None and record["level"].no >= _KEEP_LEVEL_NO:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(message)
+            except queue.Full:
+                self.dropped += 1
+
+    def stop(self) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        close = getattr(self._target, "close", None)
+        if callable(close):
+            close()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for message in batch:
+                if message is _STOP:
+                    self._flush()
+                    return
+                self._target.write(message)
+
+            dropped = self.dropped
+            if dropped != self._reported:
+                self._target.write(f"... {dropped - self._reported} log records dropped (queue full)\n")
+                self._reported = dropped
+            self._flush()
+
+    def _flush(self) -> None:
+        flush = getattr(self._target, "flush", None)
+        if callable(flush):
+            flush()
+
+
+def sink_levels(level: str, module_levels: dict[str, str]) -> tuple[str, dict[str, str] | None]:
+    """Loguru ``level`` and ``filter`` for a sink with per-module overrides.
+
+    Loguru drops records below the sink's level before its filter runs, so
+    an override below ``level`` (e.g. one module at DEBUG) needs a lower
+    sink level: the sink gets the lowest level in use, and the filter's ""
+    entry holds every other module at ``level``.
+    """
+    if not module_levels:
+        return level, None
+    levels = {"": level, **module_levels}
+    return min(levels.values(), key=lambda name: logger.level(name).no), levels
+
+
+class RotatingFile:
+    """Size-rotated, gzip-compressed log file with a ``write(str)`` interface.
+
+    Thin wrapper over the stdlib RotatingFileHandler so it can sit behind a
+    QueueWriter; rotated files are compressed to ``<name>.N.gz``. At most
+    ``backup_count`` backups are kept, and with ``max_age`` (seconds) older
+    ones are deleted at each rotation.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, max_age: float | None = None) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_age = max_age
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        self._handler.terminator = ""
+        self._handler.namer = lambda name: name + ".gz"
+        self._handler.rotator = self._rotate
+
+    def write(self, message: str) -> None:
+        self._handler.emit(logging.makeLogRecord({"msg": str(message)}))
+
+    def flush(self) -> None:
+        self._handler.flush()
+
+    def close(self) -> None:
+        self._handler.close()
+
+    def _rotate(self, source: str, dest: str) -> None:
+        _gzip_rotate(source, dest)
+        if self.max_age is None:
+            return
+        cutoff = time.time() - self.max_age
+        for backup in glob.glob(glob.escape(self.path) + ".*.gz"):
+            if os.path.getmtime(backup) < cutoff:
+                os.remove(backup)
+
+
+def _gzip_rotate(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
@@ -1,45 +1,175 @@
 import asyncio
+import signal
 import sys
 from pathlib import Path
+from urllib.parse import urlsplit
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
 from aiogram.types import MenuButtonWebApp, WebAppInfo
 from loguru import logger
 
+from src import tracing
 from src.bot.config import settings
 from src.bot.handlers import router
-from src.bot.middleware import WhitelistMiddleware
+from src.bot.log_sinks import QueueWriter, RotatingFile, sink_levels
+from src.bot.metrics import (
+    MetricsMiddleware,
+    TelegramMetricsMiddleware,
+    observe_db_statement,
+    start_metrics_server,
+)
+from src.bot.middleware import (
+    DbSessionMiddleware,
+    HandlerTracingMiddleware,
+    TelegramTracingMiddleware,
+    UpdateTracingMiddleware,
+    WhitelistMiddleware,
+)
+from src.bot.notifications import coalescer
 from src.bot.scheduler import init_scheduler, stop_scheduler
-from src.database.session import run_migrations
+from src.bot.storage import SqlStorage
+from src.database.lease import LeaderLease
+from src.database.session import async_session, enable_statement_timing, run_migrations
+from src.tracing import JsonlExporter
 
 TUNNEL_URL_FILE = Path("/shared/tunnel_url")
+# How often a polling replica checks that it still leads, and a standby
+# whether it has taken over
+LEADER_CHECK_SECONDS = 1.0
 
 
 def setup_logging() -> None:
-    """Configure loguru for console and file output."""
+    """Configure loguru for console and file output.
+
+    Both sinks hand formatted lines to background writer threads, so disk
+    and terminal I/O never run on the event loop.
+    """
     # Remove default handler
     logger.remove()
 
     # Console handler with colors
+    level, module_filter = sink_levels(settings.log_level, settings.log_module_levels)
     logger.add(
-        sys.stderr,
+        QueueWriter(sys.stderr, maxsize=settings.log_queue_size, name="log-console"),
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO",
+        level=level,
+        filter=module_filter,
         colorize=True,
     )
 
-    # File handler with rotation
+    # File handler: 10 MB files, gzipped backups kept for 7 days
+    level, module_filter = sink_levels(settings.log_file_level, settings.log_module_levels)
     logger.add(
-        "data/bot.log",
+        QueueWriter(
+            RotatingFile("data/bot.log", max_bytes=10 * 1024 * 1024, backup_count=1000, max_age=7 * 24 * 3600),
+            maxsize=settings.log_queue_size,
+            name="log-file",
+        ),
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="DEBUG",
-        rotation="10 MB",
-        retention="7 days",
-        compression="zip",
+        level=level,
+        filter=module_filter,
+        colorize=False,
     )
 
 
+def create_dispatcher() -> Dispatcher:
+    """Build the dispatcher with its FSM storage, middlewares and handlers.
+
+    Also used by the offline load test, so it exercises the same wiring.
+    """
+    # MemoryStorage is sufficient for a single process; the DB storage keeps
+    # states across restarts and shares them between bot processes.
+    if settings.fsm_storage == "db":
+        storage = SqlStorage(async_session, cache_ttl=settings.fsm_cache_ttl)
+    else:
+        storage = MemoryStorage()
+    # One update at a time per user within a process; across processes, the
+    # DB storage claims walk drafts atomically (see pop_draft)
+    dp = Dispatcher(storage=storage, events_isolation=SimpleEventIsolation())
+    if settings.trace_file:
+        # First, so the update's root span covers every other middleware
+        dp.update.outer_middleware(UpdateTracingMiddleware())
+    dp.update.outer_middleware(WhitelistMiddleware())
+    dp.update.middleware(DbSessionMiddleware())
+    dp.include_router(router)
+    return dp
+
+
+def enable_tracing(bot: Bot) -> None:
+    """Add handler and Bot API spans below the update spans of ``create_dispatcher``."""
+    router.message.middleware(HandlerTracingMiddleware())
+    router.callback_query.middleware(HandlerTracingMiddleware())
+    bot.session.middleware(TelegramTracingMiddleware())
+
+
+def trace_db_statement(operation: str, seconds: float | None) -> None:
+    """Statement hook for ``enable_statement_timing``: a span per statement."""
+    tracing.record(f"db.{operation}", seconds)
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Serve the webhook until SIGINT/SIGTERM.
+
+    Every replica registers the same URL; Telegram delivers each update to
+    it once, and whichever replica receives it handles it.
+    """
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+    from aiohttp import web
+
+    secret = settings.webhook_secret or None
+    app = web.Application()
+    SimpleRequestHandler(dp, bot, secret_token=secret).register(app, path=urlsplit(settings.webhook_url).path or "/")
+    setup_application(app, dp, bot=bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, settings.webhook_host, settings.webhook_port).start()
+        await bot.set_webhook(
+            settings.webhook_url, secret_token=secret, allowed_updates=dp.resolve_used_update_types()
+        )
+        logger.info("Receiving updates at {} (port {})", settings.webhook_url, settings.webhook_port)
+        await _stop_event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def poll_while_leader(dp: Dispatcher, bot: Bot, lease: LeaderLease, stop: asyncio.Event) -> None:
+    """Long-poll for updates whenever this replica holds ``lease``, until ``stop``.
+
+    Telegram answers concurrent getUpdates calls with 409 Conflict, so of
+    several replicas only the leader polls; a standby starts polling once
+    it takes the lease over. To spread updates over replicas, use a webhook.
+    """
+    stopping = asyncio.create_task(stop.wait())
+    try:
+        while not stop.is_set():
+            if not lease.is_leader:
+                await asyncio.wait([stopping], timeout=LEADER_CHECK_SECONDS)
+                continue
+
+            logger.info("Leading: polling for updates")
+            polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False))
+            while lease.is_leader and not stop.is_set() and not polling.done():
+                await asyncio.wait([polling, stopping], timeout=LEADER_CHECK_SECONDS)
+            if not polling.done():
+                await dp.stop_polling()
+            await polling
+            if not stop.is_set():
+                logger.info("Lost leadership: stopped polling")
+    finally:
+        stopping.cancel()
+
+
+def _stop_event() -> asyncio.Event:
+    """An event set on SIGINT or SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    return stop
+
+
 async def get_webapp_url() -> str:
     """Get webapp URL from config or shared tunnel file."""
     if settings.webapp_url:
@@ -70,13 +200,26 @@ async def main() -> None:
     run_migrations()
     logger.info("Database migrated")
 
-    # Create bot and dispatcher with FSM storage
-    # MemoryStorage is sufficient for a small private bot; swap to RedisStorage
-    # for multi-process or persistence-across-restart requirements.
     bot = Bot(token=settings.bot_token)
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.update.outer_middleware(WhitelistMiddleware())
-    dp.include_router(router)
+    dp = create_dispatcher()
+
+    metrics_runner = None
+    statement_observers = []
+    if settings.metrics_enabled:
+        router.message.middleware(MetricsMiddleware())
+        router.callback_query.middleware(MetricsMiddleware())
+        bot.session.middleware(TelegramMetricsMiddleware())
+        statement_observers.append(observe_db_statement)
+        metrics_runner = await start_metrics_server(settings.metrics_host, settings.metrics_port)
+
+    if settings.trace_file:
+        tracing.configure(JsonlExporter(settings.trace_file))
+        enable_tracing(bot)
+        statement_observers.append(trace_db_statement)
+        logger.info("Writing traces to {}", settings.trace_file)
+
+    if statement_observers:
+        enable_statement_timing(*statement_observers)
 
     # Resolve webapp URL (from env or tunnel shared file)
     webapp_url = await get_webapp_url()
@@ -88,22 +231,36 @@ async def main() -> None:
                 web_app=WebAppInfo(url=webapp_url),
             )
         )
-        logger.info(f"Menu button set to {webapp_url}")
+        logger.info("Menu button set to {}", webapp_url)
 
     # Initialize scheduler
-    await init_scheduler(bot)
+    lease = None
+    if settings.fsm_storage == "db":
+        # Replicas sharing the DB storage elect one leader for timers and sweeps
+        lease = LeaderLease(async_session, ttl=settings.leader_lease_seconds)
+    await init_scheduler(bot, dp.storage, lease)
     logger.info("Scheduler initialized")
 
     try:
-        # Start polling
         logger.info("Bot is running...")
-        await dp.start_polling(bot)
+        if settings.webhook_url:
+            await run_webhook(dp, bot)
+        elif lease is not None:
+            await poll_while_leader(dp, bot, lease, _stop_event())
+        else:
+            await dp.start_polling(bot)
     except Exception as e:
-        logger.exception(f"Bot stopped with error: {e}")
+        logger.exception("Bot stopped with error: {}", e)
     finally:
         logger.info("Shutting down...")
         await stop_scheduler()
+        await coalescer.flush_all()
         await bot.session.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        tracing.shutdown()
+        # Flushes and joins the background log writers
+        logger.remove()
 
 
 if __name__ == "__main__":
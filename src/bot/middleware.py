@@ -1,10 +1,17 @@
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
 from aiogram.types import TelegramObject, Update
 from loguru import logger
 
+from src import tracing
 from src.bot.config import settings
+from src.bot.storage import current_session
+from src.database.directory import directory
+from src.database.session import async_session
 
 
 class WhitelistMiddleware(BaseMiddleware):
@@ -27,7 +34,104 @@ class WhitelistMiddleware(BaseMiddleware):
                 user = event.callback_query.from_user
 
             if user and user.id not in settings.allowed_users:
-                logger.warning(f"Blocked update from non-whitelisted user {user.id} ({user.username})")
+                logger.warning("Blocked update from non-whitelisted user {} ({})", user.id, user.username)
                 return None
 
         return await handler(event, data)
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """Open one DB session per update and resolve the sender's user once.
+
+    Handlers receive ``session`` and ``user`` (a cached ``UserInfo``, or
+    ``None`` for unregistered senders) in their data. The user comes from the
+    process-local directory, so most updates never touch the DB. The session
+    is committed after the handler returns; an exception rolls back whatever
+    the handler has not committed yet. The DB-backed FSM storage joins the
+    same session, except for aiogram's FSM middleware, which runs before
+    this one and reads the current state on a short session of its own.
+
+    Handlers commit themselves before talking to Telegram: nobody hears of
+    a change that could still roll back, and no row lock or pooled
+    connection is held across a Telegram round trip.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        async with async_session() as session:
+            token = current_session.set(session)
+            try:
+                from_user = data.get("event_from_user")
+                data["session"] = session
+                data["user"] = await directory.get(session, from_user.id) if from_user else None
+                result = await handler(event, data)
+                await session.commit()
+                return result
+            finally:
+                current_session.reset(token)
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """Open the root span of each update's trace.
+
+    Registered as the first outer update middleware, so the span covers
+    everything the update causes, including Bot API calls and tasks it
+    starts (e.g. notification digests).
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        with tracing.span(
+            "update",
+            update_id=getattr(event, "update_id", None),
+            type=getattr(event, "event_type", None),
+            user_id=from_user.id if from_user else None,
+        ):
+            return await handler(event, data)
+
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    """Span named after the handler that processes the update.
+
+    An inner middleware on router observers, like ``MetricsMiddleware``,
+    so the handler has already been chosen.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        target = data.get("button_handler") or data.get("handler")
+        name = getattr(getattr(target, "callback", None), "__name__", "unknown")
+        with tracing.span(f"handler.{name}"):
+            return await handler(event, data)
+
+
+class TelegramTracingMiddleware(BaseRequestMiddleware):
+    """Span per Bot API call, e.g. ``telegram.SendMessage`` with its chat.
+
+    Only calls made within a trace are recorded; polling (getUpdates) and
+    startup calls are not.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if tracing.current_span() is None:
+            return await make_request(bot, method)
+        with tracing.span(f"telegram.{type(method).__name__}", chat_id=getattr(method, "chat_id", None)):
+            return await make_request(bot, method)
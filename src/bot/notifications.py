@@ -1,3 +1,5 @@
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
@@ -6,18 +8,109 @@ from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.config import settings
-from src.bot.i18n import get_text
-from src.database import crud
+from src.bot.i18n import get_text, render
+from src.database.directory import directory
+from src.database.readmodels import UserInfo, WalkInfo
+from src.tracing import traced
 
 
-async def broadcast_walk(session: AsyncSession, walk, walker_user, bot: Bot) -> None:
+@dataclass
+class _Window:
+    closes_at: float
+    pending: list[str] = field(default_factory=list)
+    flush: asyncio.Task | None = None
+
+
+class NotificationCoalescer:
+    """Merge a recipient's notifications that arrive within ``window`` seconds.
+
+    The first notification goes out at once and opens a window for that
+    recipient; later ones inside the window are held back and sent as one
+    digest message when it closes. A recipient gets at most two messages
+    per window however many walks are logged, instead of one per walk.
+    Windows are per process. ``window`` of 0 sends everything at once.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._windows: dict[int, _Window] = {}
+        self._bot: Bot | None = None
+
+    async def send(self, bot: Bot, chat_id: int, text: str) -> None:
+        """Send ``text`` now, or hold it for the recipient's digest."""
+        if self.window <= 0:
+            await bot.send_message(chat_id=chat_id, text=text)
+            return
+
+        self._bot = bot
+        now = asyncio.get_running_loop().time()
+        window = self._windows.get(chat_id)
+        if window is None or now >= window.closes_at:
+            self._windows[chat_id] = _Window(closes_at=now + self.window)
+            await bot.send_message(chat_id=chat_id, text=text)
+            return
+
+        window.pending.append(text)
+        if window.flush is None:
+            window.flush = asyncio.create_task(self._flush_at_close(chat_id, window))
+
+    async def flush_all(self) -> None:
+        """Send every held digest now (on shutdown)."""
+        for chat_id, window in list(self._windows.items()):
+            if window.flush is not None:
+                window.flush.cancel()
+                await self._send_digest(chat_id, window)
+
+    async def _flush_at_close(self, chat_id: int, window: _Window) -> None:
+        await asyncio.sleep(window.closes_at - asyncio.get_running_loop().time())
+        await self._send_digest(chat_id, window)
+
+    async def _send_digest(self, chat_id: int, window: _Window) -> None:
+        if self._windows.get(chat_id) is window:
+            del self._windows[chat_id]
+        try:
+            await self._bot.send_message(chat_id=chat_id, text="\n\n".join(window.pending))
+            logger.debug("Sent digest of {} notifications to user {}", len(window.pending), chat_id)
+        except Exception as e:
+            logger.warning("Failed to send notification digest to user {}: {}", chat_id, e)
+
+
+coalescer = NotificationCoalescer(settings.notify_coalesce_seconds)
+
+
+def format_walk_message(walk: WalkInfo, username: str, lang: str, time_now: str, time_walked: str) -> str:
+    """Render the walk notification text for one language."""
+    message = render("walk_logged", lang, username=username, time=time_now, time_walked=time_walked)
+
+    params = []
+    if walk.didnt_poop:
+        params.append(get_text("param_didnt_poop", lang))
+    if walk.long_walk:
+        params.append(get_text("param_long_walk", lang))
+
+    if params:
+        message += "\n" + render("additional", lang, params=", ".join(params))
+
+    return message
+
+
+@traced()
+async def broadcast_walk(session: AsyncSession, walk: WalkInfo, walker_user: UserInfo, bot: Bot) -> None:
     """Broadcast walk notification to all active users.
 
     Separated from scheduler to avoid circular imports and keep
-    notification logic independent of scheduling concerns.
+    notification logic independent of scheduling concerns. The message is
+    rendered once per language, not once per recipient. Delivery goes
+    through ``coalescer``, which may fold it into a digest.
+
+    Call it once the walk is committed. ``session`` is only used to read the
+    roster; its transaction is ended before sending, so no connection is
+    held while the messages go out.
     """
-    all_users = await crud.get_all_active_users(session)
-    logger.info(f"Broadcasting walk {walk.id} to {len(all_users)} users")
+    users_by_language = await directory.active_by_language(session)
+    await session.commit()
+    total = sum(len(users) for users in users_by_language.values())
+    logger.info("Broadcasting walk {} to {} users", walk.id, total)
 
     username = walker_user.display_name or walker_user.username or f"User {walker_user.telegram_id}"
     tz = ZoneInfo(settings.display_timezone)
@@ -25,24 +118,12 @@ async def broadcast_walk(session: AsyncSession, walk, walker_user, bot: Bot) ->
     time_now = now.strftime("%H:%M")
     time_walked = walk.walked_at.replace(tzinfo=timezone.utc).astimezone(tz).strftime("%H:%M")
 
-    for user in all_users:
-        message = get_text("walk_logged", user.language).format(
-            username=username, time=time_now, time_walked=time_walked
-        )
-
-        params = []
-        if walk.didnt_poop:
-            params.append(get_text("param_didnt_poop", user.language))
-        if walk.long_walk:
-            params.append(get_text("param_long_walk", user.language))
+    for lang, users in users_by_language.items():
+        message = format_walk_message(walk, username, lang, time_now, time_walked)
 
-        if params:
-            message += "\n" + get_text("additional", user.language).format(
-                params=", ".join(params)
-            )
-
-        try:
-            await bot.send_message(chat_id=user.telegram_id, text=message)
-            logger.debug(f"Sent walk notification to user {user.telegram_id}")
-        except Exception as e:
-            logger.warning(f"Failed to send notification to user {user.telegram_id}: {e}")
+        for user in users:
+            try:
+                await coalescer.send(bot, user.telegram_id, message)
+                logger.debug("Sent walk notification to user {}", user.telegram_id)
+            except Exception as e:
+                logger.warning("Failed to send notification to user {}: {}", user.telegram_id, e)
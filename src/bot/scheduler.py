@@ -1,47 +1,121 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from apscheduler import AsyncScheduler
-from apscheduler.triggers.date import DateTrigger
+from aiogram.exceptions import TelegramAPIError
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
 from loguru import logger
 
-if TYPE_CHECKING:
-    from aiogram import Bot
-
+from src.bot.drafts import draft_from_data, pop_draft
 from src.bot.i18n import get_text
+from src.bot.metrics import JOB_SECONDS
+from src.bot.storage import current_session
 from src.database import crud
+from src.database.directory import directory
+from src.database.lease import LeaderLease
 from src.database.session import async_session
+from src.tracing import traced
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from apscheduler import AsyncScheduler
 
-WALK_TIMEOUT_MINUTES = 5
+# How often the leader looks for expired drafts whose timer lives in
+# another (or a dead) replica
+SWEEP_INTERVAL_SECONDS = 10
 
-# Store job IDs by user_id for cancellation
+# Store job IDs by telegram_id for cancellation
 _pending_jobs: dict[int, str] = {}
-_scheduler: AsyncScheduler | None = None
+_scheduler: "AsyncScheduler | None" = None
 _bot: "Bot | None" = None
+_storage: BaseStorage | None = None
+_lease: LeaderLease | None = None
+# Users whose draft is being finalized right now (timer and sweep can overlap)
+_finalizing: set[int] = set()
+
+
+async def init_scheduler(
+    bot: "Bot", storage: BaseStorage, lease: LeaderLease | None = None
+) -> "AsyncScheduler":
+    """Initialize the scheduler.
 
+    ``storage`` is the dispatcher's FSM storage, where walk drafts live.
+
+    With several bot replicas, pass a ``lease``: only the replica holding it
+    auto-finalizes drafts, and it also sweeps the shared storage for expired
+    drafts whose timer was scheduled by another replica. Without a lease
+    this process is the only one and always acts.
+    """
+    global _scheduler, _bot, _storage, _lease
+    # APScheduler is imported here, not at module level, so importing the
+    # handlers (tests, benchmarks, scripts) does not pay for it
+    from apscheduler import AsyncScheduler
 
-async def init_scheduler(bot: "Bot") -> AsyncScheduler:
-    """Initialize the scheduler."""
-    global _scheduler, _bot
     _bot = bot
+    _storage = storage
+    _lease = lease
     _scheduler = AsyncScheduler()
     await _scheduler.__aenter__()
     await _scheduler.start_in_background()
     logger.debug("Scheduler started in background")
+
+    if lease is not None:
+        await _renew_lease()
+        await _add_interval_job(_renew_lease, "leader_lease", lease.ttl / 3)
+        await _add_interval_job(_sweep_expired_drafts, "draft_sweep", SWEEP_INTERVAL_SECONDS)
     return _scheduler
 
 
+async def _add_interval_job(func, job_id: str, seconds: float) -> None:
+    from apscheduler import ConflictPolicy
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    # A slow run must not overlap the next one
+    await _scheduler.configure_task(func, max_running_jobs=1)
+    await _scheduler.add_schedule(
+        func,
+        IntervalTrigger(seconds=seconds),
+        id=job_id,
+        conflict_policy=ConflictPolicy.replace,
+    )
+
+
 async def stop_scheduler() -> None:
-    """Stop the scheduler."""
-    global _scheduler
+    """Stop the scheduler and hand leadership over, if held."""
+    global _scheduler, _lease
     if _scheduler:
         await _scheduler.__aexit__(None, None, None)
         _scheduler = None
         logger.debug("Scheduler stopped")
+    if _lease is not None:
+        try:
+            await _lease.release()
+        except Exception as e:
+            logger.warning("Could not release leader lease: {}", e)
+        _lease = None
+
+
+def _is_leader() -> bool:
+    return _lease is None or _lease.is_leader
+
 
+async def _renew_lease() -> None:
+    """Take or extend the leader lease (called by scheduler)."""
+    was_leader = _lease.is_leader
+    try:
+        await _lease.renew()
+    except Exception as e:
+        logger.warning("Leader lease renewal failed: {}", e)
+    if _lease.is_leader != was_leader:
+        logger.info("{} leadership ({})", "Acquired" if _lease.is_leader else "Lost", _lease.holder)
+
+
+@traced()
+async def schedule_walk_finalization(telegram_id: int, run_time: datetime) -> None:
+    """Schedule auto-finalization of a user's walk draft at ``run_time`` (naive UTC)."""
+    from apscheduler import ConflictPolicy
+    from apscheduler.triggers.date import DateTrigger
 
-async def schedule_walk_finalization(user_id: int, walk_id: int) -> None:
-    """Schedule auto-finalization of a walk after timeout."""
     global _scheduler, _pending_jobs
 
     if _scheduler is None:
@@ -49,72 +123,141 @@ async def schedule_walk_finalization(user_id: int, walk_id: int) -> None:
         return
 
     # Cancel existing job for this user if any
-    await cancel_walk_timer(user_id)
+    await cancel_walk_timer(telegram_id)
 
-    run_time = datetime.now(timezone.utc) + timedelta(minutes=WALK_TIMEOUT_MINUTES)
     job_id = await _scheduler.add_schedule(
         _auto_finalize_walk,
-        trigger=DateTrigger(run_time=run_time),
-        args=[user_id, walk_id],
-        id=f"walk_{user_id}_{walk_id}",
+        trigger=DateTrigger(run_time=run_time.replace(tzinfo=timezone.utc)),
+        args=[telegram_id],
+        id=f"walk_{telegram_id}",
+        conflict_policy=ConflictPolicy.replace,
     )
-    _pending_jobs[user_id] = job_id
-    logger.debug(f"Scheduled auto-finalization for walk {walk_id} at {run_time}")
+    _pending_jobs[telegram_id] = job_id
+    logger.debug("Scheduled auto-finalization for user {} at {}", telegram_id, run_time)
 
 
-async def cancel_walk_timer(user_id: int) -> None:
+async def cancel_walk_timer(telegram_id: int) -> None:
     """Cancel pending walk timer for a user."""
     global _scheduler, _pending_jobs
 
     if _scheduler is None:
         return
 
-    job_id = _pending_jobs.pop(user_id, None)
+    job_id = _pending_jobs.pop(telegram_id, None)
     if job_id:
         try:
             await _scheduler.remove_schedule(job_id)
-            logger.debug(f"Cancelled walk timer for user {user_id}")
+            logger.debug("Cancelled walk timer for user {}", telegram_id)
         except Exception as e:
-            logger.debug(f"Could not cancel timer for user {user_id}: {e}")
+            logger.debug("Could not cancel timer for user {}: {}", telegram_id, e)
 
 
-async def _auto_finalize_walk(user_id: int, walk_id: int) -> None:
-    """Auto-finalize walk and broadcast (called by scheduler)."""
-    global _bot, _pending_jobs
+@traced("job.auto_finalize_walk")
+async def _auto_finalize_walk(telegram_id: int) -> None:
+    """Insert the user's expired walk draft and broadcast it (called by scheduler)."""
+    _pending_jobs.pop(telegram_id, None)
+    if not _is_leader():
+        # The leader's sweep picks the draft up
+        logger.debug("Not the leader, leaving walk draft of user {} to the sweep", telegram_id)
+        return
+    with JOB_SECONDS.time("auto_finalize_walk"):
+        await _finalize_expired_draft(telegram_id)
 
-    _pending_jobs.pop(user_id, None)
-    logger.info(f"Auto-finalizing walk {walk_id} for user {user_id}")
 
-    if _bot is None:
+async def _sweep_expired_drafts() -> None:
+    """Finalize every expired draft in the shared FSM storage (leader only)."""
+    if not _is_leader() or not hasattr(_storage, "items"):
+        return
+    with JOB_SECONDS.time("sweep_expired_drafts"):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        for key, data in await _storage.items():
+            draft = draft_from_data(data)
+            if draft is None or draft.expires_at > now:
+                continue
+            try:
+                await _finalize_expired_draft(key.user_id)
+            except Exception as e:
+                logger.exception("Sweep could not finalize walk draft of user {}: {}", key.user_id, e)
+
+
+async def _finalize_expired_draft(telegram_id: int) -> None:
+    if _bot is None or _storage is None:
         logger.error("Bot not available for auto-finalization")
         return
 
+    if telegram_id in _finalizing:
+        return
+    _finalizing.add(telegram_id)
+    try:
+        await _finalize_draft(telegram_id)
+    finally:
+        _finalizing.discard(telegram_id)
+
+
+@traced("scheduler.finalize_draft")
+async def _finalize_draft(telegram_id: int) -> None:
     from src.bot.notifications import broadcast_walk
 
+    state = FSMContext(
+        storage=_storage,
+        key=StorageKey(bot_id=_bot.id, chat_id=telegram_id, user_id=telegram_id),
+    )
+
     async with async_session() as session:
-        walk = await crud.finalize_walk(session, walk_id)
-        if walk is None:
-            logger.warning(f"Walk {walk_id} not found for auto-finalization")
-            return
-
-        user = await crud.get_user_by_telegram_id(session, walk.user.telegram_id)
-        if user is None:
-            logger.warning(f"User not found for walk {walk_id}")
-            return
-
-        # Send confirmation to walker
-        await _bot.send_message(
-            chat_id=user.telegram_id,
-            text=get_text("walk_sent", user.language),
-        )
-
-        from src.bot.keyboards import main_keyboard
-
-        await _bot.send_message(
-            chat_id=user.telegram_id,
-            text=get_text("walk_button", user.language),
-            reply_markup=main_keyboard(user.language),
-        )
+        # The DB storage joins this session, so the draft is claimed and the
+        # walk inserted in one transaction: a failed insert keeps the draft
+        token = current_session.set(session)
+        try:
+            draft = await pop_draft(state)
+            if draft is None:
+                # Already sent or cancelled, possibly on another replica
+                return
+
+            logger.info("Auto-finalizing walk draft for user {}", telegram_id)
+            user = await directory.get(session, telegram_id)
+            if user is None:
+                logger.warning("User {} not found for auto-finalization", telegram_id)
+                await session.commit()
+                return
+
+            walk = await crud.create_walk(
+                session,
+                user.id,
+                walked_at=draft.walked_at,
+                didnt_poop=draft.didnt_poop,
+                long_walk=draft.long_walk,
+                is_finalized=True,
+            )
+            await session.commit()
+        finally:
+            current_session.reset(token)
+
+        # Confirm to the walker: turn the walk editor into the confirmation,
+        # or, for drafts from the old reply keyboard, restore the main keyboard.
+        # The walk is saved either way, so a failure here (editor message
+        # deleted, bot blocked) must not stop the broadcast.
+        try:
+            if draft.message_id is not None:
+                await _bot.edit_message_text(
+                    chat_id=user.telegram_id,
+                    message_id=draft.message_id,
+                    text=get_text("walk_sent", user.language),
+                )
+            else:
+                await _bot.send_message(
+                    chat_id=user.telegram_id,
+                    text=get_text("walk_sent", user.language),
+                )
+
+                from src.bot.keyboards import main_keyboard
+
+                await _bot.send_message(
+                    chat_id=user.telegram_id,
+                    text=get_text("walk_button", user.language),
+                    reply_markup=main_keyboard(user.language),
+                )
+        except TelegramAPIError as e:
+            logger.warning("Could not confirm auto-finalized walk {} to user {}: {}", walk.id, telegram_id, e)
 
         # Broadcast to all users
         await broadcast_walk(session, walk, user, _bot)
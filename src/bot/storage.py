@@ -0,0 +1,220 @@
+import copy
+import importlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from src.database.models import FsmState, _utcnow
+
+# Dialect -> SQLAlchemy module with its upsert-capable insert(), imported on
+# first use so only the dialect in use is loaded
+_UPSERT_DIALECTS = {
+    "mysql": "sqlalchemy.dialects.mysql",
+    "mariadb": "sqlalchemy.dialects.mysql",
+    "sqlite": "sqlalchemy.dialects.sqlite",
+    "postgresql": "sqlalchemy.dialects.postgresql",
+}
+
+# The session of the update being handled, set by DbSessionMiddleware
+current_session: ContextVar[AsyncSession | None] = ContextVar("current_session", default=None)
+
+_WRITTEN_KEY = "fsm_cache_written"
+
+
+class SqlStorage(BaseStorage):
+    """aiogram FSM storage in the ``fsm_states`` table.
+
+    One row per (bot, chat, user) holds the state name and the JSON data,
+    so conversation state (including walk drafts) survives restarts and is
+    shared by every bot process using the same database. Thread, business
+    connection and destiny keys are not supported; the bot only talks in
+    private chats.
+
+    While an update is being handled, reads and writes use that update's
+    session (``current_session``), so they need no extra pooled connection
+    and commit or roll back together with the handler's own writes.
+    Outside an update (e.g. scheduler jobs) each call uses its own session.
+
+    Reads can go through a small LRU cache, off by default. Writes go to the
+    DB first and then update the cache, so a single process always sees its
+    own writes; a rolled-back write is dropped from the cache again. With
+    several processes, a cached entry can hide another process's write for
+    up to ``cache_ttl`` seconds, so only set one when a single process
+    serves every user. ``pop_value`` never uses the cache.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache_ttl: float = 0.0,
+        cache_size: int = 1024,
+    ) -> None:
+        self._sessions = session_factory
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # (bot_id, chat_id, user_id) -> (loaded_at, state, data)
+        self._cache: OrderedDict[tuple[int, int, int], tuple[float, str | None, dict]] = OrderedDict()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        name = state.state if isinstance(state, State) else state
+        await self._write(key, state=name)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state, _ = await self._read(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise ValueError(f"Data must be a dict, got {type(data).__name__}")
+        await self._write(key, data=copy.copy(data))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data = await self._read(key)
+        return copy.copy(data)
+
+    async def pop_value(self, key: StorageKey, dict_key: str) -> Any | None:
+        """Remove ``dict_key`` from the data and return its value, if set.
+
+        Atomic across processes: the row is read with SELECT ... FOR UPDATE
+        and rewritten in the same transaction, so of several concurrent
+        calls for one key exactly one gets the value; the others wait for
+        its transaction and then find the value gone. (SQLite has no row
+        locks; run several processes against MySQL or PostgreSQL.)
+        """
+        row_key = _row_key(key)
+        async with self._session() as session:
+            result = await session.execute(
+                select(FsmState.state, FsmState.data).where(*_where(row_key)).with_for_update()
+            )
+            row = result.one_or_none()
+            state, data = (row.state, dict(row.data or {})) if row else (None, {})
+            value = data.pop(dict_key, None)
+            if value is not None:
+                await session.execute(
+                    update(FsmState).where(*_where(row_key)).values(data=data, updated_at=_utcnow()),
+                    execution_options={"synchronize_session": False},
+                )
+                session.info.setdefault(_WRITTEN_KEY, []).append((self, row_key))
+        self._remember(row_key, state, data)
+        return value
+
+    async def items(self) -> list[tuple[StorageKey, dict[str, Any]]]:
+        """Return every key that has data, read from the DB, not the cache."""
+        async with self._sessions() as session:
+            result = await session.execute(
+                select(FsmState.bot_id, FsmState.chat_id, FsmState.user_id, FsmState.data)
+            )
+            rows = result.all()
+        return [
+            (StorageKey(bot_id=row.bot_id, chat_id=row.chat_id, user_id=row.user_id), row.data)
+            for row in rows
+            if row.data
+        ]
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    async def _read(self, key: StorageKey) -> tuple[str | None, dict]:
+        row_key = _row_key(key)
+        cached = self._cache.get(row_key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._cache.move_to_end(row_key)
+            return cached[1], cached[2]
+
+        async with self._session() as session:
+            result = await session.execute(
+                select(FsmState.state, FsmState.data).where(*_where(row_key))
+            )
+            row = result.one_or_none()
+        state, data = (row.state, row.data or {}) if row else (None, {})
+        self._remember(row_key, state, data)
+        return state, data
+
+    async def _write(self, key: StorageKey, **values: Any) -> None:
+        row_key = _row_key(key)
+        values["updated_at"] = _utcnow()
+        async with self._session() as session:
+            await _upsert(session, row_key, values)
+            session.info.setdefault(_WRITTEN_KEY, []).append((self, row_key))
+
+        cached = self._cache.get(row_key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._remember(row_key, values.get("state", cached[1]), values.get("data", cached[2]))
+        else:
+            # Only one column is known; the other is read on the next access
+            self._cache.pop(row_key, None)
+
+    def forget(self, row_key: tuple[int, int, int]) -> None:
+        """Drop one cached key."""
+        self._cache.pop(row_key, None)
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        session = current_session.get()
+        if session is not None:
+            yield session
+            return
+        async with self._sessions() as session, session.begin():
+            yield session
+
+    def _remember(self, row_key: tuple[int, int, int], state: str | None, data: dict) -> None:
+        if self.cache_ttl <= 0:
+            return
+        self._cache[row_key] = (time.monotonic(), state, data)
+        self._cache.move_to_end(row_key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def _row_key(key: StorageKey) -> tuple[int, int, int]:
+    if key.thread_id is not None or key.business_connection_id is not None or key.destiny != "default":
+        raise ValueError(f"SqlStorage only supports plain chat keys, got {key}")
+    return key.bot_id, key.chat_id, key.user_id
+
+
+def _where(row_key: tuple[int, int, int]) -> tuple:
+    bot_id, chat_id, user_id = row_key
+    return FsmState.bot_id == bot_id, FsmState.chat_id == chat_id, FsmState.user_id == user_id
+
+
+async def _upsert(session: AsyncSession, row_key: tuple[int, int, int], values: dict[str, Any]) -> None:
+    """Insert the row or overwrite just ``values`` on an existing one."""
+    bot_id, chat_id, user_id = row_key
+    row = {"bot_id": bot_id, "chat_id": chat_id, "user_id": user_id, "state": None, "data": {}, **values}
+
+    dialect = session.get_bind().dialect.name
+    module = _UPSERT_DIALECTS.get(dialect)
+    if module is None:
+        result = await session.execute(
+            update(FsmState).where(*_where(row_key)).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount == 0:
+            session.add(FsmState(**row))
+        return
+
+    stmt = importlib.import_module(module).insert(FsmState).values(**row)
+    if dialect in ("mysql", "mariadb"):
+        stmt = stmt.on_duplicate_key_update(**values)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["bot_id", "chat_id", "user_id"], set_=values)
+    await session.execute(stmt)
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_committed_writes(session: Session) -> None:
+    session.info.pop(_WRITTEN_KEY, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    for storage, row_key in session.info.pop(_WRITTEN_KEY, ()):
+        storage.forget(row_key)
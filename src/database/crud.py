@@ -1,132 +1,112 @@
+from dataclasses import replace
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import User, Walk
-
-
+from src.database.directory import directory
+from src.database.models import User, Walk, _utcnow
+from src.database.readmodels import USER_COLUMNS, UserInfo, WalkInfo
+from src.database.versions import WALKS_VERSION, bump_version
+from src.tracing import traced
+
+# Functions here never commit: the caller owns the transaction (in the bot,
+# DbSessionMiddleware commits once per update). Reads and inserts return
+# read models (UserInfo/WalkInfo) built from Core rows, not ORM instances.
+#
+# Mutators are single UPDATE statements rather than SELECT-then-mutate.
+# The base statements below are built once and only ever extended with a
+# primary-key WHERE and fixed column sets, so every call hits SQLAlchemy's
+# compiled-statement cache. "evaluate" keeps objects already loaded in the
+# session in sync without an extra SELECT.
+#
+# Walks are never changed once inserted: the bot keeps walks in progress as
+# FSM drafts (src.bot.drafts) and inserts each one when it is sent.
+#
+# Writes other processes cache (users, finalized walks) also bump their
+# data_versions row in the same transaction, see src.database.versions.
+_update_user = update(User).execution_options(synchronize_session="evaluate")
+_select_user = select(*USER_COLUMNS)
+_insert_user = insert(User.__table__)
+# New users get the model's column defaults; read them back from there so
+# the returned UserInfo cannot drift from what was inserted
+_NEW_USER_LANGUAGE = User.__table__.c.language.default.arg
+_NEW_USER_ACTIVE = User.__table__.c.is_active.default.arg
+_insert_walk = insert(Walk.__table__)
+
+
+@traced()
 async def get_or_create_user(
     session: AsyncSession, telegram_id: int, username: str | None = None
-) -> User:
+) -> UserInfo:
     """Get existing user or create a new one."""
-    stmt = select(User).where(User.telegram_id == telegram_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await get_user_by_telegram_id(session, telegram_id)
 
     if user is None:
-        user = User(telegram_id=telegram_id, username=username)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        result = await session.execute(_insert_user.values(telegram_id=telegram_id, username=username))
+        user = UserInfo(
+            result.inserted_primary_key[0], telegram_id, username, None, _NEW_USER_LANGUAGE, _NEW_USER_ACTIVE
+        )
+        await directory.mark_changed(session)
 
     return user
 
 
+@traced()
 async def set_user_language(session: AsyncSession, user_id: int, language: str) -> None:
     """Set user's preferred language."""
-    stmt = select(User).where(User.id == user_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-
-    if user:
-        user.language = language
-        await session.commit()
+    await session.execute(_update_user.where(User.id == user_id).values(language=language))
+    await directory.mark_changed(session)
 
 
+@traced()
 async def set_display_name(session: AsyncSession, user_id: int, display_name: str) -> None:
     """Set user's broadcast display name."""
-    stmt = select(User).where(User.id == user_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-
-    if user:
-        user.display_name = display_name
-        await session.commit()
+    await session.execute(_update_user.where(User.id == user_id).values(display_name=display_name))
+    await directory.mark_changed(session)
 
 
+@traced()
 async def get_user_by_telegram_id(
     session: AsyncSession, telegram_id: int
-) -> User | None:
+) -> UserInfo | None:
     """Get user by Telegram ID."""
-    stmt = select(User).where(User.telegram_id == telegram_id)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
-
-
-async def create_walk(session: AsyncSession, user_id: int) -> Walk:
-    """Create a new walk record."""
-    walk = Walk(user_id=user_id)
-    session.add(walk)
-    await session.commit()
-    await session.refresh(walk)
-    return walk
-
-
-async def get_pending_walk(session: AsyncSession, user_id: int) -> Walk | None:
-    """Get user's pending (not finalized) walk."""
-    stmt = select(Walk).where(Walk.user_id == user_id, Walk.is_finalized == False)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    result = await session.execute(_select_user.where(User.telegram_id == telegram_id))
+    row = result.one_or_none()
+    return UserInfo(*row) if row else None
 
 
-async def update_walk_params(
+@traced()
+async def create_walk(
     session: AsyncSession,
-    walk_id: int,
-    didnt_poop: bool | None = None,
-    long_walk: bool | None = None,
-) -> None:
-    """Update walk parameters."""
-    stmt = select(Walk).where(Walk.id == walk_id)
-    result = await session.execute(stmt)
-    walk = result.scalar_one_or_none()
-
-    if walk:
-        if didnt_poop is not None:
-            walk.didnt_poop = didnt_poop
-        if long_walk is not None:
-            walk.long_walk = long_walk
-        await session.commit()
-
-
-async def update_walk_time(session: AsyncSession, walk_id: int, walked_at: datetime) -> None:
-    """Set custom walked_at timestamp."""
-    stmt = select(Walk).where(Walk.id == walk_id)
-    result = await session.execute(stmt)
-    walk = result.scalar_one_or_none()
-
-    if walk:
-        walk.walked_at = walked_at
-        await session.commit()
-
-
-async def finalize_walk(session: AsyncSession, walk_id: int) -> Walk | None:
-    """Mark walk as finalized."""
-    stmt = select(Walk).where(Walk.id == walk_id)
-    result = await session.execute(stmt)
-    walk = result.scalar_one_or_none()
-
-    if walk:
-        walk.is_finalized = True
-        await session.commit()
-        await session.refresh(walk)
-
-    return walk
-
-
-async def delete_walk(session: AsyncSession, walk_id: int) -> None:
-    """Delete a walk record."""
-    stmt = select(Walk).where(Walk.id == walk_id)
-    result = await session.execute(stmt)
-    walk = result.scalar_one_or_none()
-
-    if walk:
-        await session.delete(walk)
-        await session.commit()
-
-
-async def get_all_active_users(session: AsyncSession) -> list[User]:
-    """Get all active users for broadcast."""
-    stmt = select(User).where(User.is_active == True)
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+    user_id: int,
+    walked_at: datetime | None = None,
+    didnt_poop: bool = False,
+    long_walk: bool = False,
+    is_finalized: bool = False,
+) -> WalkInfo:
+    """Create a new walk record.
+
+    The bot keeps walks in progress as FSM drafts and inserts them once,
+    with ``is_finalized=True``, when they are sent.
+    """
+    walk = WalkInfo(
+        id=0,
+        user_id=user_id,
+        walked_at=walked_at or _utcnow(),
+        didnt_poop=didnt_poop,
+        long_walk=long_walk,
+        is_finalized=is_finalized,
+    )
+    result = await session.execute(
+        _insert_walk.values(
+            user_id=walk.user_id,
+            walked_at=walk.walked_at,
+            didnt_poop=walk.didnt_poop,
+            long_walk=walk.long_walk,
+            is_finalized=walk.is_finalized,
+        )
+    )
+    if is_finalized:
+        await bump_version(session, WALKS_VERSION)
+    return replace(walk, id=result.inserted_primary_key[0])
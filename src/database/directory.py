@@ -0,0 +1,99 @@
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.database.models import User
+from src.database.readmodels import USER_COLUMNS, UserInfo
+from src.database.versions import USERS_VERSION, bump_version, read_version
+
+# How often (seconds) a cached roster is re-validated against data_versions.
+# Bounds how long a write made by another process can go unnoticed.
+VERSION_CHECK_INTERVAL = 5.0
+
+_CHANGED_KEY = "user_directory_changed"
+
+
+class UserDirectory:
+    """Process-local cache of the whole users table.
+
+    The roster is tiny and changes rarely, so it is loaded in one query and
+    served from memory. Writers go through ``crud``, which calls
+    ``mark_changed``: the local cache is dropped and the shared
+    ``data_versions`` row is bumped in the same transaction. Other processes
+    notice the new version within VERSION_CHECK_INTERVAL and reload.
+    """
+
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL) -> None:
+        self.check_interval = check_interval
+        self._loaded = False
+        self._version = 0
+        self._checked_at = 0.0
+        self._by_telegram_id: dict[int, UserInfo] = {}
+        self._active: tuple[UserInfo, ...] = ()
+        self._active_by_language: dict[str, tuple[UserInfo, ...]] = {}
+
+    async def get(self, session: AsyncSession, telegram_id: int) -> UserInfo | None:
+        """Return the user with this Telegram ID, or None if unregistered."""
+        await self._ensure_fresh(session)
+        return self._by_telegram_id.get(telegram_id)
+
+    async def active_users(self, session: AsyncSession) -> tuple[UserInfo, ...]:
+        """Return all active users."""
+        await self._ensure_fresh(session)
+        return self._active
+
+    async def active_by_language(self, session: AsyncSession) -> dict[str, tuple[UserInfo, ...]]:
+        """Return active users grouped by their language."""
+        await self._ensure_fresh(session)
+        return self._active_by_language
+
+    def invalidate(self) -> None:
+        """Drop the cached roster; the next read reloads it."""
+        self._loaded = False
+
+    async def mark_changed(self, session: AsyncSession) -> None:
+        """Record a users write made in ``session``'s transaction."""
+        await bump_version(session, USERS_VERSION)
+        session.info[_CHANGED_KEY] = True
+        self.invalidate()
+
+    async def _ensure_fresh(self, session: AsyncSession) -> None:
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self.check_interval:
+            return
+
+        version = await read_version(session, USERS_VERSION)
+        self._checked_at = now
+        if self._loaded and version == self._version:
+            return
+
+        await self._load(session)
+        self._version = version
+
+    async def _load(self, session: AsyncSession) -> None:
+        result = await session.execute(select(*USER_COLUMNS).order_by(User.id))
+        users = [UserInfo(*row) for row in result]
+
+        by_language: dict[str, list[UserInfo]] = {}
+        for user in users:
+            if user.is_active:
+                by_language.setdefault(user.language, []).append(user)
+
+        self._by_telegram_id = {user.telegram_id: user for user in users}
+        self._active = tuple(user for user in users if user.is_active)
+        self._active_by_language = {lang: tuple(group) for lang, group in by_language.items()}
+        self._loaded = True
+
+
+directory = UserDirectory()
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _drop_after_users_write(session: Session) -> None:
+    # A reload can race the writing transaction (or see its uncommitted rows
+    # before a rollback), so drop the cache again once the outcome is known.
+    if session.info.pop(_CHANGED_KEY, False):
+        directory.invalidate()
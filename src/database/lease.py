@@ -0,0 +1,73 @@
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.models import Lease, _utcnow
+
+LEADER_LEASE = "bot-leader"
+
+
+class LeaderLease:
+    """Leader election on a row of the ``leases`` table.
+
+    ``renew`` takes the lease if it is free or expired, or extends it if
+    this process already holds it, in one conditional UPDATE. The holder
+    must renew well within ``ttl``; if it dies, a standby takes over on its
+    first renew after the lease expires, so failover takes at most
+    ``ttl`` plus the standby's renew interval.
+
+    ``is_leader`` also turns False on its own once ``ttl`` has passed since
+    the last successful renew, so a process cut off from the DB stops
+    acting as leader before anyone else can take over. Expiry times use
+    each process's UTC clock; replicas are assumed to be NTP-synced.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        name: str = LEADER_LEASE,
+        ttl: float = 15.0,
+    ) -> None:
+        self._sessions = session_factory
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._valid_until = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    async def renew(self) -> bool:
+        """Take or extend the lease; return whether this process now leads."""
+        started = time.monotonic()
+        now = _utcnow()
+        async with self._sessions() as session, session.begin():
+            result = await session.execute(
+                update(Lease)
+                .where(
+                    Lease.name == self.name,
+                    or_(Lease.holder == self.holder, Lease.holder.is_(None), Lease.expires_at < now),
+                )
+                .values(holder=self.holder, expires_at=now + timedelta(seconds=self.ttl)),
+                execution_options={"synchronize_session": False},
+            )
+        # Count the lease from before the UPDATE was sent, never from after
+        self._valid_until = started + self.ttl if result.rowcount == 1 else 0.0
+        return self.is_leader
+
+    async def release(self) -> None:
+        """Give the lease up so a standby can take over immediately."""
+        self._valid_until = 0.0
+        async with self._sessions() as session, session.begin():
+            await session.execute(
+                update(Lease)
+                .where(Lease.name == self.name, Lease.holder == self.holder)
+                .values(holder=None, expires_at=None),
+                execution_options={"synchronize_session": False},
+            )
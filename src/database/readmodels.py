@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.database.models import User
+
+# Read models: immutable, slotted snapshots built straight from Core rows.
+# The bot only ever reads a few columns of a user or a walk it has just
+# written, so it never needs ORM instances with their identity-map and
+# attribute-instrumentation overhead (or their lazy relationship loads).
+
+
+@dataclass(frozen=True, slots=True)
+class UserInfo:
+    """Read-only snapshot of the user columns the bot needs."""
+
+    id: int
+    telegram_id: int
+    username: str | None
+    display_name: str | None
+    language: str
+    is_active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class WalkInfo:
+    """Read-only snapshot of a walk row."""
+
+    id: int
+    user_id: int
+    walked_at: datetime
+    didnt_poop: bool
+    long_walk: bool
+    is_finalized: bool
+
+
+# Column list in field order, for select(*USER_COLUMNS) -> UserInfo(*row)
+USER_COLUMNS = (User.id, User.telegram_id, User.username, User.display_name, User.language, User.is_active)
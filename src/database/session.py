@@ -1,19 +1,55 @@
+import time
 from pathlib import Path
+from typing import Callable
 
-from alembic import command
-from alembic.config import Config
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from src.bot.config import settings
+from src.database.urls import async_database_url, sync_database_url
 
-_SYNC_URL = settings.database_url.replace("+aiomysql", "+pymysql")
+_ASYNC_URL = async_database_url(settings.database_url, settings.database_driver)
+_SYNC_URL = sync_database_url(settings.database_url, settings.database_driver, settings.database_sync_driver)
 _ALEMBIC_INI = str(Path(__file__).resolve().parents[2] / "alembic.ini")
 
-engine = create_async_engine(settings.database_url, echo=False, pool_pre_ping=True)
+engine = create_async_engine(_ASYNC_URL, echo=False, pool_pre_ping=True)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def enable_statement_timing(*observers: Callable[[str, float | None], None]) -> None:
+    """Report every statement run on ``engine`` to each of ``observers``.
+
+    An observer receives the statement's leading keyword (SELECT, INSERT,
+    ...) and its duration in seconds, or ``None`` if the statement failed.
+    Call this once, with every observer.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["statement_start"].pop()
+        operation, seconds = _operation(statement), time.perf_counter() - start
+        for observe in observers:
+            observe(operation, seconds)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        starts = context.connection.info.get("statement_start") if context.connection else None
+        if starts:
+            starts.pop()
+        operation = _operation(context.statement or "")
+        for observe in observers:
+            observe(operation, None)
+
+
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
 def run_migrations() -> None:
     """Run pending alembic migrations.
 
@@ -21,6 +57,11 @@ def run_migrations() -> None:
     was created by the old create_all approach) the DB is stamped at rev0001
     first so that only the delta migrations are applied.
     """
+    # Alembic is only needed here; importing it up front costs every process
+    # that touches the database (bot startup, scripts, tests) ~0.2 s
+    from alembic import command
+    from alembic.config import Config
+
     alembic_cfg = Config(_ALEMBIC_INI)
     sync_engine = create_engine(_SYNC_URL)
 
@@ -0,0 +1,35 @@
+from sqlalchemy.engine import URL, make_url
+
+# Async driver -> the sync driver Alembic uses for the same database
+SYNC_DRIVERS = {
+    "aiomysql": "pymysql",
+    "asyncmy": "pymysql",
+    "aiosqlite": "pysqlite",
+}
+
+
+def async_database_url(url: str, driver: str = "") -> URL:
+    """Return ``url`` with its async driver replaced by ``driver``, if given.
+
+    E.g. driver "asyncmy" turns ``mysql+aiomysql://...`` into
+    ``mysql+asyncmy://...``, so the driver can be chosen without repeating
+    the credentials.
+    """
+    parsed = make_url(url)
+    if driver:
+        parsed = parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+    return parsed
+
+
+def sync_database_url(url: str, driver: str = "", sync_driver: str = "") -> URL:
+    """Return the sync URL (for migrations) matching ``async_database_url``.
+
+    Uses ``sync_driver`` or the usual partner of the async driver from
+    SYNC_DRIVERS.
+    """
+    async_url = async_database_url(url, driver)
+    async_driver = async_url.get_driver_name()
+    sync_driver = sync_driver or SYNC_DRIVERS.get(async_driver, "")
+    if not sync_driver:
+        raise ValueError(f"No sync driver known for {async_driver!r}; set DATABASE_SYNC_DRIVER")
+    return async_url.set(drivername=f"{async_url.get_backend_name()}+{sync_driver}")
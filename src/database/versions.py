@@ -0,0 +1,35 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import DataVersion
+
+# data_versions rows. Writers bump a row in the same transaction as the
+# change, so a reader that sees the new version also sees the new data.
+# Every writer of a data set updates the same row, so bump it as the last
+# statement and commit right away: until then other writers wait on its
+# lock (the bot commits before any Telegram call).
+USERS_VERSION = "users"
+WALKS_VERSION = "walks"
+
+_select_versions = select(DataVersion.name, DataVersion.version)
+# Core statement on the table, built once: skips the ORM's bulk-update
+# handling, which costs more than the UPDATE itself on every write
+_versions = DataVersion.__table__
+_bump_version = update(_versions).values(version=_versions.c.version + 1)
+
+
+async def bump_version(session: AsyncSession, name: str) -> None:
+    """Record a change to data set ``name`` in ``session``'s transaction."""
+    await session.execute(_bump_version.where(_versions.c.name == name))
+
+
+async def read_version(session: AsyncSession, name: str) -> int:
+    """Return the current version of data set ``name`` (0 if unknown)."""
+    result = await session.execute(select(DataVersion.version).where(DataVersion.name == name))
+    return result.scalar_one_or_none() or 0
+
+
+async def read_versions(session: AsyncSession) -> dict[str, int]:
+    """Return every data set's current version in one query."""
+    result = await session.execute(_select_versions)
+    return {name: version for name, version in result}
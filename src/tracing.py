@@ -0,0 +1,193 @@
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, ParamSpec, Protocol, TypeVar
+
+# Lightweight span tracing shared by the bot and the web app. A span is one
+# timed hop (an update, a handler, a crud call, a DB statement, a Bot API
+# call); spans opened inside another span become its children, across
+# awaits and into tasks created meanwhile. Finished spans go to the
+# configured exporter. IDs and fields follow OpenTelemetry's, so an
+# exporter can hand them to a collector later. With no exporter configured
+# (the default) spans are not created at all.
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float  # Unix time, seconds
+    duration_ms: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+class Exporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class InMemoryExporter:
+    """Keeps finished spans in ``spans`` (tests, load tests)."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlExporter:
+    """Appends finished spans to ``path``, one JSON object per line.
+
+    Writing happens on a background thread, so exporting never blocks the
+    event loop. A full queue drops spans rather than slowing requests down.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10_000) -> None:
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue[Span | None] = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._write, name="trace-export", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write(self) -> None:
+        # One O_APPEND write per batch of whole lines, so several processes
+        # (e.g. web workers) can share the file without splitting lines
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            done = False
+            while not done:
+                lines = []
+                span = self._queue.get()
+                while span is not None:
+                    lines.append(json.dumps(asdict(span), default=str, ensure_ascii=False) + "\n")
+                    if self._queue.empty():
+                        break
+                    span = self._queue.get()
+                done = span is None
+                if lines:
+                    os.write(fd, "".join(lines).encode())
+        finally:
+            os.close(fd)
+
+
+_exporter: Exporter | None = None
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def configure(exporter: Exporter | None) -> None:
+    """Send spans to ``exporter`` from now on; None turns tracing off."""
+    global _exporter
+    _exporter = exporter
+
+
+def shutdown() -> None:
+    """Flush and close the exporter, turning tracing off."""
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Time the block as a span, a child of the current span if there is one."""
+    exporter = _exporter
+    if exporter is None:
+        yield None
+        return
+
+    parent = _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        _current.reset(token)
+        exporter.export(current)
+
+
+def traced(name: str | None = None) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Run an async function in a span named ``name`` (default: module.function)."""
+
+    def decorate(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if _exporter is None:
+                return await func(*args, **kwargs)
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record(name: str, seconds: float | None, **attributes: Any) -> None:
+    """Export a span that just ended after ``seconds`` (None: it failed).
+
+    For hooks that only learn about an operation once it is over, such as
+    SQLAlchemy's cursor events.
+    """
+    exporter = _exporter
+    parent = _current.get()
+    if exporter is None or parent is None:
+        return
+    duration = seconds or 0.0
+    exporter.export(
+        Span(
+            name=name,
+            trace_id=parent.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id,
+            start=time.time() - duration,
+            duration_ms=duration * 1000,
+            attributes=attributes,
+            error="failed" if seconds is None else None,
+        )
+    )
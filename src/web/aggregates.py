@@ -0,0 +1,355 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Collection, Iterator
+from datetime import date, datetime
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Walk
+from src.web.config import settings
+from src.web.database import async_session
+
+logger = logging.getLogger(__name__)
+
+# Snapshot file layout (little-endian):
+#   header:  magic, format version, high-water walk id, record count, open id count
+#   records: (day ordinal, user_id, hour, walks, didnt_poop, long_walk),
+#            sorted by (day, user_id, hour)
+#   open ids: walk ids at or below the high-water mark not yet counted
+MAGIC = b"DWAG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH2xqII")
+RECORD = struct.Struct("<iIB3xIII")
+OPEN_ID = struct.Struct("<q")
+
+# A missing id below the high-water mark (a gap) is re-checked on every
+# refresh. Ids are allocated at INSERT but become visible at COMMIT, so a
+# lower id can show up after a higher one; ids of rolled-back inserts never
+# show up at all. A gap is only given up once it has been missing for a
+# whole rebuild interval and the next rebuild's full scan still misses it.
+# In-flight inserts are always near the top, so only the highest
+# MAX_OPEN_GAPS gaps are kept: a full scan would otherwise re-check every
+# walk ever cancelled or deleted.
+MAX_OPEN_GAPS = 1000
+# Rows fetched per round trip while streaming walks
+_BATCH_ROWS = 10_000
+
+Cell = tuple[int, int, int]  # (day ordinal, user_id, hour)
+
+# Sections of the /api/dashboard payload, and those that are per user
+DASHBOARD_KEYS = (
+    "leaderboard",
+    "walks_per_day",
+    "weekly_trends",
+    "poop_stats",
+    "long_walk_stats",
+    "hourly_distribution",
+)
+USER_KEYS = frozenset({"leaderboard", "poop_stats", "long_walk_stats"})
+
+
+class _Days:
+    """Day ordinals of the base records, as a sequence for bisect."""
+
+    def __init__(self, buffer: mmap.mmap | bytes, offset: int, count: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return RECORD.unpack_from(self._buffer, self._offset + index * RECORD.size)[0]
+
+
+class AggregateStore:
+    """Walk counters per (day, user, hour), the source of every dashboard widget.
+
+    Counters persist to a compact binary snapshot at ``path``. On startup
+    the snapshot is memory-mapped and served as is; ``refresh`` then adds
+    only walks above the snapshot's high-water walk id (plus any open ids
+    below it: pending walks and not-yet-visible inserts) to an in-memory
+    delta. ``save`` merges the delta into a new snapshot (without ``path``,
+    into a sorted in-memory base of the same layout).
+
+    Walks deleted or edited after they were counted are only picked up by
+    ``rebuild``; the bot never does either to a finalized walk. Each
+    rebuild also starts a new generation of open gaps and drops the ones
+    left from the generation before, which its scan has confirmed missing.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.ready = False
+        self.high_water = 0
+        # walk id -> generation its gap was seen in; None for pending walks, kept until finalized
+        self._open: dict[int, int | None] = {}
+        self._generation = 0
+        self._delta: dict[Cell, list[int]] = {}
+        self._base: mmap.mmap | bytes | None = None
+        self._days: _Days | None = None
+        self._lock = asyncio.Lock()
+
+    def load(self) -> bool:
+        """Map the snapshot at ``path``; return False if there is none."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, high_water, records, open_ids = HEADER.unpack_from(buffer, 0)
+            if (magic, version) != (MAGIC, FORMAT_VERSION):
+                raise ValueError(f"unknown snapshot format {magic!r} v{version}")
+            if len(buffer) != HEADER.size + records * RECORD.size + open_ids * OPEN_ID.size:
+                raise ValueError("truncated snapshot")
+        except (OSError, ValueError, struct.error):
+            logger.warning("Ignoring unreadable aggregate snapshot %s", self.path, exc_info=True)
+            return False
+
+        offset = HEADER.size + records * RECORD.size
+        self._set_base(buffer, records)
+        self._open = {
+            walk_id: self._generation
+            for (walk_id,) in OPEN_ID.iter_unpack(buffer[offset:offset + open_ids * OPEN_ID.size])
+        }
+        self._delta = {}
+        self.high_water = high_water
+        self.ready = True
+        logger.info("Loaded aggregate snapshot: %d cells up to walk %d", records, high_water)
+        return True
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """Count walks finalized since the last refresh; return how many."""
+        async with self._lock:
+            return await self._refresh(session)
+
+    async def rebuild(self, session: AsyncSession) -> int:
+        """Recount every walk from scratch, serving the old counters meanwhile.
+
+        Gaps the scan finds are kept open if they are above the old
+        high-water mark or were first seen in the current generation; older
+        gaps are confirmed missing and dropped.
+        """
+        high_water = self.high_water
+        fresh = AggregateStore()
+        counted = await fresh.refresh(session)
+        async with self._lock:
+            generation = self._generation
+            open_ids: dict[int, int | None] = {}
+            for walk_id, seen in fresh._open.items():
+                if seen is None:
+                    open_ids[walk_id] = None  # pending walk
+                elif self._open.get(walk_id) == generation:
+                    open_ids[walk_id] = generation  # gap seen since the last rebuild
+                elif walk_id > high_water:
+                    open_ids[walk_id] = generation + 1  # gap new to this scan
+            self._close_base()
+            self._delta, self._open, self.high_water = fresh._delta, open_ids, fresh.high_water
+            self._generation = generation + 1
+            self.ready = True
+        return counted
+
+    async def save(self) -> None:
+        """Write base + delta to a new snapshot and map it in place of the old.
+
+        Without ``path`` the merged base stays in memory: ``cells`` scans the
+        unsorted delta in full, so letting it grow makes every query slower.
+        """
+        if not self.ready:
+            return
+        async with self._lock:
+            cells = sorted(self._merged().items())
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, self.high_water, len(cells), len(self._open))
+            body = b"".join(RECORD.pack(*cell, *counts) for cell, counts in cells)
+            open_ids = b"".join(OPEN_ID.pack(walk_id) for walk_id in sorted(self._open))
+            buffer: mmap.mmap | bytes = header + body + open_ids
+            if self.path:
+                await asyncio.to_thread(self._write, buffer)
+                with open(self.path, "rb") as f:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._close_base()
+            self._set_base(buffer, len(cells))
+            self._delta = {}
+
+    def cells(self, start: date, end: date, user_id: int | None = None) -> Iterator[tuple[int, ...]]:
+        """Yield (day, user_id, hour, walks, didnt_poop, long_walk) for days in [start, end]."""
+        first, last = start.toordinal(), end.toordinal()
+        if self._days is not None:
+            offset = HEADER.size + bisect_left(self._days, first) * RECORD.size
+            limit = HEADER.size + len(self._days) * RECORD.size
+            while offset < limit:
+                record = RECORD.unpack_from(self._base, offset)
+                if record[0] > last:
+                    break
+                if user_id is None or record[1] == user_id:
+                    yield record
+                offset += RECORD.size
+        for cell, counts in self._delta.items():
+            if first <= cell[0] <= last and (user_id is None or cell[1] == user_id):
+                yield (*cell, *counts)
+
+    def dashboard(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        user_id: int | None,
+        names: dict[int, str] | None,
+        keys: Collection[str] = DASHBOARD_KEYS,
+    ) -> dict:
+        """Build the ``/api/dashboard`` payload, shaped like ``src.web.queries``.
+
+        Only the sections in ``keys`` are built. ``names`` is required for
+        the per-user sections (USER_KEYS) and, when given, also leaves out
+        walks of users missing from it; None counts every walk, like the
+        SQL queries that do not join ``users``.
+        """
+        per_user: dict[int, list[int]] = {}
+        per_day: dict[int, int] = {}
+        per_hour: dict[int, int] = {}
+        for day, user, hour, walks, didnt_poop, long_walk in self.cells(start_dt.date(), end_dt.date(), user_id):
+            if names is not None and user not in names:
+                continue
+            totals = per_user.setdefault(user, [0, 0, 0])
+            totals[0] += walks
+            totals[1] += didnt_poop
+            totals[2] += long_walk
+            per_day[day] = per_day.get(day, 0) + walks
+            per_hour[hour] = per_hour.get(hour, 0) + walks
+
+        users = []
+        if USER_KEYS.intersection(keys):
+            users = sorted(per_user.items(), key=lambda item: (-item[1][0], names[item[0]]))
+        data = {}
+        if "leaderboard" in keys:
+            data["leaderboard"] = [{"name": names[u], "walk_count": t[0]} for u, t in users]
+        if "walks_per_day" in keys:
+            data["walks_per_day"] = [{"day": str(date.fromordinal(d)), "count": c} for d, c in sorted(per_day.items())]
+        if "weekly_trends" in keys:
+            per_week: dict[int, int] = {}
+            for day, walks in per_day.items():
+                monday = day - date.fromordinal(day).weekday()
+                per_week[monday] = per_week.get(monday, 0) + walks
+            data["weekly_trends"] = [
+                {"week_start": str(date.fromordinal(d)), "count": c} for d, c in sorted(per_week.items())
+            ]
+        if "poop_stats" in keys:
+            data["poop_stats"] = [{"name": names[u], "total": t[0], "didnt_poop_count": t[1]} for u, t in users]
+        if "long_walk_stats" in keys:
+            data["long_walk_stats"] = [{"name": names[u], "total": t[0], "long_walk_count": t[2]} for u, t in users]
+        if "hourly_distribution" in keys:
+            data["hourly_distribution"] = [{"hour": h, "count": c} for h, c in sorted(per_hour.items())]
+        return data
+
+    async def _refresh(self, session: AsyncSession) -> int:
+        condition = Walk.id > self.high_water
+        if self._open:
+            condition = or_(condition, Walk.id.in_(list(self._open)))
+        result = await session.stream(
+            select(Walk.id, Walk.user_id, Walk.walked_at, Walk.didnt_poop, Walk.long_walk, Walk.is_finalized)
+            .where(condition)
+            .order_by(Walk.id)
+            .execution_options(yield_per=_BATCH_ROWS)
+        )
+
+        counted = 0
+        previous = self.high_water
+        gaps: deque[int] = deque(maxlen=MAX_OPEN_GAPS)
+        async for walk_id, user_id, walked_at, didnt_poop, long_walk, is_finalized in result:
+            if walk_id > previous:
+                # Ids come in order, so anything skipped since the last one is a gap
+                gaps.extend(range(max(previous + 1, walk_id - MAX_OPEN_GAPS), walk_id))
+                previous = walk_id
+            if not is_finalized:
+                self._open[walk_id] = None
+                continue
+            self._open.pop(walk_id, None)
+            counts = self._delta.setdefault((walked_at.toordinal(), user_id, walked_at.hour), [0, 0, 0])
+            counts[0] += 1
+            counts[1] += bool(didnt_poop)
+            counts[2] += bool(long_walk)
+            counted += 1
+
+        for walk_id in gaps:
+            self._open[walk_id] = self._generation
+        if len(self._open) > MAX_OPEN_GAPS:
+            tracked = sorted(walk_id for walk_id, seen in self._open.items() if seen is not None)
+            for walk_id in tracked[:-MAX_OPEN_GAPS]:
+                del self._open[walk_id]
+        self.high_water = previous
+        self.ready = True
+        return counted
+
+    def _merged(self) -> dict[Cell, list[int]]:
+        merged: dict[Cell, list[int]] = {}
+        if self._days is not None:
+            limit = HEADER.size + len(self._days) * RECORD.size
+            for day, user, hour, *counts in RECORD.iter_unpack(self._base[HEADER.size:limit]):
+                merged[(day, user, hour)] = counts
+        for cell, counts in self._delta.items():
+            total = merged.setdefault(cell, [0, 0, 0])
+            for i, value in enumerate(counts):
+                total[i] += value
+        return merged
+
+    def _write(self, data: bytes) -> None:
+        # Every web worker saves its own copy; keep their temp files apart
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _set_base(self, buffer: mmap.mmap | bytes, records: int) -> None:
+        self._base = buffer
+        self._days = _Days(buffer, HEADER.size, records)
+
+    def _close_base(self) -> None:
+        if isinstance(self._base, mmap.mmap):
+            self._base.close()
+        self._base = None
+        self._days = None
+
+
+aggregates = AggregateStore(settings.aggregate_snapshot_path or None)
+
+
+async def refresh_aggregates(versions: dict[str, int] | None = None) -> None:
+    """Count new walks; run as a VersionWatcher callback."""
+    if not aggregates.ready:
+        return  # maintain_aggregates is still building them
+    async with async_session() as session:
+        counted = await aggregates.refresh(session)
+    if counted:
+        logger.info("Aggregated %d new walks (high-water %d)", counted, aggregates.high_water)
+
+
+async def maintain_aggregates() -> None:
+    """Keep ``aggregates`` warm: load or build it, then save and rebuild periodically."""
+    if not aggregates.load():
+        async with async_session() as session:
+            await aggregates.rebuild(session)
+        logger.info("Built aggregates up to walk %d", aggregates.high_water)
+    async with async_session() as session:
+        await aggregates.refresh(session)
+    await aggregates.save()
+
+    last_rebuild = time.monotonic()
+    while True:
+        await asyncio.sleep(settings.aggregate_snapshot_seconds)
+        try:
+            if time.monotonic() - last_rebuild >= settings.aggregate_rebuild_seconds:
+                async with async_session() as session:
+                    await aggregates.rebuild(session)
+                last_rebuild = time.monotonic()
+            await aggregates.save()
+        except Exception:
+            logger.warning("Failed to maintain aggregate snapshot", exc_info=True)
@@ -0,0 +1,213 @@
+import argparse
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).with_name("static")
+STATIC_PREFIX = "/static/"
+
+# Third-party files served from STATIC_DIR, fetched by ``python -m
+# src.web.assets vendor`` (the web image runs it at build time). Until they
+# are there, pages link the same URL on the CDN. Downloads must match the
+# digests pinned in VENDOR_LOCK; ``vendor --pin`` records them after a
+# version bump. Only versioned URLs belong here: telegram-web-app.js changes
+# in place, so the page loads it from telegram.org.
+VENDOR = {
+    "vendor/apexcharts.min.js": "https://cdn.jsdelivr.net/npm/apexcharts@4.7.0/dist/apexcharts.min.js",
+}
+VENDOR_LOCK = Path(__file__).with_name("vendor.sha256")
+_LOCK_HEADER = "# sha256 of each VENDOR file; update with python -m src.web.assets vendor --pin\n"
+
+# Hashed URLs never change content, so browsers may keep them for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+@dataclass(frozen=True, slots=True)
+class Asset:
+    """One static file and its precompressed variants."""
+
+    content_type: str
+    body: bytes
+    # encoding ("br", "gzip") -> compressed body, smallest first
+    variants: dict[str, bytes]
+
+    def negotiate(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        """Return the smallest body the client accepts, and its encoding."""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.partition(";")
+            name, _, q = params.strip().partition("=")
+            try:
+                weight = float(q) if name.strip() == "q" else 1.0
+            except ValueError:
+                weight = 1.0
+            if weight > 0:
+                accepted.add(coding.strip().lower())
+        for encoding, body in self.variants.items():
+            if encoding in accepted:
+                return body, encoding
+        return self.body, None
+
+
+class AssetManifest:
+    """Static files under ``directory``, served at content-hashed URLs.
+
+    ``dashboard.js`` is served as ``/static/dashboard.<hash>.js``: any edit
+    yields a new URL, so responses can be cached as immutable. Files are
+    read, hashed and compressed (gzip, plus brotli if installed) once, on
+    first use.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._urls: dict[str, str] | None = None
+        self._assets: dict[str, Asset] = {}
+        self._version = ""
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Digest of every asset URL, e.g. to key cached pages that link them."""
+        self._load()
+        return self._version
+
+    def names(self) -> list[str]:
+        """Every static file, relative to ``directory``."""
+        return sorted(self._load())
+
+    def url(self, name: str) -> str:
+        """URL of static file ``name`` (relative to ``directory``)."""
+        urls = self._load()
+        if name in urls:
+            return urls[name]
+        if name in VENDOR:
+            return VENDOR[name]
+        raise KeyError(f"No static file {name!r}")
+
+    def get(self, hashed_name: str) -> Asset | None:
+        """The asset served at ``/static/<hashed_name>``, if any."""
+        self._load()
+        return self._assets.get(hashed_name)
+
+    def _load(self) -> dict[str, str]:
+        if self._urls is not None:
+            return self._urls
+        with self._lock:
+            if self._urls is None:
+                urls, assets = {}, {}
+                for path in sorted(self.directory.rglob("*")):
+                    if not path.is_file() or path.name.startswith("."):
+                        continue
+                    name = path.relative_to(self.directory).as_posix()
+                    body = path.read_bytes()
+                    stem, dot, suffix = name.rpartition(".")
+                    digest = hashlib.sha256(body).hexdigest()[:12]
+                    hashed = f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+                    urls[name] = STATIC_PREFIX + hashed
+                    assets[hashed] = _asset(path, body)
+                self._assets = assets
+                self._version = hashlib.sha256("\n".join(sorted(urls.values())).encode()).hexdigest()[:12]
+                self._urls = urls
+                logger.info("Loaded %d static assets", len(assets))
+        return self._urls
+
+
+def _asset(path: Path, body: bytes) -> Asset:
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    variants = {}
+    if content_type.startswith(_COMPRESSIBLE):
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    # Smallest first; drop variants that do not actually save anything
+    variants = dict(sorted((item for item in variants.items() if len(item[1]) < len(body)), key=lambda i: len(i[1])))
+    return Asset(content_type, body, variants)
+
+
+assets = AssetManifest(STATIC_DIR)
+
+
+def read_lock(lock: Path = VENDOR_LOCK) -> dict[str, str]:
+    """Pinned digests from ``lock``, in ``sha256sum`` format: name -> sha256 hex."""
+    if not lock.exists():
+        return {}
+    pins = {}
+    for line in lock.read_text().splitlines():
+        if line.strip() and not line.startswith("#"):
+            digest, _, name = line.partition("  ")
+            pins[name.strip()] = digest.strip()
+    return pins
+
+
+def vendor(directory: Path = STATIC_DIR, force: bool = False, pin: bool = False, lock: Path = VENDOR_LOCK) -> None:
+    """Download the VENDOR files into ``directory``, checking them against ``lock``.
+
+    Files already present are kept if they match their pin, unless
+    ``force``. A file with no pin is skipped, so pages keep linking the CDN;
+    a download that does not match its pin is not written and raises
+    ValueError. With ``pin`` every download is written and its digest
+    recorded in ``lock`` instead.
+    """
+    import urllib.request
+
+    pins = read_lock(lock)
+    for name, url in VENDOR.items():
+        target = directory / name
+        if target.exists() and not force and hashlib.sha256(target.read_bytes()).hexdigest() == pins.get(name):
+            print(f"{name}: present")
+            continue
+        if not pin and name not in pins:
+            print(f"{name}: no sha256 pinned in {lock.name}, linking {url}; record one with --pin")
+            continue
+        with urllib.request.urlopen(url, timeout=60) as response:
+            body = response.read()
+        digest = hashlib.sha256(body).hexdigest()
+        if pin:
+            pins[name] = digest
+        elif digest != pins[name]:
+            raise ValueError(f"{name}: sha256 {digest} from {url} does not match pinned {pins[name]}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(body)
+        print(f"{name}: {len(body):,} bytes from {url}")
+    if pin:
+        lines = [f"{pins[name]}  {name}" for name in VENDOR if name in pins]
+        lock.write_text(_LOCK_HEADER + "\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the dashboard's static assets")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("vendor", help="download third-party scripts into src/web/static/vendor")
+    fetch.add_argument("--force", action="store_true", help="replace files already present")
+    fetch.add_argument("--pin", action="store_true", help="accept the downloads and record their sha256 in vendor.sha256")
+    commands.add_parser("list", help="print every asset's hashed URL and sizes")
+    args = parser.parse_args()
+
+    if args.command == "vendor":
+        try:
+            vendor(force=args.force, pin=args.pin)
+        except ValueError as exc:
+            parser.exit(1, f"{exc}\n")
+    else:
+        for name in assets.names():
+            url = assets.url(name)
+            asset = assets.get(url.removeprefix(STATIC_PREFIX))
+            sizes = ", ".join(f"{encoding} {len(body):,}" for encoding, body in asset.variants.items())
+            print(f"{url}  {len(asset.body):,} bytes" + (f" ({sizes})" if sizes else ""))
+
+
+if __name__ == "__main__":
+    main()
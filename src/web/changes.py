@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.versions import read_versions
+from src.web.config import settings
+from src.web.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """LRU cache of computed responses, cleared whenever the data changes.
+
+    ``ttl`` is only a safety net: ``VersionWatcher`` clears the cache as
+    soon as the bot commits a change, so entries can live long. A result
+    computed while the cache was being cleared is not stored, since it may
+    predate the change: callers take ``generation`` before querying and
+    pass it back to ``put``.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        # key -> (stored_at, value)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+class VersionWatcher:
+    """Polls ``data_versions`` and reports when any version moves.
+
+    One primary-key scan of a tiny table per ``interval``; nothing else
+    happens until the bot commits a change. Then every ``on_change``
+    callback runs (e.g. to clear caches) and every subscriber queue gets
+    the new versions (e.g. to push a refresh to open dashboards).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        self._sessions = session_factory
+        self.interval = interval
+        self.versions: dict[str, int] = {}
+        self._callbacks: list[Callable[[dict[str, int]], Any]] = []
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def token(self) -> str:
+        """The current versions as a string, e.g. for shared cache keys."""
+        return ",".join(f"{name}={version}" for name, version in sorted(self.versions.items()))
+
+    def on_change(self, callback: Callable[[dict[str, int]], Any]) -> None:
+        """Run ``callback(versions)`` on every change, awaiting it if async.
+
+        Callbacks run in registration order, so one that refreshes derived
+        data should be registered before one that clears caches of it.
+        """
+        self._callbacks.append(callback)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue that receives the versions after each change.
+
+        The queue holds at most one pending change, and ``None`` once the
+        watcher stops.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def check(self) -> bool:
+        """Read the versions once; notify and return True if they moved."""
+        async with self._sessions() as session:
+            versions = await read_versions(session)
+        if versions == self.versions:
+            return False
+
+        if self.versions:
+            logger.info("Data changed: %s", versions)
+        for callback in self._callbacks:
+            result = callback(versions)
+            if inspect.isawaitable(result):
+                await result
+        # Only now, so anything computed under the new token already
+        # reflects the change
+        self.versions = versions
+        for queue in self._subscribers:
+            self._offer(queue, versions)
+        return True
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in self._subscribers:
+            self._offer(queue, None)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.warning("Failed to read data versions", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item: dict[str, int] | None) -> None:
+        # A subscriber that has not consumed the last change will refetch
+        # everything anyway, so only the newest item matters.
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+
+# Whole dashboards and single widgets (six per range) share it
+dashboard_cache = ResponseCache(settings.dashboard_cache_ttl, max_entries=1024)
+watcher = VersionWatcher(async_session, settings.data_version_poll_seconds)
@@ -1,6 +1,30 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
+from src.database.urls import async_database_url
 from src.web.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False, pool_pre_ping=True)
-async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine: AsyncEngine | None = None
+# Bound to ``engine`` by init_engine()
+async_session = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def init_engine() -> AsyncEngine:
+    """Create this process's engine and bind ``async_session`` to it.
+
+    Called from the app's lifespan, so with several uvicorn workers each
+    worker builds its own pool after it has started; no pooled connection
+    is ever inherited across a fork.
+    """
+    global engine
+    engine = create_async_engine(
+        async_database_url(settings.database_url, settings.database_driver), echo=False, pool_pre_ping=True
+    )
+    async_session.configure(bind=engine)
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
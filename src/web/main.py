@@ -1,10 +1,18 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from src.web.database import engine
+from src import tracing
+from src.web.aggregates import aggregates, maintain_aggregates, refresh_aggregates
+from src.web.changes import dashboard_cache, watcher
+from src.web.config import settings
+from src.web.database import dispose_engine, init_engine
+from src.web.profiling import router as profiling_router
 from src.web.routes import router
+from src.web.shared_cache import shared_cache
+from src.web.timing import ServerTimingMiddleware
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,9 +22,29 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    init_engine()
+    if settings.trace_file:
+        tracing.configure(tracing.JsonlExporter(settings.trace_file))
+    # Refresh the aggregates before dropping responses computed from them
+    watcher.on_change(refresh_aggregates)
+    watcher.on_change(lambda versions: dashboard_cache.clear())
+    maintenance = asyncio.create_task(maintain_aggregates())
+    watcher.start()
     yield
-    await engine.dispose()
+    await watcher.stop()
+    maintenance.cancel()
+    try:
+        await maintenance
+    except asyncio.CancelledError:
+        pass
+    await aggregates.save()
+    if shared_cache is not None:
+        shared_cache.close()
+    await dispose_engine()
+    tracing.shutdown()
 
 
 app = FastAPI(title="Dog Walker Dashboard", lifespan=lifespan)
+app.add_middleware(ServerTimingMiddleware)
 app.include_router(router)
+app.include_router(profiling_router)
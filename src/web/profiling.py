@@ -0,0 +1,83 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import PlainTextResponse
+
+from src.web.aggregates import aggregates
+from src.web.config import settings
+from src.web.routes import build_dashboard, date_range
+from src.web.timing import collect_spans, format_server_timing, timed
+
+router = APIRouter()
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 15
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+_running = asyncio.Lock()
+
+
+@router.get("/debug/profile")
+async def profile_dashboard(
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    user_id: int | None = Query(None),
+    sort: str = Query("cumulative"),
+    x_debug_token: str | None = Header(None),
+):
+    # Does not exist unless DEBUG_PROFILE_TOKEN is set and sent back
+    token = settings.debug_profile_token
+    if not token or not x_debug_token or not hmac.compare_digest(x_debug_token, token):
+        return PlainTextResponse("Not Found", status_code=404)
+    if sort not in SORT_KEYS:
+        return PlainTextResponse(f"sort must be one of {', '.join(SORT_KEYS)}", status_code=400)
+    if _running.locked():
+        return PlainTextResponse("Another profile is running", status_code=409)
+
+    async with _running:
+        report = await _profile(start, end, user_id, sort)
+    return PlainTextResponse(report)
+
+
+async def _profile(start: str | None, end: str | None, user_id: int | None, sort: str) -> str:
+    """Build one dashboard, uncached, under cProfile and tracemalloc."""
+    start_dt, end_dt = date_range(start, end)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+
+    with collect_spans() as spans:
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            data = await build_dashboard(start_dt, end_dt, user_id)
+            with timed("serialize"):
+                json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        finally:
+            profiler.disable()
+        total = (time.perf_counter() - started) * 1000
+
+    after = tracemalloc.take_snapshot()
+    if started_tracing:
+        tracemalloc.stop()
+
+    out = io.StringIO()
+    out.write(f"/api/dashboard start={start_dt:%Y-%m-%d} end={end_dt:%Y-%m-%d} user_id={user_id}\n")
+    out.write(f"source: {'aggregates' if aggregates.ready else 'SQL queries'}\n")
+    out.write(f"Server-Timing: {format_server_timing(spans, total)}\n")
+    # cProfile is process-wide: other requests handled meanwhile show up too
+    out.write(f"\n== cProfile, top {TOP_FUNCTIONS} by {sort} ==\n")
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(TOP_FUNCTIONS)
+    out.write(f"== tracemalloc, top {TOP_ALLOCATIONS} allocation changes ==\n")
+    for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+        out.write(f"{stat}\n")
+    return out.getvalue()
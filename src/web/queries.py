@@ -1,8 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import text
+from sqlalchemy import String, cast, func, literal, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.models import User
+from src.web.timing import timed_query
+
+# The COALESCE the SQL below uses for names, built with Core so it renders
+# CONCAT on MySQL and || on SQLite
+_user_name = func.coalesce(
+    User.display_name, User.username, literal("User ") + cast(User.telegram_id, String)
+).label("name")
+
 
 def _user_filter(user_id: int | None) -> str:
     if user_id is not None:
@@ -17,6 +26,7 @@ def _params(start_dt: datetime, end_dt: datetime, user_id: int | None) -> dict:
     return p
 
 
+@timed_query
 async def get_leaderboard(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -32,6 +42,7 @@ async def get_leaderboard(
     return [{"name": r.name, "walk_count": r.walk_count} for r in result]
 
 
+@timed_query
 async def get_walks_per_day(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -46,6 +57,7 @@ async def get_walks_per_day(
     return [{"day": str(r.day), "count": r.count} for r in result]
 
 
+@timed_query
 async def get_weekly_trends(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -61,6 +73,7 @@ async def get_weekly_trends(
     return [{"week_start": str(r.week_start), "count": r.count} for r in result]
 
 
+@timed_query
 async def get_poop_stats(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -79,6 +92,7 @@ async def get_poop_stats(
     ]
 
 
+@timed_query
 async def get_long_walk_stats(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -97,6 +111,7 @@ async def get_long_walk_stats(
     ]
 
 
+@timed_query
 async def get_hourly_distribution(
     session: AsyncSession, start_dt: datetime, end_dt: datetime, user_id: int | None = None
 ) -> list[dict]:
@@ -111,10 +126,14 @@ async def get_hourly_distribution(
     return [{"hour": r.hour, "count": r.count} for r in result]
 
 
+@timed_query
 async def get_all_users(session: AsyncSession) -> list[dict]:
-    sql = text(
-        "SELECT id, COALESCE(display_name, username, CONCAT('User ', telegram_id)) AS name "
-        "FROM users WHERE is_active = 1 ORDER BY name"
-    )
-    result = await session.execute(sql)
+    result = await session.execute(select(User.id, _user_name).where(User.is_active == True).order_by(_user_name))
     return [{"id": r.id, "name": r.name} for r in result]
+
+
+@timed_query
+async def get_user_names(session: AsyncSession) -> dict[int, str]:
+    """Display names of all users (active or not), keyed by user id."""
+    result = await session.execute(select(User.id, _user_name))
+    return {r.id: r.name for r in result}
@@ -1,14 +1,20 @@
+import asyncio
+import functools
 import hashlib
 import hmac
 import json
 import logging
+from collections.abc import Awaitable, Callable, Collection
 from datetime import datetime, timedelta, timezone
 from urllib.parse import parse_qs, unquote
 
 from fastapi import APIRouter, Header, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 
+from src.database.versions import USERS_VERSION
+from src.web.aggregates import DASHBOARD_KEYS, USER_KEYS, aggregates
+from src.web.assets import IMMUTABLE, assets
+from src.web.changes import dashboard_cache, watcher
 from src.web.config import settings
 from src.web.database import async_session
 from src.web.queries import (
@@ -17,15 +23,47 @@ from src.web.queries import (
     get_leaderboard,
     get_long_walk_stats,
     get_poop_stats,
+    get_user_names,
     get_walks_per_day,
     get_weekly_trends,
 )
+from src.web.shared_cache import shared_cache
+from src.web.timing import timed
 
 logger = logging.getLogger(__name__)
 
-templates = Jinja2Templates(directory="src/web/templates")
 router = APIRouter()
 
+SSE_KEEPALIVE_SECONDS = 15
+
+# SQL fallback per dashboard section, used until the aggregates are ready
+QUERIES = {
+    "leaderboard": get_leaderboard,
+    "walks_per_day": get_walks_per_day,
+    "weekly_trends": get_weekly_trends,
+    "poop_stats": get_poop_stats,
+    "long_walk_stats": get_long_walk_stats,
+    "hourly_distribution": get_hourly_distribution,
+}
+# /api/widgets/{name} -> the dashboard section it serves
+WIDGETS = {
+    "leaderboard": "leaderboard",
+    "daily": "walks_per_day",
+    "weekly": "weekly_trends",
+    "poop": "poop_stats",
+    "long-walk": "long_walk_stats",
+    "hourly": "hourly_distribution",
+}
+
+
+@functools.cache
+def _templates():
+    # Jinja is loaded on the first page view, not at import: API-only workers
+    # and tests never need it
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory="src/web/templates")
+
 
 def verify_telegram_init_data(init_data: str, bot_token: str) -> dict | None:
     """Verify Telegram WebApp initData and return parsed data if valid.
@@ -76,7 +114,7 @@ def check_access(init_data: str | None) -> JSONResponse | None:
     if not settings.bot_token:
         return None
 
-    user = verify_telegram_init_data(init_data, settings.bot_token)
+    user = _verified_user(init_data)
     if user is None:
         return JSONResponse({"error": "Invalid credentials"}, status_code=403)
 
@@ -86,17 +124,99 @@ def check_access(init_data: str | None) -> JSONResponse | None:
     return None
 
 
+def _verified_user(init_data: str) -> dict | None:
+    """verify_telegram_init_data, remembered across workers in the shared cache."""
+    if shared_cache is None:
+        return verify_telegram_init_data(init_data, settings.bot_token)
+
+    # Keyed by digest: the cache file should not hold replayable initData
+    key = "init_data:" + hashlib.sha256(init_data.encode()).hexdigest()
+    cached = shared_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    user = verify_telegram_init_data(init_data, settings.bot_token)
+    if user is not None:
+        shared_cache.put(key, json.dumps(user).encode(), settings.init_data_cache_ttl)
+    return user
+
+
 @router.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     # Page HTML loads without auth — the JS SDK provides initData client-side,
     # which is then sent as a header on all API calls for verification.
-    try:
-        async with async_session() as session:
-            users = await get_all_users(session)
-        return templates.TemplateResponse("dashboard.html", {"request": request, "users": users})
-    except Exception:
-        logger.exception("Failed to load dashboard page")
+    start_dt, end_dt = date_range(None, None)
+    headers = {"Cache-Control": "no-cache"}
+    if watcher.token:
+        # The page embeds the default-range data and links hashed assets
+        headers["ETag"] = f'"{assets.version};{watcher.token};{end_dt:%Y%m%d}"'
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+
+    body = await _cached_body(
+        ("page", start_dt, end_dt),
+        f"page:{assets.version}:{watcher.token}:{start_dt:%Y-%m-%d}:{end_dt:%Y-%m-%d}",
+        lambda: render_dashboard(start_dt, end_dt),
+    )
+    if body is None:
         return HTMLResponse("Service temporarily unavailable", status_code=503)
+    return HTMLResponse(body, headers=headers)
+
+
+async def render_dashboard(start_dt: datetime, end_dt: datetime) -> bytes:
+    """The dashboard page, with the ``start_dt``..``end_dt`` data embedded.
+
+    The data is the cached ``/api/dashboard`` body for that range, so the
+    first charts draw from the page itself rather than from more requests.
+    """
+    from markupsafe import Markup
+
+    users = await _users()
+    data = await _cached_body(
+        (start_dt, end_dt, None),
+        f"dashboard:{watcher.token}:{start_dt:%Y-%m-%d}:{end_dt:%Y-%m-%d}:None",
+        lambda: _json(build_dashboard(start_dt, end_dt, None)),
+    )
+    if data is None:
+        raise RuntimeError("Failed to fetch dashboard data")
+    # Inside <script> only "</" could end the element early; escaping every
+    # "<" keeps the JSON valid and the HTML inert
+    initial = f'{{"start":"{start_dt:%Y-%m-%d}","end":"{end_dt:%Y-%m-%d}","dashboard":{data.decode()}}}'
+    html = _templates().get_template("dashboard.html").render(
+        users=users,
+        initial_data=Markup(initial.replace("<", "\\u003c")),
+        asset_url=assets.url,
+    )
+    return html.encode()
+
+
+_users_cache: tuple[int, list[dict]] | None = None
+
+
+async def _users() -> list[dict]:
+    """get_all_users, reused while the users version is unchanged."""
+    global _users_cache
+    version = watcher.versions.get(USERS_VERSION)
+    if version is not None and _users_cache is not None and _users_cache[0] == version:
+        return _users_cache[1]
+    async with async_session() as session:
+        users = await get_all_users(session)
+    # Before the watcher has read the versions, nothing says when to drop it
+    if version is not None:
+        _users_cache = (version, users)
+    return users
+
+
+@router.get("/static/{name:path}")
+async def static_asset(name: str, accept_encoding: str = Header("")):
+    # Hashed names: content never changes under a URL, so no revalidation
+    asset = assets.get(name)
+    if asset is None:
+        return Response("Not found", status_code=404, media_type="text/plain")
+    body, encoding = asset.negotiate(accept_encoding)
+    headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=asset.content_type, headers=headers)
 
 
 @router.get("/api/dashboard")
@@ -106,10 +226,100 @@ async def dashboard_api(
     user_id: int | None = Query(None),
     x_telegram_init_data: str | None = Header(None),
 ):
-    error = check_access(x_telegram_init_data)
+    with timed("auth"):
+        error = check_access(x_telegram_init_data)
     if error:
         return error
 
+    start_dt, end_dt = date_range(start, end)
+    body = await _cached_body(
+        (start_dt, end_dt, user_id),
+        f"dashboard:{watcher.token}:{start_dt:%Y-%m-%d}:{end_dt:%Y-%m-%d}:{user_id}",
+        lambda: _json(build_dashboard(start_dt, end_dt, user_id)),
+    )
+    if body is None:
+        return JSONResponse({"error": "Service temporarily unavailable"}, status_code=503)
+    return Response(body, media_type="application/json")
+
+
+@router.get("/api/widgets/{widget}")
+async def widget_api(
+    widget: str,
+    request: Request,
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    user_id: int | None = Query(None),
+    x_telegram_init_data: str | None = Header(None),
+):
+    # One dashboard section, so each chart loads (and is cached) on its own
+    key = WIDGETS.get(widget)
+    if key is None:
+        return JSONResponse({"error": "Unknown widget"}, status_code=404)
+    with timed("auth"):
+        error = check_access(x_telegram_init_data)
+    if error:
+        return error
+
+    start_dt, end_dt = date_range(start, end)
+    # The browser revalidates every time; while the data version (and the
+    # resolved range) is unchanged, that costs a 304 and no lookup at all
+    headers = {"Cache-Control": "private, no-cache"}
+    if watcher.token:
+        headers["ETag"] = f'"{watcher.token};{start_dt:%Y%m%d}-{end_dt:%Y%m%d}"'
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+
+    async def section() -> list[dict]:
+        data = await build_dashboard(start_dt, end_dt, user_id, (key,))
+        return data[key]
+
+    body = await _cached_body(
+        (widget, start_dt, end_dt, user_id),
+        f"widget:{widget}:{watcher.token}:{start_dt:%Y-%m-%d}:{end_dt:%Y-%m-%d}:{user_id}",
+        lambda: _json(section()),
+    )
+    if body is None:
+        return JSONResponse({"error": "Service temporarily unavailable"}, status_code=503)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _json(data: Awaitable[object]) -> bytes:
+    """``data``, awaited and serialized as a compact JSON body."""
+    result = await data
+    with timed("serialize"):
+        return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def _cached_body(cache_key: tuple, shared_key: str, build: Callable[[], Awaitable[bytes]]) -> bytes | None:
+    """Response body for ``cache_key``, from the caches or ``build``; None if that fails.
+
+    Two tiers: this worker's memory, then the cache shared by all workers.
+    Shared entries are keyed by data version instead of being cleared.
+    """
+    with timed("cache"):
+        body = dashboard_cache.get(cache_key)
+        if body is None and shared_cache is not None:
+            body = shared_cache.get(shared_key)
+            if body is not None:
+                dashboard_cache.put(cache_key, body, dashboard_cache.generation)
+    if body is not None:
+        return body
+
+    generation = dashboard_cache.generation
+    try:
+        body = await build()
+    except Exception:
+        logger.exception("Failed to build %s", cache_key)
+        return None
+
+    if shared_cache is not None:
+        shared_cache.put(shared_key, body, settings.dashboard_cache_ttl)
+    dashboard_cache.put(cache_key, body, generation)
+    return body
+
+
+def date_range(start: str | None, end: str | None) -> tuple[datetime, datetime]:
+    """Parse the dashboard's start/end dates; the last 14 days by default."""
     today = datetime.now(timezone.utc).date()
     if start:
         start_dt = datetime.strptime(start, "%Y-%m-%d")
@@ -119,17 +329,47 @@ async def dashboard_api(
         end_dt = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
     else:
         end_dt = datetime.combine(today, datetime.max.time())
+    return start_dt, end_dt
 
-    try:
-        async with async_session() as session:
-            return {
-                "leaderboard": await get_leaderboard(session, start_dt, end_dt, user_id),
-                "walks_per_day": await get_walks_per_day(session, start_dt, end_dt, user_id),
-                "weekly_trends": await get_weekly_trends(session, start_dt, end_dt, user_id),
-                "poop_stats": await get_poop_stats(session, start_dt, end_dt, user_id),
-                "long_walk_stats": await get_long_walk_stats(session, start_dt, end_dt, user_id),
-                "hourly_distribution": await get_hourly_distribution(session, start_dt, end_dt, user_id),
-            }
-    except Exception:
-        logger.exception("Failed to fetch dashboard data")
-        return JSONResponse({"error": "Service temporarily unavailable"}, status_code=503)
+
+async def build_dashboard(
+    start_dt: datetime, end_dt: datetime, user_id: int | None, keys: Collection[str] = DASHBOARD_KEYS
+) -> dict:
+    """Compute the ``/api/dashboard`` payload (or its ``keys`` sections), bypassing the caches."""
+    async with async_session() as session:
+        if aggregates.ready:
+            # Names only matter to the per-user sections
+            names = await get_user_names(session) if USER_KEYS.intersection(keys) else None
+            with timed("aggregates"):
+                return aggregates.dashboard(start_dt, end_dt, user_id, names, keys)
+
+        # Until the aggregates have been loaded or built
+        return {key: await QUERIES[key](session, start_dt, end_dt, user_id) for key in DASHBOARD_KEYS if key in keys}
+
+
+@router.get("/api/changes")
+async def changes_stream(init_data: str | None = Query(None)):
+    # Server-sent events: one "change" event whenever the bot commits new
+    # data. EventSource cannot send headers, so initData comes as a query
+    # parameter here.
+    with timed("auth"):
+        error = check_access(init_data)
+    if error:
+        return error
+
+    async def events():
+        queue = watcher.subscribe()
+        try:
+            while True:
+                try:
+                    versions = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if versions is None:
+                    return
+                yield f"event: change\ndata: {json.dumps(versions)}\n\n"
+        finally:
+            watcher.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
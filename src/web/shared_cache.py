@@ -0,0 +1,72 @@
+import logging
+import sqlite3
+import time
+
+from src.web.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are deleted every this many writes
+_PRUNE_EVERY = 500
+
+
+class SharedCache:
+    """Byte values shared by all web workers on one host, in a local SQLite file.
+
+    Each uvicorn worker is a separate process with its own memory, so
+    without this every worker computes each dashboard (and verifies each
+    initData) itself. The file is opened lazily in each worker, in WAL mode
+    so readers never wait for a writer. It is only a cache: any SQLite error
+    is logged and treated as a miss.
+
+    Calls are synchronous. On a local disk a lookup takes tens of
+    microseconds, less than handing it to a thread would cost.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._writes = 0
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Shared cache read failed", exc_info=True)
+            return None
+        return row[0] if row else None
+
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error:
+            logger.warning("Shared cache write failed", exc_info=True)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+
+# None unless SHARED_CACHE_PATH is set
+shared_cache = SharedCache(settings.shared_cache_path) if settings.shared_cache_path else None
@@ -0,0 +1,266 @@
+// Telegram WebApp integration
+const tg = window.Telegram && window.Telegram.WebApp;
+if (tg) { tg.ready(); tg.expand(); }
+const initData = tg ? tg.initData : '';
+
+const chartColors = ['#7c3aed', '#f43f5e', '#06b6d4', '#f59e0b', '#a78bfa', '#fb7185', '#22d3ee', '#fbbf24'];
+let charts = {};
+
+function getTheme() {
+    return document.documentElement.getAttribute('data-theme') || 'dark';
+}
+
+function getChartOpts() {
+    const isDark = getTheme() === 'dark';
+    return {
+        foreColor: isDark ? '#e2e8f0' : '#334155',
+        gridColor: isDark ? 'rgba(255,255,255,0.08)' : 'rgba(0,0,0,0.08)',
+        tooltipTheme: isDark ? 'dark' : 'light',
+        trackBg: isDark ? 'rgba(255,255,255,0.06)' : 'rgba(0,0,0,0.06)',
+        totalLabelColor: isDark ? '#e2e8f0' : '#334155',
+        valueFontColor: isDark ? '#fff' : '#1e293b',
+        legendColor: isDark ? '#e2e8f0' : '#334155'
+    };
+}
+
+function initTheme() {
+    const saved = localStorage.getItem('dashboard-theme') || 'dark';
+    document.documentElement.setAttribute('data-theme', saved);
+    updateThemeIcon();
+}
+
+function toggleTheme() {
+    const next = getTheme() === 'dark' ? 'light' : 'dark';
+    document.documentElement.setAttribute('data-theme', next);
+    localStorage.setItem('dashboard-theme', next);
+    updateThemeIcon();
+    applyFilters();
+}
+
+function updateThemeIcon() {
+    document.getElementById('theme-icon').textContent = getTheme() === 'dark' ? '\u2600\uFE0F' : '\uD83C\uDF19';
+}
+
+function destroyCharts() {
+    Object.values(charts).forEach(c => { try { c.destroy(); } catch(e) {} });
+    charts = {};
+}
+
+function noData(el) {
+    document.getElementById(el).innerHTML = '<div class="no-data">No data for selected period</div>';
+}
+
+function setDefaults() {
+    if (initialData) {
+        document.getElementById('start').value = initialData.start;
+        document.getElementById('end').value = initialData.end;
+        return;
+    }
+    const today = new Date();
+    const start = new Date(today);
+    start.setDate(start.getDate() - 13);
+    document.getElementById('start').value = start.toISOString().split('T')[0];
+    document.getElementById('end').value = today.toISOString().split('T')[0];
+}
+
+async function fetchWidget(name) {
+    const start = document.getElementById('start').value;
+    const end = document.getElementById('end').value;
+    const userId = document.getElementById('user').value;
+    const params = new URLSearchParams();
+    if (start) params.set('start', start);
+    if (end) params.set('end', end);
+    if (userId) params.set('user_id', userId);
+    const headers = {};
+    if (initData) headers['X-Telegram-Init-Data'] = initData;
+    const resp = await fetch('/api/widgets/' + name + '?' + params.toString(), { headers });
+    if (!resp.ok) throw new Error('HTTP ' + resp.status);
+    return await resp.json();
+}
+
+function renderLeaderboard(data) {
+    const el = document.getElementById('leaderboard');
+    if (!data.length) { noData('leaderboard'); return; }
+    let html = '<table><thead><tr><th>#</th><th>Walker</th><th>Walks</th></tr></thead><tbody>';
+    data.forEach((r, i) => {
+        html += `<tr><td class="rank">${i + 1}</td><td>${r.name}</td><td>${r.walk_count}</td></tr>`;
+    });
+    html += '</tbody></table>';
+    el.innerHTML = html;
+}
+
+function renderWalksPerDay(data) {
+    if (!data.length) { noData('walks-per-day'); return; }
+    const opts = getChartOpts();
+    charts.walksPerDay = new ApexCharts(document.getElementById('walks-per-day'), {
+        chart: { type: 'bar', height: 300, background: 'transparent', foreColor: opts.foreColor },
+        series: [{ name: 'Walks', data: data.map(d => d.count) }],
+        xaxis: { categories: data.map(d => d.day), labels: { rotate: -45, style: { fontSize: '10px' } } },
+        colors: [chartColors[0]],
+        plotOptions: { bar: { borderRadius: 4, columnWidth: '60%' } },
+        dataLabels: { enabled: false },
+        grid: { borderColor: opts.gridColor },
+        tooltip: { theme: opts.tooltipTheme }
+    });
+    charts.walksPerDay.render();
+}
+
+function renderWeeklyTrends(data) {
+    if (!data.length) { noData('weekly-trends'); return; }
+    const opts = getChartOpts();
+    charts.weeklyTrends = new ApexCharts(document.getElementById('weekly-trends'), {
+        chart: { type: 'area', height: 280, background: 'transparent', foreColor: opts.foreColor },
+        series: [{ name: 'Walks', data: data.map(d => d.count) }],
+        xaxis: { categories: data.map(d => d.week_start) },
+        colors: [chartColors[2]],
+        fill: { type: 'gradient', gradient: { shadeIntensity: 1, opacityFrom: 0.5, opacityTo: 0.1 } },
+        stroke: { curve: 'smooth', width: 3 },
+        dataLabels: { enabled: false },
+        grid: { borderColor: opts.gridColor },
+        tooltip: { theme: opts.tooltipTheme }
+    });
+    charts.weeklyTrends.render();
+}
+
+function renderPoopStats(data) {
+    if (!data.length) { noData('poop-stats'); return; }
+    const opts = getChartOpts();
+    const totalWalks = data.reduce((s, d) => s + d.total, 0);
+    const totalDidntPoop = data.reduce((s, d) => s + d.didnt_poop_count, 0);
+    const pooped = totalWalks - totalDidntPoop;
+    charts.poopStats = new ApexCharts(document.getElementById('poop-stats'), {
+        chart: { type: 'donut', height: 300, background: 'transparent', foreColor: opts.foreColor },
+        series: [pooped, totalDidntPoop],
+        labels: ['Pooped', "Didn't poop"],
+        colors: [chartColors[2], chartColors[1]],
+        legend: { position: 'bottom', labels: { colors: opts.legendColor } },
+        plotOptions: { pie: { donut: { labels: { show: true, total: { show: true, label: 'Total', color: opts.totalLabelColor } } } } },
+        dataLabels: { style: { fontSize: '14px' } },
+        tooltip: { theme: opts.tooltipTheme }
+    });
+    charts.poopStats.render();
+}
+
+function renderLongWalkStats(data) {
+    if (!data.length) { noData('long-walk-stats'); return; }
+    const opts = getChartOpts();
+    const names = data.map(d => d.name);
+    const pcts = data.map(d => d.total > 0 ? Math.round((d.long_walk_count / d.total) * 100) : 0);
+    charts.longWalks = new ApexCharts(document.getElementById('long-walk-stats'), {
+        chart: { type: 'radialBar', height: 300, background: 'transparent', foreColor: opts.foreColor },
+        series: pcts,
+        labels: names,
+        colors: chartColors.slice(0, names.length),
+        plotOptions: {
+            radialBar: {
+                hollow: { size: '35%' },
+                dataLabels: {
+                    name: { fontSize: '14px', color: opts.foreColor },
+                    value: { fontSize: '18px', color: opts.valueFontColor, formatter: v => v + '%' }
+                },
+                track: { background: opts.trackBg }
+            }
+        },
+        legend: { show: true, position: 'bottom', labels: { colors: opts.legendColor } }
+    });
+    charts.longWalks.render();
+}
+
+function renderHourlyDist(data) {
+    if (!data.length) { noData('hourly-dist'); return; }
+    const opts = getChartOpts();
+    const hours = Array.from({ length: 24 }, (_, i) => i);
+    const counts = hours.map(h => {
+        const found = data.find(d => d.hour === h);
+        return found ? found.count : 0;
+    });
+    const labels = hours.map(h => h.toString().padStart(2, '0') + ':00');
+    charts.hourly = new ApexCharts(document.getElementById('hourly-dist'), {
+        chart: { type: 'bar', height: 280, background: 'transparent', foreColor: opts.foreColor },
+        series: [{ name: 'Walks', data: counts }],
+        xaxis: { categories: labels, labels: { rotate: -45, style: { fontSize: '10px' } } },
+        colors: [chartColors[3]],
+        plotOptions: { bar: { borderRadius: 3, columnWidth: '55%' } },
+        dataLabels: { enabled: false },
+        grid: { borderColor: opts.gridColor },
+        tooltip: { theme: opts.tooltipTheme }
+    });
+    charts.hourly.render();
+}
+
+// Each chart has its own endpoint and loads when its card scrolls into
+// view, so the first charts do not wait for the ones further down
+const widgets = {
+    'leaderboard': { name: 'leaderboard', key: 'leaderboard', render: renderLeaderboard },
+    'walks-per-day': { name: 'daily', key: 'walks_per_day', render: renderWalksPerDay },
+    'weekly-trends': { name: 'weekly', key: 'weekly_trends', render: renderWeeklyTrends },
+    'poop-stats': { name: 'poop', key: 'poop_stats', render: renderPoopStats },
+    'long-walk-stats': { name: 'long-walk', key: 'long_walk_stats', render: renderLongWalkStats },
+    'hourly-dist': { name: 'hourly', key: 'hourly_distribution', render: renderHourlyDist }
+};
+let loadGeneration = 0;
+
+// The page embeds the default range's dashboard; used until filters or data change
+let initialData = JSON.parse(document.getElementById('initial-data').textContent || 'null');
+
+function initialSection(key) {
+    if (!initialData) return null;
+    const matches = document.getElementById('start').value === initialData.start
+        && document.getElementById('end').value === initialData.end
+        && !document.getElementById('user').value;
+    return matches ? initialData.dashboard[key] : null;
+}
+const observer = 'IntersectionObserver' in window
+    ? new IntersectionObserver(entries => {
+        entries.filter(e => e.isIntersecting).forEach(e => {
+            observer.unobserve(e.target);
+            loadWidget(e.target.id);
+        });
+    }, { rootMargin: '200px' })
+    : null;
+
+async function loadWidget(id) {
+    const generation = loadGeneration;
+    let data = initialSection(widgets[id].key);
+    if (!data) {
+        try {
+            data = await fetchWidget(widgets[id].name);
+        } catch (e) {
+            data = [];
+        }
+    }
+    // Filters changed (or data moved) while this was in flight
+    if (generation !== loadGeneration) return;
+    widgets[id].render(data);
+}
+
+function applyFilters() {
+    loadGeneration++;
+    destroyCharts();
+    Object.keys(widgets).forEach(id => {
+        const el = document.getElementById(id);
+        el.innerHTML = '';
+        if (observer) {
+            observer.unobserve(el);
+            observer.observe(el);
+        } else {
+            loadWidget(id);
+        }
+    });
+}
+
+// Redraw when the bot records new walks or users change
+function watchChanges() {
+    const params = new URLSearchParams();
+    if (initData) params.set('init_data', initData);
+    const source = new EventSource('/api/changes?' + params.toString());
+    source.addEventListener('change', () => {
+        initialData = null;
+        applyFilters();
+    });
+}
+
+initTheme();
+setDefaults();
+applyFilters();
+watchChanges();
@@ -0,0 +1,88 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, ParamSpec, TypeVar
+
+from src import tracing
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# (name, milliseconds) spans of the request being handled, set by
+# ServerTimingMiddleware; None outside a timed request
+_spans: ContextVar[list[tuple[str, float]] | None] = ContextVar("server_timing_spans", default=None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Record the duration of the block as a Server-Timing entry and a trace span."""
+    spans = _spans.get()
+    if spans is None:
+        with tracing.span(f"web.{name}"):
+            yield
+        return
+    started = time.perf_counter()
+    try:
+        with tracing.span(f"web.{name}"):
+            yield
+    finally:
+        spans.append((name, (time.perf_counter() - started) * 1000))
+
+
+def timed_query(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    """Time an async query function, named after it without its ``get_`` prefix."""
+    name = func.__name__.removeprefix("get_")
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        with timed(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def collect_spans() -> Iterator[list[tuple[str, float]]]:
+    """Collect the spans recorded inside the block, outside of a request."""
+    spans: list[tuple[str, float]] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def format_server_timing(spans: list[tuple[str, float]], total: float) -> str:
+    """Render spans as a Server-Timing header value, e.g. ``auth;dur=0.12``."""
+    entries = [f"{name};dur={duration:.2f}" for name, duration in spans]
+    entries.append(f"total;dur={total:.2f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header listing the spans recorded by ``timed``.
+
+    Pure ASGI, so handlers run in the same context as the middleware and
+    their spans land in its list. Responses that recorded nothing (e.g.
+    static pages) are left alone. Also opens each request's root trace span.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start" and spans:
+                value = format_server_timing(spans, (time.perf_counter() - started) * 1000)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", value.encode())]}
+            await send(message)
+
+        with collect_spans() as spans, tracing.span(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,34 @@
+"""Fixtures shared by the test modules."""
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database.lease import LEADER_LEASE
+from src.database.models import Base, DataVersion, Lease
+from src.database.versions import USERS_VERSION, WALKS_VERSION
+
+# Rows the migrations insert along with the schema
+MIGRATED_ROWS = {
+    DataVersion: [{"name": USERS_VERSION, "version": 0}, {"name": WALKS_VERSION, "version": 0}],
+    Lease: [{"name": LEADER_LEASE}],
+}
+
+
+@pytest.fixture
+def make_session_factory():
+    """Async factory of session makers, each on a fresh in-memory SQLite DB.
+
+    The database looks migrated: full schema plus MIGRATED_ROWS. ``rows``
+    maps models to extra rows to insert, e.g. ``{User: [{...}, ...]}``.
+    Call it inside the test's event loop.
+    """
+
+    async def make(rows: dict | None = None) -> async_sessionmaker:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for model, values in {**MIGRATED_ROWS, **(rows or {})}.items():
+                await conn.execute(insert(model), values)
+        return async_sessionmaker(engine, expire_on_commit=False)
+
+    return make
@@ -0,0 +1,194 @@
+"""Tests for the dashboard aggregates and their binary snapshot."""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import insert, update
+
+from src.database.models import Walk
+from src.web import aggregates
+from src.web.aggregates import AggregateStore
+
+NAMES = {1: "alice", 2: "bob"}
+START, END = datetime(2026, 10, 1), datetime(2026, 10, 31, 23, 59, 59)
+
+
+def _walk(user_id, walked_at, didnt_poop=False, long_walk=False, is_finalized=True):
+    return {
+        "user_id": user_id,
+        "walked_at": walked_at,
+        "didnt_poop": didnt_poop,
+        "long_walk": long_walk,
+        "is_finalized": is_finalized,
+    }
+
+
+WALKS = [
+    _walk(1, datetime(2026, 10, 5, 8), didnt_poop=True),
+    _walk(1, datetime(2026, 10, 5, 8, 30)),
+    _walk(2, datetime(2026, 10, 6, 19), long_walk=True),
+    _walk(2, datetime(2026, 10, 7, 19), is_finalized=False),
+    _walk(2, datetime(2026, 9, 30, 7)),
+]
+
+
+def test_dashboard_from_aggregates(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore()
+        async with sessions() as session:
+            await store.rebuild(session)
+        return store.dashboard(START, END, None, NAMES), store.dashboard(START, END, 2, NAMES)
+
+    everyone, bob = asyncio.run(run())
+    assert everyone == {
+        "leaderboard": [{"name": "alice", "walk_count": 2}, {"name": "bob", "walk_count": 1}],
+        "walks_per_day": [{"day": "2026-10-05", "count": 2}, {"day": "2026-10-06", "count": 1}],
+        "weekly_trends": [{"week_start": "2026-10-05", "count": 3}],
+        "poop_stats": [
+            {"name": "alice", "total": 2, "didnt_poop_count": 1},
+            {"name": "bob", "total": 1, "didnt_poop_count": 0},
+        ],
+        "long_walk_stats": [
+            {"name": "alice", "total": 2, "long_walk_count": 0},
+            {"name": "bob", "total": 1, "long_walk_count": 1},
+        ],
+        "hourly_distribution": [{"hour": 8, "count": 2}, {"hour": 19, "count": 1}],
+    }
+    assert bob["leaderboard"] == [{"name": "bob", "walk_count": 1}]
+
+
+def test_dashboard_builds_only_requested_sections(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore()
+        async with sessions() as session:
+            await store.rebuild(session)
+        return (
+            store.dashboard(START, END, None, NAMES),
+            store.dashboard(START, END, None, None, ("hourly_distribution",)),
+            store.dashboard(START, END, None, NAMES, ("poop_stats", "walks_per_day")),
+        )
+
+    everything, hourly, some = asyncio.run(run())
+    assert hourly == {"hourly_distribution": everything["hourly_distribution"]}
+    assert some == {"walks_per_day": everything["walks_per_day"], "poop_stats": everything["poop_stats"]}
+
+
+def test_refresh_counts_new_and_late_finalized_walks_once(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore()
+        async with sessions() as session:
+            first = await store.refresh(session)
+            await session.execute(update(Walk).where(Walk.id == 4).values(is_finalized=True))
+            await session.execute(
+                insert(Walk).values(user_id=1, walked_at=datetime(2026, 10, 8, 9), is_finalized=True)
+            )
+            await session.commit()
+            second = await store.refresh(session)
+            third = await store.refresh(session)
+        return first, second, third, store.high_water, store.dashboard(START, END, None, NAMES)
+
+    first, second, third, high_water, data = asyncio.run(run())
+    assert (first, second, third, high_water) == (4, 2, 0, 6)
+    assert data["leaderboard"] == [{"name": "alice", "walk_count": 3}, {"name": "bob", "walk_count": 2}]
+
+
+def test_snapshot_round_trip(tmp_path, make_session_factory):
+    path = str(tmp_path / "aggregates.bin")
+
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore(path)
+        async with sessions() as session:
+            await store.rebuild(session)
+        await store.save()
+        saved = store.dashboard(START, END, None, NAMES)
+
+        restored = AggregateStore(path)
+        assert restored.load()
+        async with sessions() as session:
+            await session.execute(update(Walk).where(Walk.id == 4).values(is_finalized=True))
+            await session.commit()
+            counted = await restored.refresh(session)
+        return saved, restored.high_water, counted, restored.dashboard(START, END, None, NAMES)
+
+    saved, high_water, counted, data = asyncio.run(run())
+    assert high_water == 5
+    # Only the pending walk recorded in the snapshot is read back
+    assert counted == 1
+    assert data["walks_per_day"] == saved["walks_per_day"] + [{"day": "2026-10-07", "count": 1}]
+
+
+def test_save_without_path_compacts_in_memory(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore()
+        async with sessions() as session:
+            await store.rebuild(session)
+        before = store.dashboard(START, END, None, NAMES)
+        await store.save()
+        return before, store._delta, store.dashboard(START, END, None, NAMES)
+
+    before, delta, after = asyncio.run(run())
+    assert delta == {}
+    assert after == before
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "aggregates.bin"
+    path.write_bytes(b"garbage")
+    assert not AggregateStore(str(path)).load()
+    assert not AggregateStore(str(tmp_path / "missing.bin")).load()
+
+
+def test_gaps_stay_open_until_filled_or_confirmed_by_rebuild(make_session_factory):
+    def late(walk_id):
+        return insert(Walk).values(id=walk_id, **_walk(1, datetime(2026, 10, 9, walk_id)))
+
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS})
+        store = AggregateStore()
+        async with sessions() as session:
+            await store.refresh(session)
+            # Ids 6 and 8 are allocated but not committed yet
+            for walk_id in (7, 9):
+                await session.execute(late(walk_id))
+            await session.commit()
+            for _ in range(3):
+                await store.refresh(session)
+            gaps = sorted(store._open)
+
+            await session.execute(late(6))
+            await session.commit()
+            filled = await store.refresh(session)
+
+            # The first rebuild keeps a gap seen since the last one; the next drops it
+            await store.rebuild(session)
+            kept = 8 in store._open
+            await store.rebuild(session)
+            dropped = 8 not in store._open
+        return gaps, filled, kept, dropped, store.dashboard(START, END, None, NAMES)
+
+    gaps, filled, kept, dropped, data = asyncio.run(run())
+    assert gaps == [4, 6, 8]  # 4 is the pending walk
+    assert filled == 1
+    assert kept and dropped
+    assert data["leaderboard"][0] == {"name": "alice", "walk_count": 5}
+
+
+def test_only_the_highest_gaps_are_tracked(make_session_factory, monkeypatch):
+    monkeypatch.setattr(aggregates, "MAX_OPEN_GAPS", 3)
+
+    async def run():
+        sessions = await make_session_factory({Walk: WALKS + [{"id": 20, **_walk(1, datetime(2026, 10, 9))}]})
+        store = AggregateStore()
+        async with sessions() as session:
+            await store.rebuild(session)
+            await session.execute(insert(Walk).values(id=30, **_walk(1, datetime(2026, 10, 9))))
+            await session.commit()
+            await store.refresh(session)
+        return store._open
+
+    # The pending walk stays open whatever the cap
+    assert asyncio.run(run()) == {4: None, 27: 1, 28: 1, 29: 1}
@@ -0,0 +1,95 @@
+"""Tests for the dashboard's content-hashed static assets."""
+import gzip
+import hashlib
+import io
+import urllib.request
+
+import pytest
+
+from src.web.assets import STATIC_PREFIX, VENDOR, AssetManifest, read_lock, vendor
+
+
+@pytest.fixture
+def static(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('dashboard');\n" * 50)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+def test_urls_are_content_hashed(static):
+    manifest = AssetManifest(static)
+    url = manifest.url("app.js")
+    assert url.startswith(STATIC_PREFIX + "app.") and url.endswith(".js")
+
+    asset = manifest.get(url.removeprefix(STATIC_PREFIX))
+    assert asset.body == (static / "app.js").read_bytes()
+    assert asset.content_type == "text/javascript; charset=utf-8"
+    assert manifest.get("app.js") is None
+
+
+def test_edits_change_url_and_version(static):
+    before = AssetManifest(static)
+    before_url, before_version = before.url("app.js"), before.version
+    (static / "app.js").write_text("console.log('edited');\n")
+    after = AssetManifest(static)
+    assert after.url("app.js") != before_url
+    assert after.url("logo.png") == before.url("logo.png")
+    assert after.version != before_version
+
+
+def test_negotiates_precompressed_variant(static):
+    manifest = AssetManifest(static)
+    asset = manifest.get(manifest.url("app.js").removeprefix(STATIC_PREFIX))
+
+    body, encoding = asset.negotiate("gzip, deflate")
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == asset.body
+    assert asset.negotiate("gzip;q=0") == (asset.body, None)
+    assert asset.negotiate("") == (asset.body, None)
+
+
+def test_binary_files_are_not_compressed(static):
+    manifest = AssetManifest(static)
+    asset = manifest.get(manifest.url("logo.png").removeprefix(STATIC_PREFIX))
+    assert asset.variants == {}
+
+
+def test_missing_vendor_files_fall_back_to_cdn(static):
+    manifest = AssetManifest(static)
+    name = next(iter(VENDOR))
+    assert manifest.url(name) == VENDOR[name]
+    with pytest.raises(KeyError):
+        manifest.url("missing.js")
+
+
+@pytest.fixture
+def cdn(monkeypatch):
+    """Serve every VENDOR URL from a dict of bodies instead of the network."""
+    bodies = {url: f"/* {name} */".encode() for name, url in VENDOR.items()}
+    monkeypatch.setattr(urllib.request, "urlopen", lambda url, timeout: io.BytesIO(bodies[url]))
+    return bodies
+
+
+def test_vendor_pins_then_verifies(tmp_path, cdn):
+    lock = tmp_path / "vendor.sha256"
+    # Unpinned files are left to the CDN rather than failing the build
+    vendor(tmp_path, lock=lock)
+    assert not (tmp_path / "vendor").exists()
+
+    vendor(tmp_path, pin=True, lock=lock)
+    assert read_lock(lock) == {name: hashlib.sha256(cdn[url]).hexdigest() for name, url in VENDOR.items()}
+
+    vendor(tmp_path, force=True, lock=lock)
+    for name, url in VENDOR.items():
+        assert (tmp_path / name).read_bytes() == cdn[url]
+
+
+def test_vendor_rejects_changed_upstream_file(tmp_path, cdn):
+    lock = tmp_path / "vendor.sha256"
+    vendor(tmp_path, pin=True, lock=lock)
+    name, url = next(iter(VENDOR.items()))
+    cdn[url] = b"/* tampered */"
+
+    with pytest.raises(ValueError, match="does not match pinned"):
+        vendor(tmp_path, force=True, lock=lock)
+    assert (tmp_path / name).read_bytes() != b"/* tampered */"
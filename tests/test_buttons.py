@@ -0,0 +1,87 @@
+"""Tests for the reply-button dispatch index."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram.types import Chat, Message
+
+from src.bot.buttons import ButtonIndex, dispatch_button
+from src.bot.handlers import buttons
+from src.bot.i18n import TEXTS
+
+
+def make_message(text: str | None) -> Message:
+    return Message(message_id=1, date=datetime(2024, 6, 15), chat=Chat(id=1, type="private"), text=text)
+
+
+BUTTON_KEYS = [
+    "walk_button",
+    "walk_at_time_button",
+    "didnt_poop",
+    "long_walk",
+    "send",
+    "cancel",
+    "change_name_button",
+    "ask_walk_button",
+]
+
+
+# ---------------------------------------------------------------------------
+# ButtonIndex
+# ---------------------------------------------------------------------------
+
+def test_on_registers_every_language():
+    index = ButtonIndex()
+
+    @index.on("send")
+    async def handler():
+        pass
+
+    for lang in TEXTS:
+        result = asyncio.run(index(make_message(TEXTS[lang]["send"])))
+        assert result["button_handler"].callback is handler
+
+
+def test_unknown_text_fails_filter():
+    index = ButtonIndex()
+    index.on("send")(lambda: None)
+    assert asyncio.run(index(make_message("14:30"))) is False
+    assert asyncio.run(index(make_message(None))) is False
+
+
+def test_duplicate_label_rejected():
+    index = ButtonIndex()
+    index.on_label("x")(lambda: None)
+    with pytest.raises(ValueError):
+        index.on_label("x")(lambda: None)
+
+
+def test_dispatch_passes_only_requested_data():
+    received = {}
+
+    async def handler(message, user):
+        received.update(message=message, user=user)
+        return "done"
+
+    index = ButtonIndex()
+    index.on_label("x")(handler)
+    message = make_message("x")
+    match = asyncio.run(index(message))
+    result = asyncio.run(dispatch_button(message, **match, user="u", session="s"))
+    assert result == "done"
+    assert received == {"message": message, "user": "u"}
+
+
+# ---------------------------------------------------------------------------
+# bot handlers are all reachable through the index
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("lang", ["ru", "en"])
+@pytest.mark.parametrize("key", BUTTON_KEYS)
+def test_bot_buttons_registered(lang, key):
+    assert asyncio.run(buttons(make_message(TEXTS[lang][key]))) is not False
+
+
+@pytest.mark.parametrize("label", ["🇷🇺 Русский", "🇬🇧 English"])
+def test_language_buttons_registered(label):
+    assert asyncio.run(buttons(make_message(label))) is not False
@@ -0,0 +1,53 @@
+"""Tests for the web side's data-version watcher and response cache."""
+import asyncio
+
+from src.database import crud
+from src.database.versions import USERS_VERSION, WALKS_VERSION
+from src.web.changes import ResponseCache, VersionWatcher
+
+
+def test_watcher_notifies_only_when_versions_move(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        watcher = VersionWatcher(sessions, interval=60)
+        seen = []
+        # Callbacks run before the token moves to the new versions
+        watcher.on_change(lambda versions: seen.append((versions, watcher.token)))
+        queue = watcher.subscribe()
+
+        first = await watcher.check()
+        unchanged = await watcher.check()
+        async with sessions() as session:
+            await crud.create_walk(session, 1, is_finalized=True)
+            await session.commit()
+        changed = await watcher.check()
+        await watcher.stop()
+        return first, unchanged, changed, seen, [queue.get_nowait() for _ in range(queue.qsize())]
+
+    first, unchanged, changed, seen, pushed = asyncio.run(run())
+    assert (first, unchanged, changed) == (True, False, True)
+    assert seen[-1] == ({USERS_VERSION: 0, WALKS_VERSION: 1}, "users=0,walks=0")
+    # The queue keeps only the newest item: the stop marker
+    assert pushed == [None]
+
+
+def test_cache_drops_results_computed_across_a_clear():
+    cache = ResponseCache(ttl=60)
+    generation = cache.generation
+    cache.clear()
+    cache.put("key", "stale", generation)
+    assert cache.get("key") is None
+
+    cache.put("key", "fresh", cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+def test_cache_expires_and_evicts():
+    cache = ResponseCache(ttl=0)
+    cache.put("a", 1, cache.generation)
+    assert cache.get("a") is None
+
+    cache = ResponseCache(ttl=60, max_entries=2)
+    for key in "abc":
+        cache.put(key, key, cache.generation)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (None, "b", "c")
@@ -0,0 +1,93 @@
+"""Tests for the crud helpers' read-model results."""
+import asyncio
+
+from sqlalchemy import event, select
+
+from src.database import crud
+from src.database.models import Walk
+from src.database.readmodels import UserInfo, WalkInfo
+from src.database.versions import USERS_VERSION, WALKS_VERSION, read_versions
+
+
+def test_get_or_create_user_returns_read_model(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            created = await crud.get_or_create_user(session, 5, "alice")
+            found = await crud.get_or_create_user(session, 5, "ignored")
+            await session.commit()
+        return created, found
+
+    created, found = asyncio.run(run())
+    assert isinstance(created, UserInfo)
+    assert created == found == UserInfo(created.id, 5, "alice", None, "ru", True)
+
+
+def test_create_walk_returns_read_model(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5)
+            walk = await crud.create_walk(session, user.id, long_walk=True, is_finalized=True)
+            stored = (await session.execute(select(Walk.walked_at, Walk.long_walk, Walk.is_finalized))).one()
+        return walk, stored
+
+    walk, stored = asyncio.run(run())
+    assert isinstance(walk, WalkInfo) and walk.id > 0 and walk.long_walk
+    assert stored == (walk.walked_at, True, True)
+
+
+def test_only_finalized_walks_bump_walks_version(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5, "alice")
+            await crud.create_walk(session, user.id)
+            after_pending = await read_versions(session)
+            await crud.create_walk(session, user.id, is_finalized=True)
+            await session.commit()
+            return after_pending, await read_versions(session)
+
+    after_pending, final = asyncio.run(run())
+    assert after_pending == {USERS_VERSION: 1, WALKS_VERSION: 0}
+    assert final == {USERS_VERSION: 1, WALKS_VERSION: 1}
+
+
+def _count_statements(sessions) -> list:
+    statements = []
+    event.listen(sessions.kw["bind"].sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_user_mutators_update_only_their_row(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            alice = await crud.get_or_create_user(session, 5, "alice")
+            bob = await crud.get_or_create_user(session, 6, "bob")
+            statements = _count_statements(sessions)
+            await crud.set_user_language(session, alice.id, "en")
+            await crud.set_display_name(session, alice.id, "Alice")
+            count = len(statements)
+            await session.commit()
+            after = await crud.get_user_by_telegram_id(session, 5), await crud.get_user_by_telegram_id(session, 6)
+        return count, bob, after
+
+    statements, bob, (alice, bob_after) = asyncio.run(run())
+    # One UPDATE each, each plus the users data-version bump
+    assert statements == 4
+    assert (alice.language, alice.display_name) == ("en", "Alice")
+    assert bob_after == bob
+
+
+def test_new_user_matches_the_stored_row(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            created = await crud.get_or_create_user(session, 5, "alice")
+            await session.commit()
+        async with sessions() as session:
+            return created, await crud.get_user_by_telegram_id(session, 5)
+
+    created, stored = asyncio.run(run())
+    assert created == stored
@@ -0,0 +1,91 @@
+"""Tests for the cached user directory."""
+import asyncio
+
+from sqlalchemy import event
+
+from src.database import crud
+from src.database.directory import UserDirectory, directory
+from src.database.models import User
+
+USERS = [
+    {"telegram_id": 1, "language": "ru", "is_active": True},
+    {"telegram_id": 2, "language": "en", "is_active": True},
+    {"telegram_id": 3, "language": "en", "is_active": False},
+]
+
+
+def test_get_and_rosters(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({User: USERS})
+        cache = UserDirectory()
+        async with sessions() as session:
+            return (
+                await cache.get(session, 2),
+                await cache.get(session, 99),
+                await cache.active_users(session),
+                await cache.active_by_language(session),
+            )
+
+    user, missing, active, by_language = asyncio.run(run())
+    assert user.telegram_id == 2 and user.language == "en"
+    assert missing is None
+    assert [u.telegram_id for u in active] == [1, 2]
+    assert {lang: [u.telegram_id for u in group] for lang, group in by_language.items()} == {
+        "ru": [1],
+        "en": [2],
+    }
+
+
+def test_cached_reads_skip_db(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({User: USERS})
+        cache = UserDirectory()
+        statements = []
+        event.listen(
+            sessions.kw["bind"].sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        async with sessions() as session:
+            await cache.get(session, 1)
+        loaded = len(statements)
+        async with sessions() as session:
+            await cache.get(session, 2)
+            await cache.active_users(session)
+        return loaded, len(statements)
+
+    loaded, total = asyncio.run(run())
+    assert loaded > 0
+    assert total == loaded
+
+
+def test_write_through_invalidation(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({User: USERS})
+        async with sessions() as session:
+            directory.invalidate()
+            user = await directory.get(session, 1)
+            await crud.set_display_name(session, user.id, "Alice")
+            await session.commit()
+        async with sessions() as session:
+            return await directory.get(session, 1)
+
+    assert asyncio.run(run()).display_name == "Alice"
+
+
+def test_version_change_from_another_process_reloads(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({User: USERS})
+        cache = UserDirectory(check_interval=0)
+        other = UserDirectory()
+        async with sessions() as session:
+            user = await cache.get(session, 1)
+        async with sessions() as session:
+            # Simulate a write made through another process's directory
+            await crud.set_user_language(session, user.id, "en")
+            await other.mark_changed(session)
+            await session.commit()
+        async with sessions() as session:
+            return await cache.get(session, 1)
+
+    assert asyncio.run(run()).language == "en"
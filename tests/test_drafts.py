@@ -0,0 +1,104 @@
+"""Tests for walk drafts kept in FSM storage."""
+import asyncio
+from datetime import datetime, timedelta
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.bot.drafts import WALK_TIMEOUT_MINUTES, WalkDraft, get_draft, pop_draft, save_draft
+from src.bot.storage import SqlStorage
+
+
+def make_state() -> FSMContext:
+    return FSMContext(storage=MemoryStorage(), key=StorageKey(bot_id=1, chat_id=2, user_id=2))
+
+
+# ---------------------------------------------------------------------------
+# WalkDraft
+# ---------------------------------------------------------------------------
+
+def test_start_sets_expiry():
+    draft = WalkDraft.start()
+    assert draft.expires_at - draft.walked_at == timedelta(minutes=WALK_TIMEOUT_MINUTES)
+    assert not draft.didnt_poop
+    assert not draft.long_walk
+
+
+def test_start_keeps_custom_walked_at():
+    walked_at = datetime(2024, 6, 15, 8, 30)
+    draft = WalkDraft.start(walked_at=walked_at)
+    assert draft.walked_at == walked_at
+    assert draft.expires_at > walked_at
+
+
+def test_dict_round_trip():
+    draft = WalkDraft(
+        walked_at=datetime(2024, 6, 15, 8, 30),
+        expires_at=datetime(2024, 6, 15, 8, 35),
+        didnt_poop=True,
+    )
+    data = draft.to_dict()
+    assert isinstance(data["walked_at"], str)
+    assert WalkDraft.from_dict(data) == draft
+
+
+def test_dict_round_trip_keeps_editor_message():
+    draft = WalkDraft.start()
+    draft.message_id = 77
+    assert WalkDraft.from_dict(draft.to_dict()).message_id == 77
+
+
+# ---------------------------------------------------------------------------
+# FSM storage helpers
+# ---------------------------------------------------------------------------
+
+def test_get_draft_empty():
+    assert asyncio.run(get_draft(make_state())) is None
+
+
+def test_save_then_get():
+    async def run():
+        state = make_state()
+        draft = WalkDraft.start()
+        draft.long_walk = True
+        await save_draft(state, draft)
+        return draft, await get_draft(state)
+
+    saved, loaded = asyncio.run(run())
+    assert loaded == saved
+
+
+def test_pop_removes_draft_and_keeps_other_data():
+    async def run():
+        state = make_state()
+        await state.update_data(other=1)
+        await save_draft(state, WalkDraft.start())
+        popped = await pop_draft(state)
+        return popped, await get_draft(state), await state.get_data()
+
+    popped, remaining, data = asyncio.run(run())
+    assert popped is not None
+    assert remaining is None
+    assert data == {"other": 1}
+
+
+def test_pop_without_draft():
+    assert asyncio.run(pop_draft(make_state())) is None
+
+
+def test_pop_draft_claims_shared_draft_once(make_session_factory):
+    # Two bot processes on the same DB, e.g. a Send tap and the leader's sweep
+    async def run():
+        sessions = await make_session_factory()
+        key = StorageKey(bot_id=1, chat_id=2, user_id=2)
+        first = FSMContext(storage=SqlStorage(sessions), key=key)
+        second = FSMContext(storage=SqlStorage(sessions), key=key)
+        draft = WalkDraft.start()
+        await save_draft(first, draft)
+        seen = await get_draft(second)
+        return draft, seen, await pop_draft(first), await pop_draft(second)
+
+    draft, seen, claimed, late = asyncio.run(run())
+    assert seen == claimed == draft
+    assert late is None
@@ -1,7 +1,7 @@
 """Tests for the i18n module."""
 import pytest
 
-from src.bot.i18n import TEXTS, get_text
+from src.bot.i18n import CATALOGS, TEXTS, get_text, render
 
 LANGUAGES = ("ru", "en")
 
@@ -119,3 +119,29 @@ def test_ask_walk_button_not_empty(lang):
 @pytest.mark.parametrize("lang", LANGUAGES)
 def test_ask_walk_all_not_empty(lang):
     assert len(TEXTS[lang]["ask_walk_all"]) > 0
+
+
+# ---------------------------------------------------------------------------
+# compiled catalogs and render
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("lang", LANGUAGES)
+def test_catalogs_match_texts(lang):
+    assert {key: t.text for key, t in CATALOGS[lang].items()} == TEXTS[lang]
+
+
+def test_render_fills_placeholders():
+    result = render("name_set", "en", name="Alice")
+    assert result == TEXTS["en"]["name_set"].format(name="Alice")
+
+
+def test_render_static_text_ignores_kwargs():
+    assert render("walk_sent", "en", unused=1) == TEXTS["en"]["walk_sent"]
+
+
+def test_render_fallback_unknown_lang():
+    assert render("name_set", "fr", name="A") == TEXTS["ru"]["name_set"].format(name="A")
+
+
+def test_render_missing_key_returns_key():
+    assert render("this_key_does_not_exist", "en") == "this_key_does_not_exist"
@@ -0,0 +1,38 @@
+"""Cold-start import budget for the bot and web entry points.
+
+Each entry point is imported in a fresh interpreter under ``-X importtime``
+(see benchmarks/import_time.py for the full report). Budgets leave ~50%
+headroom over a typical run; IMPORT_TIME_BUDGET_SCALE stretches them on
+slow machines.
+"""
+import os
+
+import pytest
+
+from benchmarks.import_time import best_of
+
+BUDGET_SCALE = float(os.environ.get("IMPORT_TIME_BUDGET_SCALE", "1"))
+
+# Entry point -> (budget in ms, modules it must only import when used)
+ENTRY_POINTS = {
+    "src.bot.main": (3500, ("alembic", "apscheduler", "aiohttp.web", "sqlalchemy.dialects.postgresql")),
+    "src.web.main": (1000, ("alembic", "jinja2", "starlette.templating")),
+}
+
+
+@pytest.fixture(scope="module", params=list(ENTRY_POINTS))
+def measured(request):
+    return request.param, best_of(request.param, runs=2)
+
+
+def test_lazy_imports_stay_lazy(measured):
+    module, times = measured
+    _, deferred = ENTRY_POINTS[module]
+    assert [name for name in deferred if name in times] == []
+
+
+def test_import_time_within_budget(measured):
+    module, times = measured
+    budget, _ = ENTRY_POINTS[module]
+    total_ms = times[module].cumulative_us / 1000
+    assert total_ms <= budget * BUDGET_SCALE, f"{module} imports in {total_ms:.0f} ms, budget {budget} ms"
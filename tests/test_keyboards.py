@@ -3,7 +3,8 @@ from types import SimpleNamespace
 
 import pytest
 
-from src.bot.keyboards import ask_walk_keyboard, main_keyboard, parameter_keyboard
+from src.bot.config import settings
+from src.bot.keyboards import ask_walk_keyboard, main_keyboard, parameter_keyboard, walk_editor_keyboard
 
 
 def make_user(display_name=None, username=None, telegram_id=12345):
@@ -117,3 +118,39 @@ def test_parameter_keyboard_has_send_and_cancel_en():
     texts = [btn.text for row in kb.keyboard for btn in row]
     assert any("Send" in t for t in texts)
     assert any("Cancel" in t for t in texts)
+
+
+# ---------------------------------------------------------------------------
+# walk_editor_keyboard
+# ---------------------------------------------------------------------------
+
+def test_walk_editor_keyboard_checks_set_flags():
+    kb = walk_editor_keyboard("en", didnt_poop=True, long_walk=False)
+    flags, actions = kb.inline_keyboard
+    assert flags[0].text.startswith("☑") and flags[0].callback_data == "walk:didnt_poop"
+    assert flags[1].text.startswith("☐") and flags[1].callback_data == "walk:long_walk"
+    assert [btn.callback_data for btn in actions] == ["walk:send", "walk:cancel"]
+
+
+# ---------------------------------------------------------------------------
+# memoization
+# ---------------------------------------------------------------------------
+
+def test_parameter_keyboard_is_memoized_per_language():
+    assert parameter_keyboard("en") is parameter_keyboard("en")
+    assert parameter_keyboard("en") is not parameter_keyboard("ru")
+
+
+def test_main_keyboard_rebuilt_when_webapp_url_changes():
+    original = settings.webapp_url
+    try:
+        settings.webapp_url = ""
+        without_url = main_keyboard("en")
+        assert main_keyboard("en") is without_url
+
+        settings.webapp_url = "https://example.com"
+        with_url = main_keyboard("en")
+        assert with_url is not without_url
+        assert with_url.keyboard[-1][0].web_app.url == "https://example.com"
+    finally:
+        settings.webapp_url = original
@@ -0,0 +1,70 @@
+"""Tests for leader election on the leases table."""
+import asyncio
+from types import SimpleNamespace
+
+from src.bot import main as bot_main
+from src.database.lease import LeaderLease
+
+
+def test_only_one_holder_and_release_hands_over(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        first, second = LeaderLease(sessions), LeaderLease(sessions)
+        results = [await first.renew(), await second.renew(), await first.renew()]
+        await first.release()
+        results += [first.is_leader, await second.renew(), await first.renew()]
+        return results
+
+    assert asyncio.run(run()) == [True, False, True, False, True, False]
+
+
+def test_standby_takes_over_after_expiry(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        first, second = LeaderLease(sessions, ttl=0.05), LeaderLease(sessions, ttl=0.05)
+        await first.renew()
+        blocked = await second.renew()
+        await asyncio.sleep(0.1)
+        # The old holder stops claiming leadership without talking to the DB
+        return blocked, first.is_leader, await second.renew(), await first.renew()
+
+    assert asyncio.run(run()) == (False, False, True, False)
+
+
+class FakeDispatcher:
+    """Records start_polling/stop_polling like aiogram's Dispatcher."""
+
+    def __init__(self) -> None:
+        self.polls = 0
+        self.polling = False
+        self._stop = asyncio.Event()
+
+    async def start_polling(self, bot, **kwargs) -> None:
+        self.polls += 1
+        self.polling = True
+        self._stop.clear()
+        await self._stop.wait()
+        self.polling = False
+
+    async def stop_polling(self) -> None:
+        self._stop.set()
+
+
+def test_only_the_leader_polls(monkeypatch):
+    monkeypatch.setattr(bot_main, "LEADER_CHECK_SECONDS", 0.01)
+
+    async def run():
+        dp, lease, stop = FakeDispatcher(), SimpleNamespace(is_leader=False), asyncio.Event()
+        task = asyncio.create_task(bot_main.poll_while_leader(dp, None, lease, stop))
+        seen = []
+        for is_leader in (False, True, False, True):
+            lease.is_leader = is_leader
+            await asyncio.sleep(0.05)
+            seen.append((dp.polls, dp.polling))
+        stop.set()
+        await task
+        return seen, dp.polling
+
+    seen, polling_after_stop = asyncio.run(run())
+    assert seen == [(0, False), (1, True), (1, False), (2, True)]
+    assert not polling_after_stop
@@ -0,0 +1,116 @@
+"""Tests for the background log writer and rotating file target."""
+import gzip
+import os
+import threading
+import time
+
+from loguru import logger
+
+from src.bot.log_sinks import QueueWriter, RotatingFile, sink_levels
+
+
+class ListTarget:
+    def __init__(self, gate: threading.Event | None = None):
+        self.lines: list[str] = []
+        self.gate = gate
+
+    def write(self, message: str) -> None:
+        if self.gate is not None:
+            self.gate.wait()
+        self.lines.append(str(message))
+
+
+def test_writes_in_order_and_flushes_on_stop():
+    target = ListTarget()
+    writer = QueueWriter(target)
+    for i in range(100):
+        writer.write(f"line {i}\n")
+    writer.stop()
+    assert target.lines == [f"line {i}\n" for i in range(100)]
+
+
+def test_full_queue_drops_and_reports():
+    gate = threading.Event()
+    target = ListTarget(gate)
+    writer = QueueWriter(target, maxsize=2)
+    for i in range(20):
+        writer.write(f"line {i}\n")
+    assert writer.dropped > 0
+    gate.set()
+    writer.stop()
+    assert any("log records dropped" in line for line in target.lines)
+    assert len(target.lines) < 21
+
+
+def test_full_queue_keeps_warnings_without_waiting():
+    gate = threading.Event()
+    target = ListTarget(gate)
+    writer = QueueWriter(target, maxsize=2)
+    handler_id = logger.add(writer, format="{level} {message}", level="INFO")
+    try:
+        for i in range(5):
+            logger.info("line {}", i)
+        started = time.monotonic()
+        logger.warning("disk almost full")
+        elapsed = time.monotonic() - started
+        gate.set()
+    finally:
+        logger.remove(handler_id)
+    assert elapsed < 0.1
+    assert "WARNING disk almost full\n" in target.lines
+
+
+def test_module_override_below_sink_level():
+    level, module_filter = sink_levels("INFO", {"tests.test_log_sinks": "DEBUG", "aiogram": "WARNING"})
+    assert level == "DEBUG"
+    assert module_filter[""] == "INFO"
+    assert sink_levels("INFO", {}) == ("INFO", None)
+
+    target = ListTarget()
+    handler_id = logger.add(QueueWriter(target), format="{message}", level=level, filter=module_filter)
+    try:
+        logger.debug("from the overridden module")
+        logger.patch(lambda record: record.update(name="src.bot.other")).debug("from another module")
+    finally:
+        logger.remove(handler_id)
+    assert target.lines == ["from the overridden module\n"]
+
+
+def test_as_loguru_sink_with_lazy_args():
+    target = ListTarget()
+    writer = QueueWriter(target)
+    handler_id = logger.add(writer, format="{level} {message}", level="INFO")
+    try:
+        logger.info("walk {} by {!r}", 1, "alice")
+        logger.debug("not emitted {}", 2)
+    finally:
+        logger.remove(handler_id)  # stops the writer
+    assert target.lines == ["INFO walk 1 by 'alice'\n"]
+
+
+def test_rotating_file_compresses_backups(tmp_path):
+    path = tmp_path / "bot.log"
+    log_file = RotatingFile(str(path), max_bytes=50, backup_count=2)
+    for i in range(10):
+        log_file.write(f"line number {i:02d}\n")
+    log_file.close()
+
+    backups = sorted(tmp_path.glob("bot.log.*.gz"))
+    assert len(backups) == 2
+    assert gzip.decompress(backups[0].read_bytes()).startswith(b"line number")
+    assert path.read_text().startswith("line number")
+
+
+def test_rotating_file_drops_backups_past_max_age(tmp_path):
+    path = tmp_path / "bot.log"
+    stale = tmp_path / "bot.log.5.gz"
+    stale.write_bytes(gzip.compress(b"old"))
+    os.utime(stale, (0, 0))
+
+    log_file = RotatingFile(str(path), max_bytes=50, backup_count=10, max_age=3600)
+    for i in range(5):
+        log_file.write(f"line number {i:02d}\n")
+    log_file.close()
+
+    backups = sorted(p.name for p in tmp_path.glob("bot.log.*.gz"))
+    assert backups and all(os.path.getmtime(tmp_path / name) > 0 for name in backups)
@@ -0,0 +1,48 @@
+"""Tests for the in-process metrics registry and its text rendering."""
+import asyncio
+
+import pytest
+
+from src.bot.metrics import Counter, Histogram, MetricsMiddleware
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("h_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "a")
+    hist.observe(0.1, "a")
+    hist.observe(0.5, "a")
+    hist.observe(3.0, "a")
+
+    lines = hist.render()
+    assert 'h_seconds_bucket{op="a",le="0.1"} 2' in lines
+    assert 'h_seconds_bucket{op="a",le="1"} 3' in lines
+    assert 'h_seconds_bucket{op="a",le="+Inf"} 4' in lines
+    assert 'h_seconds_count{op="a"} 4' in lines
+    assert hist.count("a") == 4
+    assert hist.count("b") == 0
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("c_total", "Test.", ("name",))
+    counter.inc('say "hi"')
+    counter.inc('say "hi"')
+    assert counter.render()[-1] == 'c_total{name="say \\"hi\\""} 2'
+
+
+def test_middleware_names_handler_and_counts_errors():
+    from src.bot import metrics
+
+    class Callback:
+        __name__ = "broken_handler"
+
+    class Target:
+        callback = Callback()
+
+    async def handler(event, data):
+        raise RuntimeError("boom")
+
+    before = metrics.HANDLER_SECONDS.count("broken_handler")
+    with pytest.raises(RuntimeError):
+        asyncio.run(MetricsMiddleware()(handler, object(), {"handler": Target()}))
+    assert metrics.HANDLER_SECONDS.count("broken_handler") == before + 1
+    assert metrics.HANDLER_ERRORS.value("broken_handler") >= 1
@@ -0,0 +1,38 @@
+"""Tests for the microbenchmark harness in benchmarks/micro.py.
+
+The timing check itself is the ``python -m benchmarks.micro`` gate; it only
+runs here with MICROBENCH=1, since wall-clock ratios are noisy on shared
+machines.
+"""
+import os
+
+import pytest
+
+from benchmarks.micro import CASES, DEFAULT_TOLERANCE, compare, load_baseline, measure
+
+
+def _result(**relative):
+    return {"cases": {name: {"ns": 0.0, "relative": value} for name, value in relative.items()}}
+
+
+def test_compare_reports_only_regressions_past_tolerance():
+    baseline = _result(fast=1.0, slow=1.0, gone=1.0)
+    current = _result(fast=0.5, slow=1.6, new=9.0)
+    assert compare(baseline, current, 0.5) == {"slow": 1.6 - 1}
+    assert compare(baseline, current, 0.7) == {}
+
+
+def test_baseline_covers_every_case():
+    assert set(load_baseline()["cases"]) == set(CASES)
+
+
+@pytest.mark.skipif(not os.environ.get("MICROBENCH"), reason="timing check; set MICROBENCH=1 or run benchmarks.micro")
+def test_no_case_regressed_past_tolerance():
+    baseline = load_baseline()
+    regressions = compare(baseline, measure(target=0.01, repeat=3), DEFAULT_TOLERANCE)
+    # A real regression reproduces; a noisy neighbour usually does not
+    for _ in range(2):
+        if not regressions:
+            break
+        regressions = compare(baseline, measure(list(regressions), target=0.05), DEFAULT_TOLERANCE)
+    assert regressions == {}
@@ -0,0 +1,190 @@
+"""Tests for the per-update DB session and where handlers commit."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import func, select
+
+from src.bot import handlers, middleware
+from src.bot.drafts import WalkDraft, save_draft
+from src.bot.middleware import DbSessionMiddleware
+from src.bot.storage import SqlStorage, current_session
+from src.database import crud
+from src.database.models import Walk
+from src.database.versions import USERS_VERSION, read_versions
+
+
+async def _walk_count(sessions) -> int:
+    async with sessions() as session:
+        return await session.scalar(select(func.count()).select_from(Walk))
+
+
+def test_commits_after_handler_returns(make_session_factory, monkeypatch):
+    async def run():
+        sessions = await make_session_factory()
+        monkeypatch.setattr(middleware, "async_session", sessions)
+
+        async def handler(event, data):
+            assert current_session.get() is data["session"]
+            await crud.create_walk(data["session"], 1, is_finalized=True)
+            return "handled"
+
+        result = await DbSessionMiddleware()(handler, object(), {})
+        return result, current_session.get(), await _walk_count(sessions)
+
+    assert asyncio.run(run()) == ("handled", None, 1)
+
+
+def test_rolls_back_when_handler_fails(make_session_factory, monkeypatch):
+    async def run():
+        sessions = await make_session_factory()
+        monkeypatch.setattr(middleware, "async_session", sessions)
+
+        async def handler(event, data):
+            await crud.create_walk(data["session"], 1, is_finalized=True)
+            raise RuntimeError("handler failed")
+
+        with pytest.raises(RuntimeError):
+            await DbSessionMiddleware()(handler, object(), {})
+        return current_session.get(), await _walk_count(sessions)
+
+    assert asyncio.run(run()) == (None, 0)
+
+
+@pytest.mark.parametrize("via", ["reply_button", "inline_editor"])
+def test_walk_is_committed_before_anyone_is_told(make_session_factory, monkeypatch, via):
+    async def run():
+        sessions = await make_session_factory()
+        monkeypatch.setattr(middleware, "async_session", sessions)
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5, "alice")
+            await session.commit()
+
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=5, user_id=5))
+        draft = WalkDraft.start()
+        draft.message_id = 10
+        await save_draft(state, draft)
+
+        # Every outbound call records whether the update's transaction is open
+        open_at_send = []
+
+        async def send(*args, **kwargs):
+            open_at_send.append(current_session.get().in_transaction())
+
+        monkeypatch.setattr(handlers, "broadcast_walk", send)
+        message = SimpleNamespace(message_id=10, from_user=SimpleNamespace(id=5), answer=send, edit_text=send)
+
+        async def handler(event, data):
+            if via == "reply_button":
+                await handlers.send_walk(message, state, None, data["session"], user)
+            else:
+                callback = SimpleNamespace(data="walk:send", message=message, answer=send)
+                await handlers.walk_editor_callback(callback, state, None, data["session"], user)
+
+        await DbSessionMiddleware()(handler, object(), {})
+        return open_at_send, await _walk_count(sessions)
+
+    open_at_send, walks = asyncio.run(run())
+    assert walks == 1
+    assert open_at_send and not any(open_at_send)
+
+
+def test_choosing_the_current_language_writes_nothing(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5, "alice")
+            await session.commit()
+            before = await read_versions(session)
+
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=5, user_id=5))
+        replies = []
+
+        async def answer(*args, **kwargs):
+            replies.append(kwargs["text"])
+
+        message = SimpleNamespace(from_user=SimpleNamespace(id=5, username="alice"), answer=answer)
+        async with sessions() as session:
+            await handlers._set_language(message, state, session, user, "ru")
+            unchanged = await read_versions(session)
+            await handlers._set_language(message, state, session, user, "en")
+            changed = await read_versions(session)
+        return before, unchanged, changed, len(replies)
+
+    before, unchanged, changed, replies = asyncio.run(run())
+    assert unchanged == before
+    assert changed[USERS_VERSION] == before[USERS_VERSION] + 1
+    assert replies == 2
+
+
+def test_inline_send_broadcasts_even_if_the_edit_fails(make_session_factory, monkeypatch):
+    async def run():
+        sessions = await make_session_factory()
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5, "alice")
+            await session.commit()
+
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=5, user_id=5))
+        draft = WalkDraft.start()
+        draft.message_id = 10
+        await save_draft(state, draft)
+        broadcasts = []
+
+        async def broadcast(session, walk, user, bot):
+            broadcasts.append(walk.id)
+
+        async def deleted(**kwargs):
+            raise TelegramBadRequest(method=None, message="Bad Request: message to edit not found")
+
+        monkeypatch.setattr(handlers, "broadcast_walk", broadcast)
+        message = SimpleNamespace(message_id=10, edit_text=deleted)
+        callback = SimpleNamespace(data="walk:send", message=message, answer=deleted)
+        async with sessions() as session:
+            await handlers.walk_editor_callback(callback, state, None, session, user)
+        return broadcasts, await _walk_count(sessions)
+
+    broadcasts, walks = asyncio.run(run())
+    assert len(broadcasts) == walks == 1
+
+
+@pytest.mark.parametrize("press", ["walk:didnt_poop", "walk:cancel", "didnt_poop", "cancel"])
+def test_draft_edits_commit_before_telegram_calls(make_session_factory, monkeypatch, press):
+    async def run():
+        sessions = await make_session_factory()
+        monkeypatch.setattr(middleware, "async_session", sessions)
+        async with sessions() as session:
+            user = await crud.get_or_create_user(session, 5, "alice")
+            await session.commit()
+
+        # DB-backed drafts, so an uncommitted draft write shows as an open transaction
+        state = FSMContext(SqlStorage(sessions), StorageKey(bot_id=1, chat_id=5, user_id=5))
+        draft = WalkDraft.start()
+        draft.message_id = 10
+        await save_draft(state, draft)
+        open_at_send = []
+
+        async def send(*args, **kwargs):
+            open_at_send.append(current_session.get().in_transaction())
+
+        message = SimpleNamespace(
+            message_id=10, from_user=SimpleNamespace(id=5), answer=send, edit_text=send, edit_reply_markup=send
+        )
+
+        async def handler(event, data):
+            if press == "didnt_poop":
+                await handlers.toggle_didnt_poop(message, state, data["session"], user)
+            elif press == "cancel":
+                await handlers.cancel_walk(message, state, data["session"], user)
+            else:
+                callback = SimpleNamespace(data=press, message=message, answer=send)
+                await handlers.walk_editor_callback(callback, state, None, data["session"], user)
+
+        await DbSessionMiddleware()(handler, object(), {})
+        return open_at_send
+
+    open_at_send = asyncio.run(run())
+    assert open_at_send and not any(open_at_send)
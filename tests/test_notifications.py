@@ -0,0 +1,59 @@
+"""Tests for notification coalescing."""
+import asyncio
+
+from src.bot.notifications import NotificationCoalescer
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent.append((chat_id, text))
+
+
+def test_burst_becomes_one_message_and_one_digest():
+    async def run():
+        bot, coalescer = FakeBot(), NotificationCoalescer(window=0.05)
+        for i in range(4):
+            await coalescer.send(bot, 1, f"walk {i}")
+        await coalescer.send(bot, 2, "walk 0")
+        before_close = list(bot.sent)
+        await asyncio.sleep(0.1)
+        return before_close, bot.sent
+
+    before_close, sent = asyncio.run(run())
+    assert before_close == [(1, "walk 0"), (2, "walk 0")]
+    assert sent[2:] == [(1, "walk 1\n\nwalk 2\n\nwalk 3")]
+
+
+def test_new_window_after_close_sends_immediately():
+    async def run():
+        bot, coalescer = FakeBot(), NotificationCoalescer(window=0.02)
+        await coalescer.send(bot, 1, "a")
+        await asyncio.sleep(0.05)
+        await coalescer.send(bot, 1, "b")
+        return bot.sent
+
+    assert asyncio.run(run()) == [(1, "a"), (1, "b")]
+
+
+def test_flush_all_sends_held_digests():
+    async def run():
+        bot, coalescer = FakeBot(), NotificationCoalescer(window=60)
+        await coalescer.send(bot, 1, "a")
+        await coalescer.send(bot, 1, "b")
+        await coalescer.flush_all()
+        return bot.sent
+
+    assert asyncio.run(run()) == [(1, "a"), (1, "b")]
+
+
+def test_zero_window_sends_everything():
+    async def run():
+        bot, coalescer = FakeBot(), NotificationCoalescer(window=0)
+        await coalescer.send(bot, 1, "a")
+        await coalescer.send(bot, 1, "b")
+        return bot.sent
+
+    assert asyncio.run(run()) == [(1, "a"), (1, "b")]
@@ -0,0 +1,26 @@
+"""Tests for the portable user-name queries behind the dashboard."""
+import asyncio
+
+from src.database.models import User
+from src.web import queries
+
+USERS = [
+    {"id": 1, "telegram_id": 101, "display_name": "Bob", "username": "bob_b"},
+    {"id": 2, "telegram_id": 102, "display_name": None, "username": "alice"},
+    {"id": 3, "telegram_id": 103, "display_name": None, "username": None},
+    {"id": 4, "telegram_id": 104, "display_name": "", "username": "blank"},
+    {"id": 5, "telegram_id": 105, "display_name": "Gone", "username": None, "is_active": False},
+]
+
+
+def test_names_fall_back_like_coalesce(make_session_factory):
+    async def run():
+        sessions = await make_session_factory({User: [{"is_active": True, **user} for user in USERS]})
+        async with sessions() as session:
+            return await queries.get_all_users(session), await queries.get_user_names(session)
+
+    users, names = asyncio.run(run())
+    # An empty display name is kept, as COALESCE only skips NULL
+    assert names == {1: "Bob", 2: "alice", 3: "User 103", 4: "", 5: "Gone"}
+    # Active users only, ordered by the database's collation (binary on SQLite)
+    assert [user["id"] for user in users] == [4, 1, 3, 2]
@@ -0,0 +1,103 @@
+"""Tests for auto-finalizing expired walk drafts."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import func, select
+
+from src.bot import notifications, scheduler
+from src.bot.drafts import WalkDraft, save_draft
+from src.bot.storage import SqlStorage
+from src.database import crud
+from src.database.directory import UserDirectory
+from src.database.models import Walk
+
+TELEGRAM_ID = 5
+
+
+async def _setup(make_session_factory, monkeypatch):
+    """A user with a saved draft in the DB storage, and a recording fake bot."""
+    sessions = await make_session_factory()
+    async with sessions() as session:
+        await crud.get_or_create_user(session, TELEGRAM_ID, "alice")
+        await session.commit()
+
+    calls = []
+
+    async def record(method, **kwargs):
+        calls.append(method)
+
+    bot = SimpleNamespace(
+        id=1,
+        edit_message_text=lambda **kwargs: record("edit_message_text", **kwargs),
+        send_message=lambda **kwargs: record("send_message", **kwargs),
+    )
+
+    async def broadcast(session, walk, user, bot):
+        calls.append("broadcast")
+
+    monkeypatch.setattr(scheduler, "async_session", sessions)
+    monkeypatch.setattr(scheduler, "directory", UserDirectory())
+    monkeypatch.setattr(scheduler, "_bot", bot)
+    monkeypatch.setattr(notifications, "broadcast_walk", broadcast)
+
+    draft = WalkDraft.start()
+    draft.message_id = 10
+    key = StorageKey(bot_id=1, chat_id=TELEGRAM_ID, user_id=TELEGRAM_ID)
+    await save_draft(FSMContext(storage=SqlStorage(sessions), key=key), draft)
+    return sessions, calls
+
+
+async def _walk_count(sessions) -> int:
+    async with sessions() as session:
+        return await session.scalar(select(func.count()).select_from(Walk))
+
+
+def test_replicas_finalize_a_draft_once(make_session_factory, monkeypatch):
+    async def run():
+        sessions, calls = await _setup(make_session_factory, monkeypatch)
+        # Two replicas' storages, e.g. a timer here and the leader's sweep there
+        for _ in range(2):
+            monkeypatch.setattr(scheduler, "_storage", SqlStorage(sessions))
+            await scheduler._finalize_draft(TELEGRAM_ID)
+        return await _walk_count(sessions), calls
+
+    walks, calls = asyncio.run(run())
+    assert walks == 1
+    assert calls == ["edit_message_text", "broadcast"]
+
+
+def test_failed_insert_keeps_the_draft(make_session_factory, monkeypatch):
+    async def run():
+        sessions, calls = await _setup(make_session_factory, monkeypatch)
+        storage = SqlStorage(sessions)
+        monkeypatch.setattr(scheduler, "_storage", storage)
+
+        async def fail(*args, **kwargs):
+            raise RuntimeError("insert failed")
+
+        monkeypatch.setattr(crud, "create_walk", fail)
+        with pytest.raises(RuntimeError):
+            await scheduler._finalize_draft(TELEGRAM_ID)
+        data = await storage.get_data(StorageKey(bot_id=1, chat_id=TELEGRAM_ID, user_id=TELEGRAM_ID))
+        return await _walk_count(sessions), calls, "draft" in data
+
+    assert asyncio.run(run()) == (0, [], True)
+
+
+def test_broadcasts_even_if_the_editor_is_gone(make_session_factory, monkeypatch):
+    async def run():
+        sessions, calls = await _setup(make_session_factory, monkeypatch)
+        monkeypatch.setattr(scheduler, "_storage", SqlStorage(sessions))
+
+        async def deleted(**kwargs):
+            raise TelegramBadRequest(method=None, message="Bad Request: message to edit not found")
+
+        monkeypatch.setattr(scheduler._bot, "edit_message_text", deleted)
+        await scheduler._finalize_draft(TELEGRAM_ID)
+        return await _walk_count(sessions), calls
+
+    assert asyncio.run(run()) == (1, ["broadcast"])
@@ -0,0 +1,23 @@
+"""Tests for the cross-worker SQLite cache."""
+from src.web.shared_cache import SharedCache
+
+
+def test_values_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer, reader = SharedCache(path), SharedCache(path)
+    writer.put("key", b"value", ttl=60)
+    assert reader.get("key") == b"value"
+    assert reader.get("other") is None
+
+
+def test_expired_values_are_misses(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite"))
+    cache.put("key", b"value", ttl=0)
+    assert cache.get("key") is None
+
+
+def test_errors_are_misses(tmp_path):
+    # A directory cannot be opened as a database
+    cache = SharedCache(str(tmp_path))
+    cache.put("key", b"value", ttl=60)
+    assert cache.get("key") is None
@@ -0,0 +1,137 @@
+"""Tests for the database-backed FSM storage."""
+import asyncio
+
+import pytest
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import event
+
+from src.bot.storage import SqlStorage, current_session
+
+KEY = StorageKey(bot_id=1, chat_id=42, user_id=42)
+
+
+def test_state_and_data_round_trip(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        storage = SqlStorage(sessions)
+        empty = (await storage.get_state(KEY), await storage.get_data(KEY))
+        await storage.set_state(KEY, State("awaiting_time", group_name="WalkStates"))
+        await storage.set_data(KEY, {"draft": {"long_walk": True}})
+        await storage.set_state(KEY, None)
+
+        # A second process (fresh cache) sees the same row
+        other = SqlStorage(sessions)
+        return empty, await other.get_state(KEY), await other.get_data(KEY), await storage.get_data(KEY)
+
+    empty, state, data, own = asyncio.run(run())
+    assert empty == (None, {})
+    assert state is None
+    assert data == own == {"draft": {"long_walk": True}}
+
+
+def test_state_persists_separately_from_data(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        await SqlStorage(sessions).set_state(KEY, "WalkStates:awaiting_name")
+        await SqlStorage(sessions).set_data(KEY, {"x": 1})
+        other = SqlStorage(sessions)
+        return await other.get_state(KEY), await other.get_data(KEY)
+
+    assert asyncio.run(run()) == ("WalkStates:awaiting_name", {"x": 1})
+
+
+def test_cached_reads_skip_db_and_ttl_zero_disables_cache(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        statements = []
+        event.listen(
+            sessions.kw["bind"].sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        counts = []
+        for ttl in (60.0, 0):
+            storage = SqlStorage(sessions, cache_ttl=ttl)
+            await storage.get_state(KEY)
+            statements.clear()
+            for _ in range(3):
+                await storage.get_state(KEY)
+                await storage.get_data(KEY)
+            counts.append(len(statements))
+        return counts
+
+    assert asyncio.run(run()) == [0, 6]
+
+
+def test_returned_data_is_a_copy(make_session_factory):
+    async def run():
+        storage = SqlStorage(await make_session_factory())
+        await storage.set_data(KEY, {"a": 1})
+        data = await storage.get_data(KEY)
+        data["a"] = 2
+        return await storage.get_data(KEY)
+
+    assert asyncio.run(run()) == {"a": 1}
+
+
+def test_rejects_thread_keys(make_session_factory):
+    async def run():
+        storage = SqlStorage(await make_session_factory())
+        await storage.get_state(StorageKey(bot_id=1, chat_id=1, user_id=1, thread_id=5))
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_writes_join_the_update_session_and_roll_back_with_it(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        storage = SqlStorage(sessions, cache_ttl=60.0)
+        await storage.set_data(KEY, {"a": 1})
+
+        async with sessions() as session:
+            token = current_session.set(session)
+            try:
+                await storage.set_data(KEY, {"a": 2})
+                inside = await storage.get_data(KEY)
+                await session.rollback()
+            finally:
+                current_session.reset(token)
+
+        return inside, await storage.get_data(KEY), await SqlStorage(sessions).get_data(KEY)
+
+    assert asyncio.run(run()) == ({"a": 2}, {"a": 1}, {"a": 1})
+
+
+def test_pop_value_hands_the_value_out_once(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        first, second = SqlStorage(sessions, cache_ttl=60.0), SqlStorage(sessions, cache_ttl=60.0)
+        await first.set_data(KEY, {"draft": {"long_walk": True}, "other": 1})
+        # Both processes have the draft cached
+        cached = await second.get_data(KEY)
+        popped = await first.pop_value(KEY, "draft"), await second.pop_value(KEY, "draft")
+        return cached, popped, await second.get_data(KEY), await SqlStorage(sessions).get_data(KEY)
+
+    cached, popped, second_view, stored = asyncio.run(run())
+    assert "draft" in cached
+    assert popped == ({"long_walk": True}, None)
+    assert second_view == stored == {"other": 1}
+
+
+def test_pop_value_rolls_back_with_the_update_session(make_session_factory):
+    async def run():
+        sessions = await make_session_factory()
+        storage = SqlStorage(sessions)
+        await storage.set_data(KEY, {"draft": 1})
+        async with sessions() as session:
+            token = current_session.set(session)
+            try:
+                popped = await storage.pop_value(KEY, "draft")
+                await session.rollback()
+            finally:
+                current_session.reset(token)
+        return popped, await storage.get_data(KEY)
+
+    assert asyncio.run(run()) == (1, {"draft": 1})
@@ -0,0 +1,55 @@
+"""Tests for Server-Timing spans and middleware."""
+import asyncio
+
+from src.web.timing import ServerTimingMiddleware, collect_spans, format_server_timing, timed, timed_query
+
+
+@timed_query
+async def get_leaderboard():
+    return "rows"
+
+
+def test_spans_are_only_recorded_while_collecting():
+    with timed("ignored"):
+        pass
+
+    async def run():
+        with collect_spans() as spans:
+            with timed("auth"):
+                pass
+            result = await get_leaderboard()
+        return result, spans
+
+    result, spans = asyncio.run(run())
+    assert result == "rows"
+    assert [name for name, _ in spans] == ["auth", "leaderboard"]
+    assert all(duration >= 0 for _, duration in spans)
+
+
+def test_format_server_timing():
+    assert format_server_timing([("auth", 0.123), ("cache", 1.5)], 2.0) == (
+        "auth;dur=0.12, cache;dur=1.50, total;dur=2.00"
+    )
+
+
+def test_middleware_adds_header_only_when_spans_were_recorded():
+    async def app(scope, receive, send):
+        if scope["path"] == "/api":
+            with timed("auth"):
+                pass
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def request(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await ServerTimingMiddleware(app)({"type": "http", "method": "GET", "path": path}, None, send)
+        return dict(sent[0]["headers"])
+
+    api, page = asyncio.run(request("/api")), asyncio.run(request("/"))
+    assert api[b"server-timing"].startswith(b"auth;dur=")
+    assert b", total;dur=" in api[b"server-timing"]
+    assert b"server-timing" not in page
@@ -0,0 +1,74 @@
+"""Tests for span tracing and the JSONL exporter."""
+import asyncio
+import json
+
+import pytest
+
+from src import tracing
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemoryExporter()
+    tracing.configure(exporter)
+    yield exporter
+    tracing.shutdown()
+
+
+@tracing.traced()
+async def load_user():
+    await asyncio.sleep(0)
+    tracing.record("db.SELECT", 0.002)
+    return "user"
+
+
+def test_spans_nest_across_awaits_and_tasks(exporter):
+    async def run():
+        with tracing.span("update", update_id=1):
+            assert await load_user() == "user"
+            await asyncio.create_task(load_user())
+
+    asyncio.run(run())
+    by_name = {}
+    for span in exporter.spans:
+        by_name.setdefault(span.name, []).append(span)
+
+    (root,) = by_name["update"]
+    assert root.parent_id is None
+    assert root.attributes == {"update_id": 1}
+    assert [s.parent_id for s in by_name["test_tracing.load_user"]] == [root.span_id] * 2
+    calls = {s.span_id for s in by_name["test_tracing.load_user"]}
+    assert {s.parent_id for s in by_name["db.SELECT"]} == calls
+    assert {s.trace_id for s in exporter.spans} == {root.trace_id}
+    assert by_name["db.SELECT"][0].duration_ms == pytest.approx(2.0)
+
+
+def test_errors_are_recorded_and_reraised(exporter):
+    with pytest.raises(ValueError):
+        with tracing.span("handler"):
+            raise ValueError("bad input")
+    tracing.record("db.UPDATE", None)  # no current span: ignored
+
+    (span,) = exporter.spans
+    assert span.error == "ValueError: bad input"
+
+
+def test_nothing_is_recorded_without_exporter():
+    with tracing.span("update") as span:
+        assert span is None
+        assert tracing.current_span() is None
+    assert asyncio.run(load_user()) == "user"
+
+
+def test_jsonl_exporter_writes_one_line_per_span(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(tracing.JsonlExporter(str(path)))
+    with tracing.span("update", user_id=7):
+        with tracing.span("handler.start"):
+            pass
+    tracing.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["handler.start", "update"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    assert lines[1]["attributes"] == {"user_id": 7}